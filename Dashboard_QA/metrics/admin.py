@@ -1,11 +1,77 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils.functional import cached_property
+from .exports import export_response
 from .models import Developer, Requirement
+from .reports import REQUIREMENT_FIELDS, requirement_rows
 from django.utils.html import format_html
 
+
+class EstimatedCountPaginator(Paginator):
+    """
+    En tablas grandes sin filtros usa la estimación de filas de PostgreSQL (pg_class.reltuples)
+    en vez de un COUNT(*) completo. Con filtros, tablas chicas u otros motores cuenta normal.
+    """
+    estimate_threshold = 50000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = self._estimated_rows(self.object_list)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def _estimated_rows(queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # reltuples es -1 si la tabla nunca se analizó
+        return int(row[0]) if row and row[0] >= 0 else None
+
+
+class DeveloperAutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    Filtro por desarrollador con búsqueda (select2 contra el autocomplete del admin):
+    sólo carga el desarrollador elegido en vez de listarlos a todos.
+    """
+    template = 'admin/metrics/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        # El campo de formulario le da al widget las opciones (sólo se consulta la elegida)
+        self.form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+        )
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
+
+    def rendered_widget(self):
+        selected = self.lookup_val[0] if self.lookup_val else None
+        return self.form_field.widget.render(self.lookup_kwarg, selected, attrs={'id': f'filter_{self.lookup_kwarg}'})
+
+
 @admin.register(Developer)
 class DeveloperAdmin(admin.ModelAdmin):
     list_display = ('name', 'rol', 'email')
     list_filter = ('rol',)
+    # Necesario para el autocomplete de desarrollador en los requerimientos (paginado por nombre)
+    search_fields = ('name', 'email')
+    ordering = ('name',)
 
 @admin.register(Requirement)
 class RequirementAdmin(admin.ModelAdmin):
@@ -21,11 +87,19 @@ class RequirementAdmin(admin.ModelAdmin):
     )
     
     # Filtros laterales
-    list_filter = ('developer', 'is_qa_approved', 'date_completed')
+    list_filter = (('developer', DeveloperAutocompleteFilter), 'is_qa_approved', 'date_completed')
     
     # Búsqueda
     search_fields = ('jira_ticket', 'description', 'developer__name')
 
+    # --- Rendimiento del listado ---
+    # El desarrollador (y su rol para __str__) viene en el mismo JOIN
+    list_select_related = ('developer',)
+    autocomplete_fields = ('developer',)
+    paginator = EstimatedCountPaginator
+    # Evita el COUNT(*) extra de toda la tabla al filtrar
+    show_full_result_count = False
+
     # Agrupar campos en el formulario de edición
     fieldsets = (
         ('Información General', {
@@ -51,6 +125,28 @@ class RequirementAdmin(admin.ModelAdmin):
     # Campos de solo lectura (calculados)
     readonly_fields = ('unit_tests_failed',)
 
+    actions = ('export_csv',)
+
+    @property
+    def media(self):
+        # JS/CSS del select2 que usa el filtro de desarrollador
+        return super().media + AutocompleteSelect(Requirement._meta.get_field('developer'), self.admin_site).media
+
+    def get_queryset(self, request):
+        # Porcentaje de unitarias calculado en la BD para poder ordenar por esa columna
+        return super().get_queryset(request).annotate(
+            unit_success_rate=Case(
+                When(unit_tests_total=0, then=Value(0.0)),
+                default=F('unit_tests_passed') * 100.0 / F('unit_tests_total'),
+                output_field=FloatField(),
+            )
+        )
+
+    @admin.action(description="Exportar seleccionados a CSV")
+    def export_csv(self, request, queryset):
+        # Mismas filas que la API (RequirementSerializer compilado), enviadas por bloques
+        return export_response('csv', 'requerimientos', REQUIREMENT_FIELDS, requirement_rows(queryset.order_by('id')))
+
     # --- Funciones para colorear y formatear en el Admin ---
 
     def qa_status_colored(self, obj):
@@ -58,14 +154,18 @@ class RequirementAdmin(admin.ModelAdmin):
         text = 'APROBADO' if obj.is_qa_approved else 'PENDIENTE'
         return format_html('<span style="color: {}; font-weight: bold;">{}</span>', color, text)
     qa_status_colored.short_description = "Estado QA"
+    qa_status_colored.admin_order_field = 'is_qa_approved'
 
     def unit_test_summary(self, obj):
         return f"{obj.unit_test_success_rate}% ({obj.unit_tests_failed} fallidas)"
     unit_test_summary.short_description = "Pruebas Unitarias"
+    unit_test_summary.admin_order_field = 'unit_success_rate'
 
     def effort_summary(self, obj):
         return f"Est: {obj.estimated_effort_hours}h | Real: {obj.real_effort_hours}h"
     effort_summary.short_description = "Esfuerzo (9h/día)"
+    # Las columnas de esfuerzo ya están guardadas en la tabla: ordenar no recalcula nada
+    effort_summary.admin_order_field = 'real_effort_hours'
 
     def deviation_colored(self, obj):
         val = obj.deviation_percentage
@@ -73,4 +173,5 @@ class RequirementAdmin(admin.ModelAdmin):
         # Si es positivo (ej 10%) significa que terminó antes -> Verde
         color = 'red' if val < 0 else 'green'
         return format_html('<span style="color: {};">{}% ({}h extra)</span>', color, val, obj.extra_hours_used)
-    deviation_colored.short_description = "Desvío / Extras"
\ No newline at end of file
+    deviation_colored.short_description = "Desvío / Extras"
+    deviation_colored.admin_order_field = 'deviation_percentage'
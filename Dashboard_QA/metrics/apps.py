@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class MetricsConfig(AppConfig):
     name = 'metrics'
+
+    def ready(self):
+        # Conecta las señales de invalidación de caché
+        from . import signals  # noqa: F401
@@ -0,0 +1,243 @@
+# metrics/bench.py
+"""
+Herramientas de benchmark: base de datos descartable, generador de datos sintéticos,
+medición de latencia/consultas/memoria por endpoint y la implementación anterior del
+reporte para comparar resultados y tiempos.
+
+Nunca toca la base real: todo corre sobre una base de pruebas que se crea y se
+destruye (en SQLite, en memoria).
+"""
+import math
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from .effort import business_days_batch, effort_from_days
+from .models import Developer, Requirement
+from .rollups import rebuild_rollups
+from .serializers import RequirementSerializer
+
+
+@contextmanager
+def scratch_database():
+    """Crea una base de pruebas vacía (con migraciones) y la destruye al salir."""
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        # SQLite ignora close() mientras la base es en memoria: ya con el nombre original
+        # sí cierra, y así una próxima scratch_database() arranca vacía
+        connection.close()
+        teardown_test_environment()
+
+
+def seed(developers=10, requirements=1000, days=730, batch_size=5000, seed_value=42):
+    """
+    Carga datos sintéticos con bulk_create: `requirements` tickets repartidos entre
+    `developers` desarrolladores y `days` días hacia atrás desde hoy.
+    Devuelve la lista de ids de desarrolladores.
+    """
+    rng = random.Random(seed_value)
+    roles = [choice for choice, _ in Developer.RolChoices.choices]
+    devs = Developer.objects.bulk_create([
+        Developer(name=f'Dev {i:04d}', email=f'dev{i}@bench.local', rol=rng.choice(roles))
+        for i in range(developers)
+    ])
+    dev_ids = [dev.pk for dev in devs]
+    today = date.today()
+
+    for offset in range(0, requirements, batch_size):
+        batch = []
+        for n in range(offset, min(offset + batch_size, requirements)):
+            unit_total = rng.randint(0, 40)
+            start = today - timedelta(days=rng.randint(0, days))
+            batch.append(Requirement(
+                developer_id=dev_ids[n % developers],
+                jira_ticket=f'BENCH-{n}',
+                description=f'Requerimiento sintético {n}',
+                is_qa_approved=rng.random() < 0.7,
+                rejection_count=rng.randint(0, 3),
+                unit_tests_total=unit_total,
+                unit_tests_passed=rng.randint(0, unit_total),
+                estimated_effort_hours=Decimal(rng.randint(4, 160)) / 2,
+                start_date_real=start,
+                end_date_real=start + timedelta(days=rng.randint(0, 20)),
+                functional_cases=rng.randint(0, 30),
+                functional_bugs=rng.randint(0, 5),
+                integration_cases=rng.randint(0, 20),
+                integration_bugs=rng.randint(0, 3),
+                regression_cases=rng.randint(0, 20),
+                regression_bugs=rng.randint(0, 3),
+                production_bugs=rng.randint(0, 2),
+            ))
+        # bulk_create no llama a save(): calculamos las columnas derivadas por lote
+        days_worked = business_days_batch(
+            [req.start_date_real for req in batch], [req.end_date_real for req in batch]
+        )
+        for req, worked in zip(batch, days_worked):
+            req.unit_tests_failed = req.unit_tests_total - req.unit_tests_passed
+            for name, value in effort_from_days(req.estimated_effort_hours, worked).items():
+                setattr(req, name, value)
+        Requirement.objects.bulk_create(batch)
+
+    # date_completed es auto_now_add: lo repartimos en el mismo rango para los filtros por fecha
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Requirement._meta.db_table} SET date_completed = start_date_real"
+        )
+    # Ni bulk_create ni el UPDATE disparan señales: armamos los rollups al final
+    rebuild_rollups()
+    return dev_ids
+
+
+def timed(func, repeat=5):
+    """Ejecuta `func` `repeat` veces y devuelve (último resultado, lista de segundos)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, timings
+
+
+def measure(func):
+    """Ejecuta `func` y devuelve (resultado, segundos, pico de memoria en MB)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = func()
+        return result, time.perf_counter() - started, tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(values, pct):
+    """Percentil por rango más cercano (sin interpolar), como reportan las herramientas de carga."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _response_size(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def bench_endpoint(url, repeat=20, warm=True, client=None):
+    """
+    Pide `url` `repeat` veces y devuelve latencias p50/p95/p99 (ms), consultas SQL y
+    pico de memoria (KB) de una petición. Con warm=False se vacía la caché antes de cada
+    petición, para medir el costo de calcular la respuesta.
+    """
+    client = client or Client()
+    timings = []
+    for _ in range(repeat):
+        if not warm:
+            cache.clear()
+        started = time.perf_counter()
+        response = client.get(url)
+        size = _response_size(response)
+        timings.append((time.perf_counter() - started) * 1000)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} respondió {response.status_code}")
+
+    # Consultas y memoria de una petición más, medidas aparte para no inflar los tiempos
+    if not warm:
+        cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        _, _, peak_mb = measure(lambda: _response_size(client.get(url)))
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': len(queries),
+        'peak_kb': round(peak_mb * 1024, 1),
+        'bytes': size,
+    }
+
+
+def _legacy_effort_days(start, end):
+    """Conteo original de días laborales (Lunes a Viernes): recorre el rango día por día."""
+    if start and end:
+        if end >= start:
+            day_count = 0
+            current_date = start
+            while current_date <= end:
+                if current_date.weekday() < 5:
+                    day_count += 1
+                current_date += timedelta(days=1)
+            return day_count
+    return 0
+
+
+def legacy_developer_report(dev_id, start_date=None, end_date=None):
+    """
+    Implementación original del reporte (una instancia y un serializer por fila), con el
+    esfuerzo real calculado por fila como lo hacían las propiedades del modelo, en vez de
+    leer las columnas persistidas.
+    """
+    developer = Developer.objects.get(pk=dev_id)
+    requirements_qs = Requirement.objects.filter(developer=developer).order_by('id')
+    if start_date:
+        requirements_qs = requirements_qs.filter(date_completed__gte=start_date)
+    if end_date:
+        requirements_qs = requirements_qs.filter(date_completed__lte=end_date)
+
+    total_reqs = unit_total = unit_passed = bugs_qa = bugs_prod = rechazos = 0
+    hours_est = Decimal(0.0)
+    hours_real = Decimal(0.0)
+    serialized_reqs = []
+    for req in requirements_qs:
+        # Las antiguas propiedades real_effort_days/real_effort_hours (jornada de 9 horas)
+        req.real_effort_days = _legacy_effort_days(req.start_date_real, req.end_date_real)
+        req.real_effort_hours = req.real_effort_days * 9
+        total_reqs += 1
+        unit_total += req.unit_tests_total
+        unit_passed += req.unit_tests_passed
+        bugs_qa += (req.functional_bugs + req.integration_bugs + req.regression_bugs)
+        bugs_prod += req.production_bugs
+        rechazos += req.rejection_count
+        hours_est += req.estimated_effort_hours
+        hours_real += Decimal(req.real_effort_hours)
+        serialized_reqs.append(RequirementSerializer(req).data)
+
+    total_issues = bugs_qa + bugs_prod
+    dde_score = 0
+    if total_issues > 0:
+        dde_score = round((bugs_qa / total_issues) * 100, 1)
+    elif total_reqs > 0:
+        dde_score = 100
+    diff_hours = hours_est - hours_real
+    tiempo_eficiencia_pct = 0
+    if hours_est > 0:
+        tiempo_eficiencia_pct = round((diff_hours / hours_est) * 100, 1)
+
+    return {
+        "developer_id": developer.id,
+        "total_requerimientos": total_reqs,
+        "unitarias_total": unit_total,
+        "unitarias_pasadas": unit_passed,
+        "unitarias_fallidas": unit_total - unit_passed,
+        "total_bugs_qa": bugs_qa,
+        "total_bugs_prod": bugs_prod,
+        "total_rechazos": rechazos,
+        "dde_score": dde_score,
+        "total_estimated_hours": hours_est,
+        "total_real_hours": hours_real,
+        "tiempo_desvio_total": diff_hours,
+        "tiempo_eficiencia_pct": tiempo_eficiencia_pct,
+        "requerimientos_lista": serialized_reqs,
+    }
@@ -0,0 +1,94 @@
+# metrics/broadcast.py
+"""
+Broadcaster en proceso para el feed de cambios (Server-Sent Events).
+
+Las señales de guardado publican eventos del tipo {"scopes": ["summary", "report:3"]}
+y cada conexión abierta en /api/stream/ los recibe por su propia cola asyncio.
+No necesita un broker externo.
+
+Como cada worker tiene su propio broadcaster, mientras haya suscriptores un único
+"vigilante" por proceso revisa cada METRICS_STREAM_POLL_SECONDS la versión de los datos
+(COUNT + MAX(updated_at)) para enterarse también de cambios hechos en otros workers.
+"""
+import asyncio
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+
+# Evento genérico cuando no sabemos qué cambió exactamente (cambio en otro proceso)
+ANY_CHANGE = '*'
+
+
+class Broadcaster:
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def subscribe(self):
+        """Registra una cola en el event loop actual. Debe llamarse desde código async."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.add((loop, queue))
+        self._ensure_watcher(loop)
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {item for item in self._subscribers if item[1] is not queue}
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        """Envía el evento a todos los suscriptores. Se puede llamar desde cualquier hilo."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:  # El loop ya se cerró
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _put(queue, event):
+        # Si un cliente lento llena su cola, descartamos el evento más viejo:
+        # el cliente igual va a refrescar con el siguiente.
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    # --- Vigilante de cambios hechos en otros procesos ---
+
+    def _ensure_watcher(self, loop):
+        interval = settings.METRICS_STREAM_POLL_SECONDS
+        if not interval or (self._watcher and not self._watcher.done()):
+            return
+        self._watcher = loop.create_task(self._watch(interval))
+
+    async def _watch(self, interval):
+        version = await sync_to_async(data_version, thread_sensitive=False)()
+        while self.subscriber_count:
+            await asyncio.sleep(interval)
+            current = await sync_to_async(data_version, thread_sensitive=False)()
+            if current != version:
+                version = current
+                self.publish({'scopes': [ANY_CHANGE]})
+
+
+def data_version():
+    """Versión barata de todos los datos del dashboard."""
+    from .models import Developer, Requirement
+
+    return tuple(
+        tuple(model.objects.aggregate(count=Count('id'), last=Max('updated_at')).values())
+        for model in (Developer, Requirement)
+    )
+
+
+broadcaster = Broadcaster()
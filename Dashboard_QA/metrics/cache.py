@@ -0,0 +1,113 @@
+# metrics/cache.py
+"""
+Caché de respuestas para los endpoints de reportes.
+
+Cada respuesta se guarda bajo un "scope" (summary, aggregates, developers, report:<id>) más los
+parámetros de fecha. Cada scope tiene un número de versión: las señales de guardado
+lo incrementan (ver signals.py) y así quedan descartadas todas las entradas de ese
+scope, sin importar con qué fechas se pidieron. Una versión global adicional permite
+descartar todo tras escrituras masivas que no disparan señales.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = 'metrics'
+SUMMARY = 'summary'
+DEVELOPERS = 'developers'
+AGGREGATES = 'aggregates'
+ALL = 'all'
+# Query params que cambian el contenido de la respuesta (forman parte de la llave y del ETag)
+CACHED_PARAMS = ('start_date', 'end_date', 'include_list', 'fields', 'group_by', 'bucket', 'window', 'ids')
+
+_HITS_KEY = f'{KEY_PREFIX}:stats:hits'
+_MISSES_KEY = f'{KEY_PREFIX}:stats:misses'
+
+
+def report_scope(dev_id):
+    return f'report:{dev_id}'
+
+
+def _version_key(scope):
+    return f'{KEY_PREFIX}:version:{scope}'
+
+
+def _new_version():
+    # Si la versión se perdió (expulsión del backend) arrancamos en un valor que nunca
+    # se usó antes, para no "revivir" entradas viejas.
+    return time.time_ns()
+
+
+def scope_version(scope):
+    """Versión efectiva del scope (global + propia)."""
+    keys = [_version_key(ALL), _version_key(scope)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = _new_version()
+            cache.set(key, versions[key], None)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def invalidate(*scopes):
+    """Descarta todas las entradas de los scopes indicados."""
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), _new_version(), None)
+
+
+def invalidate_all():
+    """Descarta todas las entradas (ej. después de un recálculo o importación masiva)."""
+    invalidate(ALL)
+
+
+def _incr_counter(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def _entry_key(scope, path, params):
+    # La ruta distingue endpoints que comparten scope (ej. reporte y tendencias de un dev)
+    raw = path + '?' + '&'.join(f'{name}={params.get(name) or ""}' for name in CACHED_PARAMS)
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'{KEY_PREFIX}:{scope}:{scope_version(scope)}:{digest}'
+
+
+def cached_payload(scope, request, builder):
+    """
+    Devuelve el payload cacheado del scope para los parámetros del request
+    o lo calcula con `builder()`. Un resultado None (ej. 404) no se cachea.
+    """
+    return cached_value(scope, request.path, request.query_params, builder)
+
+
+def cached_value(scope, path, params, builder):
+    """Igual que cached_payload, con la ruta y los parámetros explícitos (comparte las entradas del endpoint)."""
+    key = _entry_key(scope, path, params)
+    data = cache.get(key)
+    if data is not None:
+        _incr_counter(_HITS_KEY)
+        return data
+
+    _incr_counter(_MISSES_KEY)
+    data = builder()
+    if data is not None:
+        cache.set(key, data, settings.METRICS_CACHE_TIMEOUT)
+    return data
+
+
+def cache_stats():
+    hits = cache.get(_HITS_KEY) or 0
+    misses = cache.get(_MISSES_KEY) or 0
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0,
+    }
@@ -0,0 +1,168 @@
+# metrics/changes.py
+"""
+Sincronización incremental: registro de cambios (ChangeLog) y respuesta de
+GET /api/changes/?since=<seq>.
+
+Cada alta, modificación o baja de Developer o Requirement agrega una fila a ChangeLog en
+la misma transacción que el cambio (desde las señales, o desde ingest para los
+bulk_create). El cliente guarda el `cursor` de la última respuesta (o el del Dashboard)
+y pide sólo lo posterior: las filas actuales de lo que se creó o modificó, los ids de lo
+que se borró y el resumen y los totales recalculados de los desarrolladores afectados.
+El costo depende de cuánto cambió, no de cuántos tickets hay.
+
+Los ids de ChangeLog se confirman en orden: quien registra cambios toma primero un lock
+que se libera recién con el commit de su transacción (en Postgres un advisory lock; SQLite
+ya serializa las escrituras). Sin eso un id más alto podría confirmarse antes que uno más
+bajo todavía en vuelo, y un cliente con el cursor del primero se saltearía el segundo.
+
+Si el cursor es anterior a los cambios que se conservan (ver `manage.py prune_changelog`)
+o posterior al último, se responde `reset: true` y el cliente tiene que recargar todo.
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import ChangeLog, Developer, Requirement
+from .reports import REQUIREMENT_ROW_COLUMNS, build_developer_reports, build_general_summary, requirement_row
+from .serializers import DeveloperSerializer
+
+# Clave del advisory lock de Postgres que ordena las escrituras en ChangeLog
+SEQUENCE_LOCK = 0x43686e67
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 5000
+
+DEVELOPER = ChangeLog.Entity.DEVELOPER
+REQUIREMENT = ChangeLog.Entity.REQUIREMENT
+UPSERT = ChangeLog.Action.UPSERT
+DELETE = ChangeLog.Action.DELETE
+
+
+def record(entity, action, changes):
+    """Registra cambios de `entity`. `changes`: pares (object_id, developer_id afectado)."""
+    with transaction.atomic():
+        _lock_sequence()
+        ChangeLog.objects.bulk_create([
+            ChangeLog(entity=entity, action=action, object_id=object_id, developer_id=developer_id)
+            for object_id, developer_id in dict.fromkeys(changes)
+        ])
+
+
+def _lock_sequence():
+    """Espera a que terminen las demás transacciones que registraron cambios (ver arriba)."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [SEQUENCE_LOCK])
+
+
+def current_cursor():
+    """
+    Secuencia del último cambio confirmado (0 si no hay ninguno). Como los ids se confirman
+    en orden, no queda ningún cambio con un id menor por aparecer.
+    """
+    return ChangeLog.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def parse_since(raw):
+    """Interpreta `since=`. Lanza ValueError si no es un entero >= 0."""
+    try:
+        since = int(raw or 0)
+    except ValueError:
+        since = -1
+    if since < 0:
+        raise ValueError("since debe ser un entero mayor o igual a 0")
+    return since
+
+
+def parse_limit(raw):
+    """Interpreta `limit=` (1..MAX_LIMIT, default DEFAULT_LIMIT). Lanza ValueError si es inválido."""
+    try:
+        limit = int(raw) if raw else DEFAULT_LIMIT
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit debe estar entre 1 y {MAX_LIMIT}")
+    return limit
+
+
+def _empty(since, cursor, reset=False):
+    return {
+        "since": since,
+        "cursor": cursor,
+        "reset": reset,
+        "has_more": False,
+        "developers": {"upserted": [], "deleted": []},
+        "requirements": {"upserted": [], "deleted": []},
+        "aggregates": {"summary": [], "reports": []},
+    }
+
+
+def build_changes(since, limit=DEFAULT_LIMIT):
+    """
+    Cambios posteriores a `since` (hasta `limit` entradas del registro; si hay más,
+    `has_more` es true y se sigue pidiendo desde `cursor`). Varias entradas del mismo
+    objeto se resumen en su estado final.
+    """
+    bounds = ChangeLog.objects.aggregate(first=Min('id'), last=Max('id'))
+    last = bounds['last'] or 0
+    if since > last or (bounds['first'] is not None and since < bounds['first'] - 1):
+        return _empty(since, last, reset=True)
+
+    log = list(
+        ChangeLog.objects.filter(id__gt=since).order_by('id')
+        .values_list('id', 'entity', 'object_id', 'action', 'developer_id')[:limit + 1]
+    )
+    if not log:
+        return _empty(since, since)
+    has_more = len(log) > limit
+    log = log[:limit]
+    data = _empty(since, log[-1][0])
+    data["has_more"] = has_more
+
+    # Gana la última acción de cada objeto
+    latest = {}
+    affected = set()
+    for _, entity, object_id, action, developer_id in log:
+        latest[(entity, object_id)] = action
+        affected.add(object_id if entity == DEVELOPER else developer_id)
+    affected.discard(None)
+
+    def ids(entity, action):
+        return sorted(pk for (kind, pk), last_action in latest.items() if kind == entity and last_action == action)
+
+    developers = DeveloperSerializer(
+        Developer.objects.filter(pk__in=ids(DEVELOPER, UPSERT)).order_by('id'), many=True
+    ).data
+    requirements = [
+        dict(requirement_row(values), developer_id=values['developer_id'])
+        for values in Requirement.objects.filter(pk__in=ids(REQUIREMENT, UPSERT)).order_by('id')
+        .values('developer_id', *REQUIREMENT_ROW_COLUMNS)
+    ]
+    # Lo que se modificó y después se borró (en una transacción posterior al cursor) cuenta como baja
+    for key, entity, rows in (('developers', DEVELOPER, developers), ('requirements', REQUIREMENT, requirements)):
+        found = {row['id'] for row in rows}
+        data[key]["upserted"] = rows
+        data[key]["deleted"] = sorted(
+            set(ids(entity, DELETE)) | {pk for pk in ids(entity, UPSERT) if pk not in found}
+        )
+
+    if affected:
+        data["aggregates"] = {
+            "summary": build_general_summary(affected),
+            "reports": build_developer_reports(sorted(affected), include_list=False),
+        }
+    return data
+
+
+def prune(days):
+    """
+    Borra los cambios de más de `days` días, conservando siempre el último (así se puede
+    distinguir un cursor viejo de uno al día). Devuelve cuántas filas se borraron.
+    """
+    last = current_cursor()
+    deleted, _ = ChangeLog.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=days), id__lt=last
+    ).delete()
+    return deleted
@@ -0,0 +1,78 @@
+# metrics/conditional.py
+"""
+ETags para GET condicional en los endpoints de métricas.
+
+Cada ETag sale de una "versión de datos" barata (COUNT + MAX(updated_at)) en vez del
+reporte completo: si el cliente manda If-None-Match con el mismo valor se responde
+304 sin agregar ni serializar nada. El COUNT cubre los borrados, que no mueven
+MAX(updated_at). No se emite Last-Modified justamente por los borrados.
+
+Las vistas que pueden servir un snapshot precalculado usan `snapshot_etag`: mientras se
+sirve el snapshot (aunque esté desactualizado) el ETag sale del snapshot, no de las
+tablas, para que un mismo ETag nunca corresponda a dos cuerpos distintos.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import etag
+
+from .cache import CACHED_PARAMS
+from .models import Developer, Requirement
+from .snapshots import latest_snapshot
+
+
+def _make_etag(request, scope, *version):
+    parts = [scope, request.accepted_media_type or '']
+    parts += [request.query_params.get(name) or '' for name in CACHED_PARAMS]
+    parts += [str(value) for value in version]
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+def _table_version(model):
+    stats = model.objects.aggregate(count=Count('id'), last=Max('updated_at'))
+    return stats['count'], stats['last']
+
+
+def summary_etag(request, *args, **kwargs):
+    return _make_etag(request, 'summary', *_table_version(Developer), *_table_version(Requirement))
+
+
+def aggregates_etag(request, *args, **kwargs):
+    return _make_etag(request, 'aggregates', *_table_version(Developer), *_table_version(Requirement))
+
+
+def developers_etag(request, *args, **kwargs):
+    return _make_etag(request, 'developers', *_table_version(Developer))
+
+
+def report_etag(request, dev_id, *args, **kwargs):
+    version = (
+        Developer.objects.filter(pk=dev_id)
+        .annotate(count=Count('requirements'), last=Max('requirements__updated_at'))
+        .values_list('updated_at', 'count', 'last')
+        .first()
+    )
+    if version is None:
+        return None  # Sin ETag: la vista responde el 404
+    return _make_etag(request, f'report:{dev_id}', *version)
+
+
+def snapshot_etag(scope_func, live_etag):
+    """
+    ETag de una vista que sirve el snapshot de `scope_func(request, ...)` si está vigente.
+    El snapshot leído queda en `request.snapshot` para que la vista sirva exactamente ese;
+    sin snapshot (o si scope_func devuelve None) se usa `live_etag`.
+    """
+    def etag_func(request, *args, **kwargs):
+        scope = scope_func(request, *args, **kwargs)
+        request.snapshot = latest_snapshot(scope) if scope else None
+        if request.snapshot is None:
+            return live_etag(request, *args, **kwargs)
+        return _make_etag(request, scope, 'snapshot', request.snapshot.built_at.isoformat())
+    return etag_func
+
+
+def conditional_get(etag_func):
+    """Aplica el ETag a `get` de una vista DRF (después de la negociación de contenido)."""
+    return method_decorator(etag(etag_func), name='get')
@@ -0,0 +1,137 @@
+# metrics/effort.py
+"""
+Utilidades de esfuerzo: conteo de días laborales (Lunes a Viernes) y columnas derivadas.
+
+`business_days` resuelve un rango en tiempo constante usando aritmética de semanas
+completas; `business_days_batch` resuelve muchos rangos a la vez (con NumPy si está
+instalado) para procesar querysets enteros.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+# Jornada laboral usada en todos los cálculos de horas
+HOURS_PER_DAY = 9
+
+
+def _weekdays_in_partial_week(first_weekday, days):
+    """Días laborales dentro de `days` (< 7) días consecutivos que empiezan en `first_weekday`."""
+    last = first_weekday + days  # exclusivo, como máximo 12
+    # Parte dentro de la misma semana (0..4 son laborales) + parte que pasa a la siguiente
+    return max(0, min(last, 5) - first_weekday) + max(0, min(last - 7, 5))
+
+
+def _holidays_between(start, end, holidays):
+    """Feriados (sin repetir) que caen en un día laboral dentro de [start, end]."""
+    return sum(1 for day in set(holidays) if start <= day <= end and day.weekday() < 5)
+
+
+def business_days(start, end, holidays=None):
+    """
+    Días laborales entre `start` y `end` (ambos inclusive).
+    Devuelve 0 si falta alguna fecha o si el rango está invertido.
+    """
+    if not start or not end or end < start:
+        return 0
+    full_weeks, remainder = divmod((end - start).days + 1, 7)
+    count = full_weeks * 5 + _weekdays_in_partial_week(start.weekday(), remainder)
+    if holidays:
+        count -= _holidays_between(start, end, holidays)
+    return count
+
+
+def business_days_batch(starts, ends, holidays=None):
+    """
+    Versión vectorizada de `business_days` para listas de fechas (pueden contener None).
+    Devuelve una lista de enteros en el mismo orden.
+    """
+    if np is None:
+        return [business_days(start, end, holidays) for start, end in zip(starts, ends)]
+
+    starts = list(starts)
+    ends = list(ends)
+    if not starts:
+        return []
+    valid = np.array(
+        [bool(s and e and e >= s) for s, e in zip(starts, ends)], dtype=bool
+    )
+    placeholder = date(1970, 1, 1)
+    begin = np.array([s if ok else placeholder for s, ok in zip(starts, valid)], dtype='datetime64[D]')
+    # busday_count excluye el último día, por eso sumamos uno al fin
+    finish = np.array(
+        [e + timedelta(days=1) if ok else placeholder for e, ok in zip(ends, valid)],
+        dtype='datetime64[D]',
+    )
+    calendar = np.array(sorted(set(holidays)), dtype='datetime64[D]') if holidays else None
+    kwargs = {'holidays': calendar} if calendar is not None else {}
+    counts = np.where(valid, np.busday_count(begin, finish, **kwargs), 0)
+    return counts.tolist()
+
+
+def effort_from_days(estimated_hours, days):
+    """Columnas de esfuerzo persistidas en Requirement a partir de los días laborales reales."""
+    estimated = Decimal(estimated_hours)
+    real_hours = days * HOURS_PER_DAY
+    hours_diff = estimated - Decimal(real_hours)  # Positivo = Ahorró tiempo
+    deviation = round((hours_diff / estimated) * 100, 2) if estimated != 0 else Decimal(0)
+    return {
+        'real_effort_days': days,
+        'real_effort_hours': real_hours,
+        'hours_diff': hours_diff,
+        'deviation_percentage': deviation,
+    }
+
+
+def effort_fields(estimated_hours, start, end, holidays=None):
+    """Igual que `effort_from_days`, calculando antes los días laborales del rango."""
+    return effort_from_days(estimated_hours, business_days(start, end, holidays))
+
+
+EFFORT_FIELDS = ('real_effort_days', 'real_effort_hours', 'hours_diff', 'deviation_percentage')
+
+
+def recompute_effort_columns(model, chunk_size=2000, on_update=None):
+    """
+    Recalcula las columnas de esfuerzo de todos los requerimientos por lotes de `chunk_size`.
+    Sólo escribe las filas cuyo valor cambió y devuelve cuántas fueron. `on_update(objs)`
+    se llama con cada lote escrito, dentro de la misma transacción (bulk_update no dispara
+    señales).
+    """
+    # También se mueve updated_at, para que cambien los ETags
+    update_fields = EFFORT_FIELDS + ('updated_at',)
+
+    updated = 0
+    last_pk = 0
+    base_qs = model.objects.order_by('pk').only('pk', 'developer_id', 'estimated_effort_hours', 'start_date_real', 'end_date_real', *EFFORT_FIELDS)
+    while True:
+        chunk = list(base_qs.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return updated
+        days = business_days_batch(
+            [obj.start_date_real for obj in chunk],
+            [obj.end_date_real for obj in chunk],
+        )
+        now = timezone.now()
+        changed = []
+        for obj, obj_days in zip(chunk, days):
+            values = effort_from_days(obj.estimated_effort_hours, obj_days)
+            if all(getattr(obj, name) == value for name, value in values.items()):
+                continue
+            for name, value in values.items():
+                setattr(obj, name, value)
+            obj.updated_at = now
+            changed.append(obj)
+        if changed:
+            with transaction.atomic():
+                model.objects.bulk_update(changed, update_fields)
+                if on_update is not None:
+                    on_update(changed)
+        updated += len(changed)
+        last_pk = chunk[-1].pk
@@ -0,0 +1,448 @@
+# metrics/engine.py
+"""
+Motor de métricas en memoria (columnar, con NumPy) como alternativa al ORM.
+
+Cada proceso guarda una copia compacta de Requirement: un arreglo int32 por columna
+(desarrollador, día, casos, bugs, unitarias, horas estimadas en centavos y horas reales,
+que ya vienen de los días laborales precalculados), ordenada por (desarrollador, día).
+De ahí se derivan totales por (desarrollador, día) y sus sumas acumuladas, así que:
+- el total de un desarrollador en un rango de fechas son dos búsquedas binarias y una resta;
+- el resumen y las agrupaciones (rol / desarrollador / mes / semana) restan acumulados por
+  tramo y juntan los tramos con `np.add.at`, sin recorrer filas en Python.
+
+La copia se mantiene al día con las señales de guardado (los cambios de este proceso se
+encolan y se aplican en lote antes de la próxima consulta; editar un ticket sin cambiar
+dev ni fecha se reescribe en el lugar) y con el registro de cambios (ChangeLog, ver
+changes.py), que es el mismo para todos los workers: antes de cada consulta se compara
+el cursor actual con el de la última sincronización y, si avanzó, se releen sólo los
+tickets registrados desde entonces. Si el salto es muy grande o esas entradas ya se
+podaron, se recarga todo.
+
+Se activa con METRICS_BACKEND = 'engine' (por defecto 'orm'). Requiere NumPy.
+"""
+import threading
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Min
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+from . import changes, reports
+from .models import ChangeLog, Developer, Requirement
+from .reports import AGGREGATE_GROUPS, SUMMARY_CATEGORIES, aggregate_row, parse_date_range, report_totals, summary_row
+
+BACKENDS = ('orm', 'engine')
+
+# Columnas de Requirement que se leen de la BD (en este orden)
+DB_FIELDS = (
+    'id', 'developer_id', 'date_completed',
+    'rejection_count', 'unit_tests_total', 'unit_tests_passed', 'unit_tests_failed',
+    'functional_cases', 'functional_bugs',
+    'integration_cases', 'integration_bugs',
+    'regression_cases', 'regression_bugs',
+    'production_bugs', 'estimated_effort_hours', 'real_effort_hours',
+)
+# Columnas que se suman: total_reqs es 1 por fila
+SUM_COLUMNS = (
+    'total_reqs', 'rejection_count', 'unit_tests_total', 'unit_tests_passed', 'unit_tests_failed',
+    'functional_cases', 'functional_bugs',
+    'integration_cases', 'integration_bugs',
+    'regression_cases', 'regression_bugs',
+    'production_bugs', 'estimated_cents', 'real_effort_hours',
+)
+_COLUMN = {name: index for index, name in enumerate(SUM_COLUMNS)}
+
+# Días desde 1970-01-01 (el mismo origen que datetime64[D])
+_EPOCH = date(1970, 1, 1).toordinal()
+# Las llaves de orden combinan desarrollador y día en un int64
+_DAY_OFFSET = 1 << 31
+LOAD_CHUNK = 10000
+
+
+def _day(value):
+    return value.toordinal() - _EPOCH
+
+
+def _date(day):
+    return date.fromordinal(int(day) + _EPOCH)
+
+
+def _sort_keys(developer, day):
+    return developer.astype(np.int64) * (1 << 32) + (day.astype(np.int64) + _DAY_OFFSET)
+
+
+def _row_values(values):
+    """Tupla de values_list(*DB_FIELDS) -> valores enteros de las columnas del store."""
+    (pk, developer_id, completed, *counts, estimated, real_hours) = values
+    cents = int((Decimal(str(estimated)) * 100).to_integral_value())
+    return (pk, developer_id, _day(completed), 1, *counts, cents, real_hours)
+
+
+# Columnas guardadas por fila (id, desarrollador, día y las que se suman)
+ROW_COLUMNS = ('id', 'developer_id', 'day') + SUM_COLUMNS
+
+
+def _month(day):
+    return day.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+
+
+def _week(day):
+    # El 1970-01-01 fue jueves: se retrocede hasta el lunes de la semana
+    return day - (day + 3) % 7
+
+
+BUCKETS = {'month': _month, 'week': _week}
+
+
+class _DailyFrame:
+    """Totales por (desarrollador, día) y sus sumas acumuladas. Inmutable una vez armado."""
+
+    def __init__(self, columns):
+        developer, day = columns['developer_id'], columns['day']
+        size = len(developer)
+        if size:
+            changes = (developer[1:] != developer[:-1]) | (day[1:] != day[:-1])
+            starts = np.concatenate(([0], np.flatnonzero(changes) + 1))
+        else:
+            starts = np.zeros(0, dtype=np.int64)
+        self.developer = developer[starts].astype(np.int64)
+        self.day = day[starts].astype(np.int64)
+        self.keys = _sort_keys(self.developer, self.day)
+        self.cumulative = np.zeros((len(starts) + 1, len(SUM_COLUMNS)), dtype=np.int64)
+        for index, name in enumerate(SUM_COLUMNS):
+            if size:
+                np.cumsum(np.add.reduceat(columns[name], starts, dtype=np.int64), out=self.cumulative[1:, index])
+        self._runs = {}
+
+    def runs(self, buckets=()):
+        """Tramos contiguos con el mismo desarrollador y los mismos períodos: (inicio, fin, dev, períodos)."""
+        if buckets not in self._runs:
+            periods = [BUCKETS[bucket](self.day) for bucket in buckets]
+            if len(self.day):
+                changes = self.developer[1:] != self.developer[:-1]
+                for values in periods:
+                    changes |= values[1:] != values[:-1]
+                starts = np.concatenate(([0], np.flatnonzero(changes) + 1))
+            else:
+                starts = np.zeros(0, dtype=np.int64)
+            ends = np.append(starts[1:], len(self.day)).astype(np.int64)
+            self._runs[buckets] = (starts, ends, self.developer[starts], [values[starts] for values in periods])
+        return self._runs[buckets]
+
+    def span(self, developer_id, start_day=None, end_day=None):
+        """Posiciones [inicio, fin) del desarrollador dentro del rango de días."""
+        base = developer_id * (1 << 32) + _DAY_OFFSET
+        low = base + (start_day if start_day is not None else -_DAY_OFFSET)
+        high = base + (end_day if end_day is not None else _DAY_OFFSET - 1)
+        return np.searchsorted(self.keys, low, 'left'), np.searchsorted(self.keys, high, 'right')
+
+    def totals(self, start, end):
+        return self.cumulative[end] - self.cumulative[start]
+
+    def grouped(self, buckets=(), start_day=None, end_day=None):
+        """Sumas por tramo recortadas al rango de fechas (sólo los tramos con datos)."""
+        starts, ends, developers, periods = self.runs(buckets)
+        if start_day is not None or end_day is not None:
+            low, high = self.span(developers, start_day, end_day)
+            starts, ends = np.maximum(starts, low), np.minimum(ends, high)
+        keep = ends > starts
+        sums = self.cumulative[ends[keep]] - self.cumulative[starts[keep]]
+        return developers[keep], [values[keep] for values in periods], sums
+
+
+def _annotations(sums):
+    """Mismos nombres que summary_annotations() + report_annotations() a partir de un vector de sumas."""
+    column = {name: int(sums[index]) for name, index in _COLUMN.items()}
+    data = {'total_reqs': column['total_reqs']}
+    for name, cases_field, bugs_field in SUMMARY_CATEGORIES:
+        data[f'{name}_total'] = column[cases_field]
+        data[f'{name}_bugs'] = column[bugs_field]
+    data.update({
+        'unit_passed': column['unit_tests_passed'],
+        'bugs_qa': column['functional_bugs'] + column['integration_bugs'] + column['regression_bugs'],
+        'bugs_prod': column['production_bugs'],
+        'rechazos': column['rejection_count'],
+        'hours_est': Decimal(column['estimated_cents']).scaleb(-2),
+        'hours_real': column['real_effort_hours'],
+    })
+    return data
+
+
+class ColumnStore:
+    """Copia columnar de Requirement de este proceso (ver el docstring del módulo)."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.columns = None
+        # Cursor de ChangeLog hasta el que la copia está al día
+        self.cursor = None
+        self.developers = {}  # id -> (nombre, rol)
+        self._frame = None
+        self.pending = []
+
+    @property
+    def loaded(self):
+        return self.columns is not None
+
+    def __len__(self):
+        return len(self.columns['id']) if self.loaded else 0
+
+    # --- Carga y mantenimiento ---
+
+    def sync(self):
+        """Deja la copia al día con la BD (sin consultas si nada cambió desde la última vez)."""
+        if self.pending:
+            self._apply_pending()
+        cursor = changes.current_cursor()
+        if cursor == self.cursor:
+            return
+        with self.lock:
+            if cursor == self.cursor:
+                return
+            if not self.loaded or self._too_far_behind(cursor):
+                self.pending = []
+                self.load(cursor)
+            else:
+                self._catch_up(cursor)
+
+    def _too_far_behind(self, cursor):
+        # Cursor de otra BD, un salto mayor que releer todo o entradas ya podadas (mismo criterio que build_changes)
+        if cursor < self.cursor or cursor - self.cursor > max(LOAD_CHUNK, len(self) // 2):
+            return True
+        first = ChangeLog.objects.aggregate(first=Min('id'))['first']
+        return first is not None and self.cursor < first - 1
+
+    def load(self, cursor=None):
+        """Recarga todo desde la BD."""
+        # El cursor se toma antes de leer: lo posterior se vuelve a aplicar en el próximo sync
+        if cursor is None:
+            cursor = changes.current_cursor()
+        chunks, chunk = [], []
+        queryset = Requirement.objects.order_by('developer_id', 'date_completed', 'id').values_list(*DB_FIELDS)
+        for values in queryset.iterator(chunk_size=LOAD_CHUNK):
+            chunk.append(_row_values(values))
+            if len(chunk) == LOAD_CHUNK:
+                chunks.append(np.array(chunk, dtype=np.int64))
+                chunk = []
+        if chunk:
+            chunks.append(np.array(chunk, dtype=np.int64))
+        matrix = np.concatenate(chunks) if chunks else np.zeros((0, len(ROW_COLUMNS)), dtype=np.int64)
+        self._set_columns({name: matrix[:, index].astype(np.int32) for index, name in enumerate(ROW_COLUMNS)})
+        self._load_developers()
+        self.cursor = cursor
+
+    def _catch_up(self, cursor):
+        """Aplica los cambios registrados entre el último cursor sincronizado y `cursor`."""
+        log = ChangeLog.objects.filter(id__gt=self.cursor, id__lte=cursor).values_list('entity', 'object_id')
+        touched = set(log)
+        requirement_ids = sorted(pk for entity, pk in touched if entity == changes.REQUIREMENT)
+        for offset in range(0, len(requirement_ids), LOAD_CHUNK):
+            batch = requirement_ids[offset:offset + LOAD_CHUNK]
+            # Se lee el estado actual: lo que ya no existe se borró
+            rows = list(Requirement.objects.filter(pk__in=batch).values_list(*DB_FIELDS))
+            self.upsert(rows)
+            self.remove(np.setdiff1d(np.array(batch, dtype=np.int64), [row[0] for row in rows]))
+        if any(entity == changes.DEVELOPER for entity, _ in touched):
+            self._load_developers()
+        self.cursor = cursor
+
+    def _load_developers(self):
+        self.developers = {pk: (name, rol) for pk, name, rol in Developer.objects.values_list('id', 'name', 'rol')}
+
+    def _set_columns(self, columns):
+        self.columns = columns
+        self._frame = None
+
+    def upsert(self, rows):
+        """Inserta o reemplaza filas (tuplas de values_list(*DB_FIELDS)) manteniendo el orden."""
+        if not self.loaded:
+            return
+        # Si un id se repite gana la última versión
+        rows = {values[0]: _row_values(values) for values in rows}
+        if not rows:
+            return
+        new = np.array(list(rows.values()), dtype=np.int64).reshape(-1, len(ROW_COLUMNS))
+        with self.lock:
+            columns = self.columns
+            positions = np.flatnonzero(np.isin(columns['id'], new[:, 0]))
+            by_id = {pk: index for index, pk in enumerate(new[:, 0].tolist())}
+            matched = new[[by_id[pk] for pk in columns['id'][positions].tolist()]]
+            # Caso común (editar un ticket sin cambiar dev ni fecha): se reescribe en el lugar
+            same_place = (columns['developer_id'][positions] == matched[:, 1]) & (columns['day'][positions] == matched[:, 2])
+            for index, name in enumerate(ROW_COLUMNS):
+                columns[name][positions[same_place]] = matched[same_place, index]
+            self._frame = None
+
+            moved = positions[~same_place]
+            inserted = new[~np.isin(new[:, 0], columns['id'][positions[same_place]])]
+            if not len(inserted):
+                return
+            if len(moved):
+                columns = {name: np.delete(values, moved) for name, values in columns.items()}
+            inserted = inserted[np.lexsort((inserted[:, 0], inserted[:, 2], inserted[:, 1]))]
+            slots = np.searchsorted(
+                _sort_keys(columns['developer_id'], columns['day']), _sort_keys(inserted[:, 1], inserted[:, 2]), 'right'
+            )
+            self._set_columns({
+                name: np.insert(columns[name], slots, inserted[:, index].astype(np.int32))
+                for index, name in enumerate(ROW_COLUMNS)
+            })
+
+    def remove(self, ids):
+        if not self.loaded or not len(ids):
+            return
+        with self.lock:
+            positions = np.flatnonzero(np.isin(self.columns['id'], ids))
+            if len(positions):
+                self._set_columns({name: np.delete(values, positions) for name, values in self.columns.items()})
+
+    def enqueue(self, upserted=(), removed=()):
+        """Cambios de este proceso: se aplican en lote antes de la próxima consulta."""
+        if self.loaded:
+            with self.lock:
+                self.pending.append((list(upserted), list(removed)))
+
+    def _apply_pending(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+            for upserted, removed in pending:
+                self.upsert(upserted)
+                self.remove(np.array(removed, dtype=np.int64))
+
+    def frame(self):
+        frame = self._frame
+        if frame is None:
+            with self.lock:
+                frame = self._frame = _DailyFrame(self.columns)
+        return frame
+
+    # --- Consultas ---
+
+    def general_summary(self):
+        self.sync()
+        developers, _, sums = self.frame().grouped()
+        totals = dict(zip(developers.tolist(), sums))
+        empty = np.zeros(len(SUM_COLUMNS), dtype=np.int64)
+        return [
+            summary_row({'id': pk, 'name': name, **_annotations(totals.get(pk, empty))})
+            for pk, (name, _) in sorted(self.developers.items())
+        ]
+
+    def developer_totals(self, dev_id, start_date=None, end_date=None):
+        """Totales del reporte del desarrollador (None si no existe)."""
+        self.sync()
+        if dev_id not in self.developers:
+            return None
+        start_day, end_day = (_day(value) if value else None for value in parse_date_range(start_date, end_date))
+        frame = self.frame()
+        return report_totals(dev_id, _annotations(frame.totals(*frame.span(dev_id, start_day, end_day))))
+
+    def aggregates(self, group_by=('rol',), start_date=None, end_date=None):
+        self.sync()
+        start_day, end_day = (_day(value) if value else None for value in parse_date_range(start_date, end_date))
+        buckets = tuple(level for level in group_by if level in BUCKETS)
+        developers, periods, sums = self.frame().grouped(buckets, start_day, end_day)
+        period_of = dict(zip(buckets, periods))
+
+        # Columnas de la llave en el mismo orden que el ORDER BY del ORM (rol primero)
+        roles = sorted({rol for _, rol in self.developers.values()})
+        rol_code = {rol: code for code, rol in enumerate(roles)}
+        keys, columns = [], []
+        if 'rol' in group_by:
+            keys.append('rol')
+            columns.append(np.array([rol_code[self.developers[pk][1]] for pk in developers.tolist()], dtype=np.int64))
+        for level in group_by:
+            if level == 'developer':
+                keys += list(AGGREGATE_GROUPS['developer'])
+                columns.append(developers)
+            elif level in BUCKETS:
+                keys.append(level)
+                columns.append(period_of[level])
+        if not len(sums):
+            return []
+
+        groups, inverse = np.unique(np.column_stack(columns), axis=0, return_inverse=True)
+        totals = np.zeros((len(groups), len(SUM_COLUMNS)), dtype=np.int64)
+        np.add.at(totals, inverse.ravel(), sums)
+
+        rows = []
+        for group, group_sums in zip(groups.tolist(), totals):
+            values = iter(group)
+            row = {}
+            for key in keys:
+                if key == 'rol':
+                    row[key] = roles[next(values)]
+                elif key == 'developer_id':
+                    row[key] = next(values)
+                elif key == 'developer_name':
+                    row[key] = self.developers[row['developer_id']][0]
+                else:
+                    row[key] = _date(next(values))
+            rows.append(aggregate_row({**row, **_annotations(group_sums)}, keys))
+        return rows
+
+
+store = ColumnStore()
+
+
+# --- Mismas firmas que las funciones de reports.py ---
+
+def build_general_summary():
+    return store.general_summary()
+
+
+def build_developer_report(dev_id, start_date=None, end_date=None, include_list=True, fields=None):
+    found = build_developer_reports([dev_id], start_date, end_date, include_list, fields)
+    return found[0] if found else None
+
+
+def build_developer_reports(dev_ids=None, start_date=None, end_date=None, include_list=True, fields=None):
+    if dev_ids is None:
+        store.sync()
+        dev_ids = sorted(store.developers)
+    found = {}
+    for dev_id in dev_ids:
+        data = store.developer_totals(dev_id, start_date, end_date)
+        if data is not None:
+            found[dev_id] = data
+    if found and include_list:
+        # La lista de tickets (con descripción) se sigue leyendo de la BD
+        reports.attach_requirement_lists(found, start_date, end_date, fields)
+    return list(found.values())
+
+
+def build_aggregates(group_by=('rol',), start_date=None, end_date=None):
+    return store.aggregates(group_by, start_date, end_date)
+
+
+def metrics_backend():
+    """Módulo con las funciones build_* del backend configurado en METRICS_BACKEND."""
+    backend = settings.METRICS_BACKEND
+    if backend not in BACKENDS:
+        raise ImproperlyConfigured(f"METRICS_BACKEND inválido: {backend}. Opciones: {', '.join(BACKENDS)}")
+    if backend == 'orm':
+        return reports
+    if np is None:
+        raise ImproperlyConfigured("METRICS_BACKEND='engine' requiere NumPy.")
+    from . import engine
+    return engine
+
+
+def db_values(instance):
+    """Tupla de values_list(*DB_FIELDS) de una instancia (para aplicarla después del commit)."""
+    return tuple(getattr(instance, name) for name in DB_FIELDS)
+
+
+def requirement_saved(values):
+    """Registra un guardado hecho en este proceso (si la copia ya está cargada)."""
+    store.enqueue(upserted=[values])
+
+
+def requirement_deleted(pk):
+    store.enqueue(removed=[pk])
@@ -0,0 +1,162 @@
+# metrics/exports.py
+"""
+Exportación de la matriz de resumen y de los tickets de un desarrollador (CSV, XLSX, Parquet).
+
+Las filas salen de las mismas funciones que usan las vistas (build_general_summary y
+requirement_rows), así que los números coinciden con el Dashboard.
+- CSV se genera y se envía por bloques con StreamingHttpResponse.
+- XLSX (openpyxl) y Parquet (pyarrow) necesitan el archivo completo para cerrarlo: se
+  escriben por lotes a un archivo temporal en disco y se envían desde ahí. En ningún
+  caso se tiene en memoria todo el resultado ni el archivo armado.
+openpyxl y pyarrow son opcionales.
+"""
+import csv
+import io
+import tempfile
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+
+from django.http import FileResponse, StreamingHttpResponse
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl es opcional
+    openpyxl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional
+    pa = pq = None
+
+FORMATS = ('csv', 'xlsx', 'parquet')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Filas por bloque enviado (CSV) o por lote escrito al archivo temporal (XLSX/Parquet)
+CHUNK_ROWS = 2000
+
+
+class ExportUnavailable(Exception):
+    """Falta la librería opcional que necesita el formato pedido."""
+
+
+def _batches(rows, size=CHUNK_ROWS):
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# En las filas de la API estas columnas vienen como string (igual que el DecimalField y el
+# DateField de DRF): en los formatos binarios se guardan como número o fecha para poder operar con ellas.
+DECIMAL_STRING_COLUMNS = ('estimated_effort_hours',)
+DATE_STRING_COLUMNS = ('date_completed',)
+
+
+def _cell_getters(columns):
+    return [
+        (lambda row, name=name: Decimal(row[name])) if name in DECIMAL_STRING_COLUMNS
+        else (lambda row, name=name: None if row[name] is None else date.fromisoformat(row[name]))
+        if name in DATE_STRING_COLUMNS
+        else (lambda row, name=name: row[name])
+        for name in columns
+    ]
+
+
+def _parquet_schema(columns):
+    """
+    Esquema Parquet de las columnas exportadas, declarado según los campos del modelo (no
+    inferido de un lote: un lote posterior puede traer otra escala de decimales o un
+    porcentaje entero). Los conteos del resumen y de los tickets son enteros y los `*_pct`,
+    porcentajes.
+    """
+    # Las horas son DecimalField(6, 2) y la diferencia con las horas reales puede crecer: 12 dígitos
+    hours = pa.decimal128(12, 2)
+    types = {
+        'name': pa.string(),
+        'jira_ticket': pa.string(),
+        'description': pa.string(),
+        'status_display': pa.string(),
+        'date_completed': pa.date32(),
+        'is_qa_approved': pa.bool_(),
+        'estimated_effort_hours': hours,
+        'deviation_hours': hours,
+        'unit_test_success_rate': pa.float64(),
+    }
+    return pa.schema([
+        pa.field(name, types.get(name, pa.float64() if name.endswith('_pct') else pa.int64()))
+        for name in columns
+    ])
+
+
+# --- Escritores ---
+
+def csv_chunks(columns, rows):
+    """Genera el CSV por bloques de CHUNK_ROWS filas."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in _batches(rows):
+        writer.writerows([row[name] for name in columns] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def write_xlsx(handle, columns, rows, title):
+    """Escribe el XLSX en modo write_only (las filas no se acumulan en memoria)."""
+    if openpyxl is None:
+        raise ExportUnavailable("La exportación XLSX requiere openpyxl.")
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(list(columns))
+    getters = _cell_getters(columns)
+    for row in rows:
+        sheet.append([get(row) for get in getters])
+    workbook.save(handle)
+
+
+def write_parquet(handle, columns, rows):
+    """Escribe el Parquet por row groups de CHUNK_ROWS filas."""
+    if pq is None:
+        raise ExportUnavailable("La exportación Parquet requiere pyarrow.")
+    schema = _parquet_schema(columns)
+    getters = _cell_getters(columns)
+    with pq.ParquetWriter(handle, schema) as writer:
+        for batch in _batches(rows):
+            data = {name: [get(row) for row in batch] for name, get in zip(columns, getters)}
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+
+
+def export_response(fmt, filename, columns, rows, title='Datos'):
+    """
+    Respuesta HTTP con las filas en el formato pedido. `rows` puede ser un generador.
+    Lanza ValueError si el formato no existe y ExportUnavailable si falta la librería.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}. Opciones: {', '.join(FORMATS)}")
+    attachment = f'{filename}.{fmt}'
+
+    if fmt == 'csv':
+        response = StreamingHttpResponse(csv_chunks(columns, rows), content_type=CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{attachment}"'
+        return response
+
+    handle = tempfile.TemporaryFile()
+    try:
+        if fmt == 'xlsx':
+            write_xlsx(handle, columns, rows, title)
+        else:
+            write_parquet(handle, columns, rows)
+    except BaseException:
+        handle.close()
+        raise
+    handle.seek(0)
+    # FileResponse envía el archivo por bloques y lo cierra (y borra) al terminar
+    return FileResponse(handle, as_attachment=True, filename=attachment, content_type=CONTENT_TYPES[fmt])
@@ -0,0 +1,291 @@
+# metrics/ingest.py
+"""
+Importación masiva de requerimientos desde exportaciones de Jira (CSV o JSONL).
+
+El archivo se procesa como una cadena de generadores (leer -> validar -> lotes), así
+que nunca se carga entero en memoria: sólo vive un lote de `batch_size` filas a la vez.
+Cada lote se guarda en su propia transacción con un upsert por `jira_ticket`
+(bulk_create con update_conflicts), calculando las columnas derivadas por lote en vez
+de llamar a save() fila por fila.
+
+Columnas esperadas: los nombres de campo de Requirement más `developer_email`
+(el desarrollador se busca por correo). `jira_ticket` y `developer_email` son obligatorias.
+"""
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from . import changes
+from .effort import EFFORT_FIELDS, business_days_batch, effort_from_days
+from .models import Developer, Requirement
+from .rollups import refresh_rollups
+from .signals import all_data_changed
+
+FORMATS = ('csv', 'jsonl')
+
+INTEGER_FIELDS = (
+    'rejection_count', 'unit_tests_total', 'unit_tests_passed',
+    'functional_cases', 'functional_bugs',
+    'integration_cases', 'integration_bugs',
+    'regression_cases', 'regression_bugs',
+    'production_bugs',
+)
+DATE_FIELDS = ('start_date_real', 'end_date_real')
+TRUE_VALUES = ('1', 'true', 'si', 'sí', 'yes', 'aprobado')
+
+# Columnas que se reescriben cuando el ticket ya existe (date_completed conserva la fecha de registro)
+UPDATE_FIELDS = (
+    'developer', 'description', 'is_qa_approved', 'estimated_effort_hours',
+    *INTEGER_FIELDS, *DATE_FIELDS, 'unit_tests_failed', *EFFORT_FIELDS, 'updated_at',
+)
+
+# Límite de Requirement.estimated_effort_hours (max_digits=6, decimal_places=2)
+MAX_ESTIMATED_HOURS = Decimal('10000')
+MAX_TICKET_LENGTH = Requirement._meta.get_field('jira_ticket').max_length
+
+# Cuántos errores de fila se devuelven como detalle (el resto sólo se cuenta)
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        return round(self.rows / self.seconds, 1) if self.seconds else 0.0
+
+    def add_error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': self.rows_per_second,
+            'errors': self.errors,
+        }
+
+
+def detect_format(filename):
+    """Formato según la extensión del archivo (.csv por defecto)."""
+    name = (filename or '').lower()
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+# --- Etapas del pipeline ---
+
+def read_records(stream, fmt):
+    """
+    Genera (número de línea, dict) desde un stream de texto CSV o JSONL. Una línea ilegible
+    se genera como (número de línea, ValueError) y la lectura sigue; si el archivo deja de
+    ser UTF-8 la lectura termina ahí (los lotes anteriores ya se guardaron).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}. Opciones: {', '.join(FORMATS)}")
+    line_num = 0
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(stream)
+            while True:
+                try:
+                    record = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as exc:
+                    record = ValueError(f"CSV inválido: {exc}")
+                line_num = reader.line_num
+                yield line_num, record
+        else:
+            for line_num, line in enumerate(stream, start=1):
+                if line.strip():
+                    try:
+                        yield line_num, json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        yield line_num, ValueError(f"JSON inválido: {exc}")
+    except UnicodeDecodeError:
+        yield line_num + 1, ValueError("El archivo debe estar en UTF-8: se dejó de leer en esta línea.")
+
+
+def _integer(record, name):
+    # Sólo enteros o strings de dígitos: int() truncaría 3.7 a 3 y convertiría true en 1
+    value = record.get(name)
+    if value in (None, ''):
+        return 0
+    if isinstance(value, int) and not isinstance(value, bool):
+        number = value
+    elif isinstance(value, str) and value.strip().isascii() and value.strip().isdigit():
+        number = int(value)
+    else:
+        raise ValueError(f"{name}: número inválido '{value}'")
+    if number < 0:
+        raise ValueError(f"{name} no puede ser negativo")
+    return number
+
+
+def _date(record, name):
+    value = record.get(name)
+    if value in (None, ''):
+        return None
+    parsed = value if isinstance(value, date) else parse_date(str(value))
+    if parsed is None:
+        raise ValueError(f"{name}: fecha inválida '{value}' (se espera AAAA-MM-DD)")
+    return parsed
+
+
+def clean_record(record, developer_ids):
+    """Convierte un registro crudo en un Requirement sin guardar. Lanza ValueError si es inválido."""
+    if not isinstance(record, dict):
+        raise ValueError(f"Registro inválido: {record}")
+
+    ticket = str(record.get('jira_ticket') or '').strip()
+    if not ticket:
+        raise ValueError("Falta jira_ticket")
+    if len(ticket) > MAX_TICKET_LENGTH:
+        # Si no, falla el bulk_create de todo el lote (en Postgres)
+        raise ValueError(f"jira_ticket supera los {MAX_TICKET_LENGTH} caracteres")
+    email = str(record.get('developer_email') or '').strip().lower()
+    developer_id = developer_ids.get(email)
+    if developer_id is None:
+        raise ValueError(f"Desarrollador desconocido: '{email}'")
+
+    values = {name: _integer(record, name) for name in INTEGER_FIELDS}
+    try:
+        estimated = Decimal(str(record.get('estimated_effort_hours') or 0))
+    except InvalidOperation:
+        raise ValueError(f"estimated_effort_hours: número inválido '{record.get('estimated_effort_hours')}'") from None
+    # NaN e Infinity son Decimal válidos, pero comparar NaN lanza InvalidOperation
+    if not estimated.is_finite():
+        raise ValueError(f"estimated_effort_hours: número inválido '{record.get('estimated_effort_hours')}'")
+    if not 0 <= estimated < MAX_ESTIMATED_HOURS:
+        raise ValueError(f"estimated_effort_hours fuera de rango: {estimated}")
+    if values['unit_tests_passed'] > values['unit_tests_total']:
+        raise ValueError("Las pruebas pasadas no pueden exceder el total.")
+
+    approved = record.get('is_qa_approved')
+    return Requirement(
+        developer_id=developer_id,
+        jira_ticket=ticket,
+        description=record.get('description') or '',
+        is_qa_approved=approved if isinstance(approved, bool) else str(approved).strip().lower() in TRUE_VALUES,
+        estimated_effort_hours=estimated,
+        **{name: _date(record, name) for name in DATE_FIELDS},
+        **values,
+    )
+
+
+def clean_records(records, developer_ids, result):
+    """Filtra los registros válidos; los inválidos quedan anotados en `result`."""
+    for line_num, record in records:
+        result.rows += 1
+        if isinstance(record, ValueError):  # Línea ilegible (ver read_records)
+            result.add_error(line_num, str(record))
+            continue
+        try:
+            yield clean_record(record, developer_ids)
+        except ValueError as exc:
+            result.add_error(line_num, str(exc))
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# --- Guardado ---
+
+def _fill_derived_fields(batch):
+    """Lo mismo que Requirement.save(), pero para todo el lote de una vez."""
+    days = business_days_batch([req.start_date_real for req in batch], [req.end_date_real for req in batch])
+    for req, worked in zip(batch, days):
+        req.unit_tests_failed = req.unit_tests_total - req.unit_tests_passed if req.unit_tests_total > 0 else 0
+        for name, value in effort_from_days(req.estimated_effort_hours, worked).items():
+            setattr(req, name, value)
+
+
+def save_batch(batch, result):
+    """Upsert de un lote en su propia transacción, manteniendo los rollups diarios."""
+    # Si el ticket se repite dentro del lote gana la última aparición
+    batch = list({req.jira_ticket: req for req in batch}.values())
+    _fill_derived_fields(batch)
+
+    with transaction.atomic():
+        previous = {
+            ticket: (dev_id, day)
+            for ticket, dev_id, day in Requirement.objects.filter(
+                jira_ticket__in=[req.jira_ticket for req in batch]
+            ).values_list('jira_ticket', 'developer_id', 'date_completed')
+        }
+        Requirement.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['jira_ticket'],
+            update_fields=UPDATE_FIELDS,
+        )
+
+        # Pares (dev, día) afectados: el dueño anterior y el nuevo (los nuevos se registran hoy)
+        today = date.today()
+        pairs = set(previous.values())
+        for req in batch:
+            day = previous[req.jira_ticket][1] if req.jira_ticket in previous else today
+            pairs.add((req.developer_id, day))
+        refresh_rollups(pairs)
+
+        # Registro para /api/changes/ (el dueño anterior también cambió sus totales)
+        saved = Requirement.objects.filter(
+            jira_ticket__in=[req.jira_ticket for req in batch]
+        ).values_list('jira_ticket', 'id', 'developer_id')
+        logged = []
+        for ticket, pk, developer_id in saved:
+            previous_dev_id = previous[ticket][0] if ticket in previous else developer_id
+            logged += [(pk, dev_id) for dev_id in sorted({developer_id, previous_dev_id})]
+        changes.record(changes.REQUIREMENT, changes.UPSERT, logged)
+
+    result.updated += len(previous)
+    result.created += len(batch) - len(previous)
+
+
+def import_requirements(stream, fmt='csv', batch_size=1000):
+    """
+    Importa requerimientos desde un stream de texto. Devuelve un ImportResult.
+    Los desarrolladores se resuelven por correo con una sola consulta al inicio.
+    """
+    started = time.perf_counter()
+    result = ImportResult()
+    developer_ids = {
+        email.lower(): dev_id for email, dev_id in Developer.objects.values_list('email', 'id')
+    }
+
+    requirements = clean_records(read_records(stream, fmt), developer_ids, result)
+    for batch in batched(requirements, batch_size):
+        save_batch(batch, result)
+
+    if result.created or result.updated:
+        # bulk_create no dispara señales: caché, snapshots y dashboards se avisan a mano
+        all_data_changed()
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def text_stream(binary_file, encoding='utf-8-sig'):
+    """Envuelve un archivo binario (upload o archivo abierto en 'rb') para leerlo como texto."""
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline='')
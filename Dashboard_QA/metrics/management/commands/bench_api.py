@@ -0,0 +1,122 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+
+from metrics.bench import bench_endpoint, scratch_database, seed
+
+
+def endpoints(dev_id):
+    """(nombre, url) de los endpoints medidos para el desarrollador `dev_id`."""
+    return [
+        ('summary', reverse('general-summary')),
+        ('developers', reverse('developer-list')),
+        ('report', reverse('developer-report', args=[dev_id])),
+        ('report_totals', reverse('developer-report', args=[dev_id]) + '?include_list=false'),
+        ('requirements_page', reverse('developer-requirements', args=[dev_id]) + '?limit=50'),
+        ('aggregates', reverse('aggregates') + '?group_by=rol,month'),
+        ('trends', reverse('trends') + '?bucket=week'),
+    ]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de la API de métricas: latencia p50/p95/p99, consultas SQL y pico de memoria "
+        "por endpoint y por volumen de datos, sobre una base descartable. Guarda los resultados "
+        "en JSON y puede compararlos con una corrida anterior."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000',
+                            help="Cantidades de requerimientos separadas por comas (default: 1000,10000,100000).")
+        parser.add_argument('--developers', type=int, default=20, help="Desarrolladores (default: 20).")
+        parser.add_argument('--days', type=int, default=730, help="Días hacia atrás de los datos (default: 730).")
+        parser.add_argument('--repeat', type=int, default=20, help="Peticiones por medición (default: 20).")
+        parser.add_argument('--only', help="Endpoints a medir separados por comas (default: todos).")
+        parser.add_argument('--output', help="Archivo JSON donde guardar los resultados.")
+        parser.add_argument('--compare', help="JSON de una corrida anterior para comparar p95.")
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help="%% de aumento de p95 que se marca como regresión (default: 20).")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes debe ser una lista de enteros, ej. 1000,10000")
+        only = set(options['only'].split(',')) if options['only'] else None
+
+        results = []
+        for size in sizes:
+            with scratch_database():
+                self.stdout.write(f"--- {size} requerimientos ---")
+                dev_id = seed(developers=options['developers'], requirements=size, days=options['days'])[0]
+                for name, url in endpoints(dev_id):
+                    if only and name not in only:
+                        continue
+                    for mode in ('cold', 'warm'):
+                        stats = bench_endpoint(url, repeat=options['repeat'], warm=mode == 'warm')
+                        results.append({'requirements': size, 'endpoint': name, 'mode': mode, **stats})
+                        self.stdout.write(
+                            f"{name:<18} {mode:<5} p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  "
+                            f"p99 {stats['p99_ms']:8.2f} ms  {stats['queries']:3d} consultas  "
+                            f"pico {stats['peak_kb']:9.1f} KB"
+                        )
+
+        run = {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'developers': options['developers'],
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(run, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Resultados guardados en {options['output']}"))
+        if options['compare']:
+            self.compare(run, options['compare'], options['threshold'])
+
+    def compare(self, run, path, threshold):
+        try:
+            with open(path, encoding='utf-8') as handle:
+                baseline = json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"No se pudo leer {path}: {exc}")
+
+        previous = {(r['requirements'], r['endpoint'], r['mode']): r for r in baseline['results']}
+        self.stdout.write(f"--- Comparación con {baseline.get('commit') or path} (p95) ---")
+        regressions = 0
+        for result in run['results']:
+            before = previous.get((result['requirements'], result['endpoint'], result['mode']))
+            if not before or not before['p95_ms']:
+                continue
+            change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+            line = (
+                f"{result['requirements']:>8} {result['endpoint']:<18} {result['mode']:<5} "
+                f"{before['p95_ms']:8.2f} -> {result['p95_ms']:8.2f} ms ({change:+.1f}%)"
+            )
+            if change > threshold or result['queries'] > before['queries']:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line + "  ⚠️ regresión"))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f"❌ {regressions} mediciones empeoraron más de {threshold}% (o con más consultas).")
+        self.stdout.write(self.style.SUCCESS("✅ Sin regresiones."))
@@ -0,0 +1,61 @@
+import csv
+import io
+
+from django.core.management.base import BaseCommand
+
+from metrics.bench import measure, scratch_database, seed
+from metrics.exports import FORMATS, ExportUnavailable, export_response
+from metrics.models import Requirement
+from metrics.reports import REQUIREMENT_FIELDS, requirement_rows
+
+
+def consume(response):
+    """Lee la respuesta como lo haría el servidor y devuelve los bytes enviados."""
+    size = 0
+    for chunk in response:
+        size += len(chunk)
+    response.close()
+    return size
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide tiempo y memoria de las exportaciones de tickets (CSV/XLSX/Parquet) "
+        "sobre una base descartable con datos sintéticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="Tickets a exportar (default: 100000).")
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with scratch_database():
+            seed(developers=1, requirements=rows)
+            queryset = Requirement.objects.order_by('id')
+
+            def materialized():
+                # Referencia: armar toda la lista y el archivo completo en memoria
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, REQUIREMENT_FIELDS)
+                writer.writeheader()
+                writer.writerows(list(requirement_rows(queryset)))
+                return len(buffer.getvalue().encode())
+
+            size, seconds, peak = measure(materialized)
+            self.report('csv (en memoria)', rows, size, seconds, peak)
+
+            for fmt in FORMATS:
+                try:
+                    size, seconds, peak = measure(lambda: consume(
+                        export_response(fmt, 'bench', REQUIREMENT_FIELDS, requirement_rows(queryset))
+                    ))
+                except ExportUnavailable as exc:
+                    self.stdout.write(self.style.WARNING(f"{fmt:<18} omitido: {exc}"))
+                    continue
+                self.report(fmt, rows, size, seconds, peak)
+
+    def report(self, label, rows, size, seconds, peak):
+        self.stdout.write(
+            f"{label:<18} {seconds:7.2f} s  {rows / seconds:9.0f} filas/s  "
+            f"{size / 2**20:7.1f} MB  pico de memoria {peak:6.1f} MB"
+        )
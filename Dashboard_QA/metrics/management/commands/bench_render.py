@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from metrics import renderers
+from metrics.bench import percentile, scratch_database, seed, timed
+from metrics.reports import build_developer_report
+from qa_dashboard.middleware import CompressionMiddleware, brotli
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el JSONRenderer de DRF con FastJSONRenderer (y la compresión gzip/brotli) "
+        "sobre el reporte de un desarrollador con datos sintéticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Tickets del desarrollador (default: 10000).")
+        parser.add_argument('--repeat', type=int, default=20, help="Repeticiones por renderer (default: 20).")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            dev_id = seed(developers=1, requirements=options['rows'])[0]
+            data = build_developer_report(dev_id)
+
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING("orjson no está instalado: FastJSONRenderer usa el renderer de DRF."))
+
+        outputs = {}
+        for label, renderer in (('DRF JSONRenderer', JSONRenderer()), ('FastJSONRenderer', renderers.FastJSONRenderer())):
+            outputs[label], timings = timed(lambda: renderer.render(data), options['repeat'])
+            self.report(label, len(outputs[label]), timings)
+
+        baseline, fast = outputs.values()
+        if json.loads(baseline) != json.loads(fast):
+            raise CommandError("❌ Los renderers no producen el mismo JSON.")
+
+        compressors = [('gzip', lambda: compress_string(fast, max_random_bytes=CompressionMiddleware.max_random_bytes))]
+        if brotli is not None:
+            compressors.append(('brotli', lambda: brotli.compress(fast, quality=CompressionMiddleware.brotli_quality)))
+        else:
+            self.stdout.write(self.style.WARNING("brotli no está instalado: se mide sólo gzip."))
+        for label, compress in compressors:
+            compressed, timings = timed(compress, options['repeat'])
+            self.report(f"+ {label}", len(compressed), timings, f"  ({len(compressed) / len(fast):.0%} del original)")
+
+        self.stdout.write(self.style.SUCCESS("✅ JSON idéntico en ambos renderers."))
+
+    def report(self, label, size, timings, extra=''):
+        p50 = percentile(timings, 50)
+        self.stdout.write(
+            f"{label:<18} p50 {p50 * 1000:7.2f} ms  p95 {percentile(timings, 95) * 1000:7.2f} ms  "
+            f"{size / 2**20:6.2f} MB  {size / p50 / 2**20:8.1f} MB/s{extra}"
+        )
@@ -0,0 +1,36 @@
+from statistics import median
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from metrics.bench import legacy_developer_report, scratch_database, seed, timed
+from metrics.reports import build_developer_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el reporte de un desarrollador (implementación anterior vs actual) "
+        "sobre una base descartable con datos sintéticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Tickets del desarrollador (default: 10000).")
+        parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por implementación (default: 5).")
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        with scratch_database():
+            dev_id = seed(developers=1, requirements=options['rows'])[0]
+
+            legacy, legacy_times = timed(lambda: legacy_developer_report(dev_id), options['repeat'])
+            fast, fast_times = timed(lambda: build_developer_report(dev_id), options['repeat'])
+
+        if renderer.render(legacy) != renderer.render(fast):
+            raise CommandError("❌ Las respuestas no son idénticas.")
+
+        legacy_ms = median(legacy_times) * 1000
+        fast_ms = median(fast_times) * 1000
+        self.stdout.write(f"Filas:    {options['rows']}")
+        self.stdout.write(f"Anterior: {legacy_ms:.1f} ms (mediana)")
+        self.stdout.write(f"Actual:   {fast_ms:.1f} ms (mediana)")
+        self.stdout.write(self.style.SUCCESS(f"✅ JSON idéntico, {legacy_ms / fast_ms:.1f}x más rápido."))
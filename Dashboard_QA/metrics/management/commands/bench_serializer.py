@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from metrics.bench import percentile, scratch_database, seed, timed
+from metrics.models import Requirement
+from metrics.reports import REQUIREMENT_ROW_COLUMNS, requirement_row, requirement_rows
+from metrics.serializers import RequirementSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara RequirementSerializer (DRF) con RowSerializer "
+        "serializando los tickets de un desarrollador con datos sintéticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Tickets a serializar (default: 10000).")
+        parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por serializer (default: 5).")
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        with scratch_database():
+            seed(developers=1, requirements=options['rows'])
+            queryset = Requirement.objects.order_by('id')
+            instances = list(queryset)
+            values = list(queryset.values(*REQUIREMENT_ROW_COLUMNS))
+
+            self.stdout.write("Sólo serialización (filas ya cargadas):")
+            baseline, drf_timings = timed(lambda: RequirementSerializer(instances, many=True).data, repeat)
+            rows, fast_timings = timed(lambda: list(map(requirement_row, values)), repeat)
+            self.compare(len(values), drf_timings, fast_timings)
+
+            self.stdout.write("Consulta + serialización (modelos vs values()):")
+            _, drf_timings = timed(lambda: RequirementSerializer(queryset.all(), many=True).data, repeat)
+            _, fast_timings = timed(lambda: list(requirement_rows(queryset.all())), repeat)
+            self.compare(len(values), drf_timings, fast_timings)
+
+        if [dict(row) for row in baseline] != rows:
+            raise CommandError("❌ Las filas no coinciden con las de RequirementSerializer.")
+        self.stdout.write(self.style.SUCCESS("✅ Filas idénticas a las de RequirementSerializer."))
+
+    def compare(self, rows, drf_timings, fast_timings):
+        drf_rate = self.report('RequirementSerializer', rows, drf_timings)
+        fast_rate = self.report('RowSerializer', rows, fast_timings)
+        self.stdout.write(f"  {fast_rate / drf_rate:.1f}x más filas/s")
+
+    def report(self, label, rows, timings):
+        p50 = percentile(timings, 50)
+        self.stdout.write(f"  {label:<22} p50 {p50 * 1000:8.1f} ms  {rows / p50:10.0f} filas/s")
+        return rows / p50
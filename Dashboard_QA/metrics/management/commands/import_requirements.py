@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from metrics.ingest import FORMATS, detect_format, import_requirements, text_stream
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa requerimientos desde un CSV o JSONL (exportación de Jira). "
+        "Crea o actualiza por jira_ticket, por lotes y sin cargar el archivo entero en memoria."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archivo a importar.")
+        parser.add_argument('--format', choices=FORMATS, help="Formato del archivo (default: según la extensión).")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Filas por transacción (default: 1000).")
+        parser.add_argument('--encoding', default='utf-8-sig', help="Codificación del archivo (default: utf-8-sig).")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+        try:
+            with open(options['path'], 'rb') as handle:
+                result = import_requirements(
+                    text_stream(handle, options['encoding']), fmt, batch_size=options['batch_size']
+                )
+        except OSError as exc:
+            raise CommandError(f"No se pudo leer el archivo: {exc}")
+
+        for error in result.errors:
+            self.stderr.write(f"Línea {error['line']}: {error['error']}")
+        if result.failed > len(result.errors):
+            self.stderr.write(f"... y {result.failed - len(result.errors)} errores más.")
+        self.stdout.write(
+            f"Filas: {result.rows} | Creadas: {result.created} | Actualizadas: {result.updated} "
+            f"| Con error: {result.failed}"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Importación terminada en {result.seconds:.1f} s ({result.rows_per_second} filas/s)."
+        ))
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from metrics.changes import prune
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra del registro de cambios (/api/changes/) las entradas más viejas que la retención. "
+        "Los clientes con un cursor anterior reciben `reset: true` y recargan todo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.CHANGELOG_RETENTION_DAYS,
+            help=f"Días de cambios a conservar (default: {settings.CHANGELOG_RETENTION_DAYS}).",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"✅ {deleted} cambios borrados (se conservan {options['days']} días)."))
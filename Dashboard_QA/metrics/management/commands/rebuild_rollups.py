@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from metrics.rollups import rebuild_rollups
+from metrics.signals import all_data_changed
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenera la tabla de rollups diarios desde los requerimientos "
+        "(ej. después de cargas masivas o updates que no disparan señales)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help="Filas por lote (default: 2000).")
+
+    def handle(self, *args, **options):
+        total = rebuild_rollups(batch_size=options['batch_size'])
+        all_data_changed()
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} filas de rollup regeneradas."))
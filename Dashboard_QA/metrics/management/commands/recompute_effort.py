@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from metrics import changes
+from metrics.effort import recompute_effort_columns
+from metrics.models import Requirement
+from metrics.rollups import rebuild_rollups
+from metrics.signals import all_data_changed
+
+
+class Command(BaseCommand):
+    help = "Recalcula las columnas de esfuerzo (días/horas reales, diferencia y desvío) por lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Filas por lote (default: 2000).")
+
+    def handle(self, *args, **options):
+        total = recompute_effort_columns(Requirement, chunk_size=options['chunk_size'], on_update=self.record_changes)
+        if total:
+            # bulk_update no dispara señales: rearmamos los rollups y avisamos del cambio a mano
+            rebuild_rollups()
+            all_data_changed()
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} requerimientos actualizados."))
+
+    @staticmethod
+    def record_changes(requirements):
+        # Para /api/changes/ y para el motor en memoria de los demás workers
+        changes.record(changes.REQUIREMENT, changes.UPSERT, [(obj.pk, obj.developer_id) for obj in requirements])
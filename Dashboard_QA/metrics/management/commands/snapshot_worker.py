@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from metrics.snapshots import run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker que regenera los snapshots de métricas marcados como desactualizados "
+        "(resumen, agregados y reporte de cada desarrollador)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=2.0, help="Segundos entre revisiones (default: 2).")
+        parser.add_argument('--once', action='store_true', help="Regenera una sola vez y termina.")
+
+    def handle(self, *args, **options):
+        rebuilt = run_worker(interval=options['interval'], once=options['once'], stdout=self.stdout)
+        if options['once']:
+            self.stdout.write(self.style.SUCCESS(f"✅ {rebuilt} snapshots regenerados."))
@@ -0,0 +1,69 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:03
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# Copia del cálculo de metrics.effort tal como estaba al escribir esta migración: el
+# historial no tiene que cambiar (ni romperse) cuando cambia el código de la app.
+HOURS_PER_DAY = 9
+EFFORT_FIELDS = ('real_effort_days', 'real_effort_hours', 'hours_diff', 'deviation_percentage')
+BATCH_SIZE = 2000
+
+
+def business_days(start, end):
+    """Días laborales (Lunes a Viernes) entre `start` y `end`, ambos inclusive."""
+    if not start or not end or end < start:
+        return 0
+    full_weeks, remainder = divmod((end - start).days + 1, 7)
+    first = start.weekday()
+    last = first + remainder
+    return full_weeks * 5 + max(0, min(last, 5) - first) + max(0, min(last - 7, 5))
+
+
+def backfill_effort_columns(apps, schema_editor):
+    Requirement = apps.get_model('metrics', 'Requirement')
+    batch = []
+    for obj in Requirement.objects.only('pk', 'estimated_effort_hours', 'start_date_real', 'end_date_real').iterator(chunk_size=BATCH_SIZE):
+        estimated = Decimal(obj.estimated_effort_hours)
+        obj.real_effort_days = business_days(obj.start_date_real, obj.end_date_real)
+        obj.real_effort_hours = obj.real_effort_days * HOURS_PER_DAY
+        obj.hours_diff = estimated - Decimal(obj.real_effort_hours)
+        obj.deviation_percentage = round((obj.hours_diff / estimated) * 100, 2) if estimated != 0 else Decimal(0)
+        batch.append(obj)
+        if len(batch) >= BATCH_SIZE:
+            Requirement.objects.bulk_update(batch, EFFORT_FIELDS)
+            batch = []
+    if batch:
+        Requirement.objects.bulk_update(batch, EFFORT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0005_alter_requirement_jira_ticket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requirement',
+            name='deviation_percentage',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Desvío (%)'),
+        ),
+        migrations.AddField(
+            model_name='requirement',
+            name='hours_diff',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, max_digits=10, verbose_name='Diferencia (Hrs)'),
+        ),
+        migrations.AddField(
+            model_name='requirement',
+            name='real_effort_days',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Días Reales'),
+        ),
+        migrations.AddField(
+            model_name='requirement',
+            name='real_effort_hours',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Esfuerzo Real (Hrs)'),
+        ),
+        migrations.RunPython(backfill_effort_columns, migrations.RunPython.noop),
+    ]
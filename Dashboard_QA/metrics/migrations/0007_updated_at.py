@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0006_requirement_effort_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='developer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última Modificación'),
+        ),
+        migrations.AddField(
+            model_name='requirement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última Modificación'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='requirement',
+            index=models.Index(fields=['developer', 'date_completed', 'id'], name='req_dev_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requirement',
+            index=models.Index(condition=models.Q(('is_qa_approved', True)), fields=['date_completed'], name='req_approved_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requirement',
+            index=models.Index(condition=models.Q(('is_qa_approved', False)), fields=['date_completed'], name='req_pending_date_idx'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copia de metrics.rollups.rebuild_rollups tal como estaba al escribir esta migración: el
+# historial no tiene que cambiar (ni romperse) cuando cambia el código de la app.
+SUMMED_FIELDS = (
+    'rejection_count',
+    'unit_tests_total', 'unit_tests_passed', 'unit_tests_failed',
+    'functional_cases', 'functional_bugs',
+    'integration_cases', 'integration_bugs',
+    'regression_cases', 'regression_bugs',
+    'production_bugs',
+    'estimated_effort_hours', 'real_effort_hours',
+)
+BATCH_SIZE = 2000
+
+
+def build_rollups(apps, schema_editor):
+    Requirement = apps.get_model('metrics', 'Requirement')
+    RequirementDailyRollup = apps.get_model('metrics', 'RequirementDailyRollup')
+    totals = (
+        Requirement.objects
+        .order_by()
+        .values('developer_id', 'date_completed')
+        .annotate(
+            total_reqs=models.Count('id'),
+            open_reqs=models.Count('id', filter=models.Q(is_qa_approved=False)),
+            **{name: models.Sum(name) for name in SUMMED_FIELDS},
+        )
+    )
+    batch = []
+    for row in totals.iterator(chunk_size=BATCH_SIZE):
+        batch.append(RequirementDailyRollup(
+            developer_id=row['developer_id'],
+            day=row['date_completed'],
+            total_reqs=row['total_reqs'],
+            open_reqs=row['open_reqs'],
+            **{name: row[name] for name in SUMMED_FIELDS},
+        ))
+        if len(batch) >= BATCH_SIZE:
+            RequirementDailyRollup.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        RequirementDailyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0008_requirement_report_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequirementDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Día')),
+                ('total_reqs', models.PositiveIntegerField(default=0, verbose_name='Requerimientos')),
+                ('open_reqs', models.PositiveIntegerField(default=0, verbose_name='Pendientes de QA')),
+                ('rejection_count', models.PositiveIntegerField(default=0, verbose_name='Rechazos QA')),
+                ('unit_tests_total', models.PositiveIntegerField(default=0, verbose_name='Total Unitarias')),
+                ('unit_tests_passed', models.PositiveIntegerField(default=0, verbose_name='Unitarias Pasadas')),
+                ('unit_tests_failed', models.PositiveIntegerField(default=0, verbose_name='Unitarias Fallidas')),
+                ('functional_cases', models.PositiveIntegerField(default=0, verbose_name='Casos Funcionales')),
+                ('functional_bugs', models.PositiveIntegerField(default=0, verbose_name='Bugs Funcionales')),
+                ('integration_cases', models.PositiveIntegerField(default=0, verbose_name='Casos Integración')),
+                ('integration_bugs', models.PositiveIntegerField(default=0, verbose_name='Bugs Integración')),
+                ('regression_cases', models.PositiveIntegerField(default=0, verbose_name='Casos Regresión')),
+                ('regression_bugs', models.PositiveIntegerField(default=0, verbose_name='Bugs Regresión')),
+                ('production_bugs', models.PositiveIntegerField(default=0, verbose_name='Bugs en Producción')),
+                ('estimated_effort_hours', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Esfuerzo Estimado (Hrs)')),
+                ('real_effort_hours', models.PositiveIntegerField(default=0, verbose_name='Esfuerzo Real (Hrs)')),
+                ('developer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='metrics.developer', verbose_name='Desarrollador')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario',
+                'verbose_name_plural': 'Resúmenes Diarios',
+                'indexes': [models.Index(fields=['day'], name='rollup_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('developer', 'day'), name='rollup_developer_day_unique')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
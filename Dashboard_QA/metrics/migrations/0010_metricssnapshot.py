@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0009_requirementdailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=100, unique=True, verbose_name='Scope')),
+                ('payload', models.JSONField(blank=True, null=True, verbose_name='Respuesta')),
+                ('dirty', models.BooleanField(db_index=True, default=True, verbose_name='¿Desactualizado?')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Versión')),
+                ('dirtied_at', models.DateTimeField(blank=True, null=True, verbose_name='Desactualizado desde')),
+                ('built_at', models.DateTimeField(blank=True, null=True, verbose_name='Generado')),
+            ],
+            options={
+                'verbose_name': 'Snapshot de Métricas',
+                'verbose_name_plural': 'Snapshots de Métricas',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('metrics', '0010_metricssnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Secuencia')),
+                ('entity', models.CharField(choices=[('developer', 'Desarrollador'), ('requirement', 'Requerimiento')], max_length=20, verbose_name='Entidad')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID')),
+                ('action', models.CharField(choices=[('upsert', 'Alta / Modificación'), ('delete', 'Baja')], max_length=10, verbose_name='Acción')),
+                ('developer_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Desarrollador')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Fecha')),
+            ],
+            options={
+                'verbose_name': 'Cambio',
+                'verbose_name_plural': 'Cambios',
+            },
+        ),
+    ]
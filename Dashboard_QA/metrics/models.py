@@ -1,9 +1,12 @@
 # metrics/models.py
-from datetime import timedelta
 from django.db import models
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 
+from .effort import effort_fields
+
 class Developer(models.Model):
     """Representa a cada desarrollador en el equipo."""
     name = models.CharField(max_length=100, verbose_name="Nombre Completo")
@@ -23,6 +26,7 @@ class Developer(models.Model):
         default=RolChoices.DEV_JUNIOR,
         verbose_name='Rol'
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última Modificación")
 
     def __str__(self):
         return f"{self.name} | {self.get_rol_display()}"
@@ -31,6 +35,38 @@ class Developer(models.Model):
         verbose_name = "Desarrollador"
         verbose_name_plural = "Desarrolladores"
 
+class RequirementQuerySet(models.QuerySet):
+    def effort_totals(self):
+        """Totales de esfuerzo calculados en la BD (sin cargar filas)."""
+        return self.aggregate(
+            total_estimated_hours=Coalesce(Sum('estimated_effort_hours'), Decimal(0)),
+            total_real_hours=Coalesce(Sum('real_effort_hours'), 0),
+            total_hours_diff=Coalesce(Sum('hours_diff'), Decimal(0)),
+        )
+
+    def over_budget(self):
+        """Tickets que tardaron más de lo estimado, del más excedido al menos."""
+        return self.filter(hours_diff__lt=0).order_by(F('hours_diff').asc(), 'pk')
+
+
+# --- Cálculos por ticket ---
+# Los usan tanto el modelo como RequirementSerializer/RowSerializer, sobre columnas sueltas
+
+def success_rate(passed, total):
+    """Porcentaje de pruebas unitarias pasadas (0.0 si no hay pruebas)."""
+    if total == 0: return 0.0
+    return round((passed / total) * 100, 2)
+
+
+def deviation_hours(estimated_hours, real_hours):
+    """Horas estimadas menos horas reales (negativo si tardó más de lo estimado)."""
+    return estimated_hours - real_hours
+
+
+def status_display(is_qa_approved):
+    return "APROBADO" if is_qa_approved else "REVISIÓN"
+
+
 class Requirement(models.Model):
     """Representa un requerimiento (ticket de Jira) con sus métricas de calidad."""
     
@@ -61,6 +97,16 @@ class Requirement(models.Model):
     start_date_real = models.DateField(null=True, blank=True, verbose_name="Fecha Inicio Real")
     end_date_real = models.DateField(null=True, blank=True, verbose_name="Fecha Fin Real")
 
+    # Columnas derivadas del esfuerzo (se recalculan en save(), igual que unit_tests_failed)
+    real_effort_days = models.PositiveIntegerField(default=0, editable=False, db_index=True, verbose_name="Días Reales")
+    real_effort_hours = models.PositiveIntegerField(default=0, editable=False, db_index=True, verbose_name="Esfuerzo Real (Hrs)")
+    hours_diff = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False, db_index=True, verbose_name="Diferencia (Hrs)"
+    )
+    deviation_percentage = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False, db_index=True, verbose_name="Desvío (%)"
+    )
+
     # 3. Métricas QA
     functional_cases = models.PositiveIntegerField(default=0, verbose_name="Casos Funcionales")
     functional_bugs = models.PositiveIntegerField(default=0, verbose_name="Bugs Funcionales")
@@ -70,6 +116,29 @@ class Requirement(models.Model):
     regression_bugs = models.PositiveIntegerField(default=0, verbose_name="Bugs Regresión")
     production_bugs = models.PositiveIntegerField(default=0, verbose_name="Bugs en Producción")
 
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última Modificación")
+
+    objects = RequirementQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Reportes por desarrollador y rango de fechas (+ id para la paginación keyset)
+            models.Index(fields=['developer', 'date_completed', 'id'], name='req_dev_date_idx'),
+            # Filtros del admin por estado QA + fecha. Son parciales porque Django filtra los
+            # booleanos como `WHERE is_qa_approved` / `WHERE NOT is_qa_approved`, que SQLite
+            # no puede resolver con un índice compuesto (is_qa_approved, date_completed).
+            models.Index(
+                fields=['date_completed'],
+                condition=models.Q(is_qa_approved=True),
+                name='req_approved_date_idx',
+            ),
+            models.Index(
+                fields=['date_completed'],
+                condition=models.Q(is_qa_approved=False),
+                name='req_pending_date_idx',
+            ),
+        ]
+
     def clean(self):
         if self.unit_tests_passed > self.unit_tests_total:
             raise ValidationError("Las pruebas pasadas no pueden exceder el total.")
@@ -80,53 +149,17 @@ class Requirement(models.Model):
             self.unit_tests_failed = self.unit_tests_total - self.unit_tests_passed
         else:
             self.unit_tests_failed = 0
+
+        # Esfuerzo real (9h por día laboral), diferencia y desvío
+        for name, value in effort_fields(self.estimated_effort_hours, self.start_date_real, self.end_date_real).items():
+            setattr(self, name, value)
         super().save(*args, **kwargs)
 
     # --- PROPIEDADES CALCULADAS (Necesarias para Admin y Serializers) ---
 
     @property
     def unit_test_success_rate(self):
-        if self.unit_tests_total == 0: return 0.0
-        return round((self.unit_tests_passed / self.unit_tests_total) * 100, 2)
-
-    @property
-    def real_effort_days(self):
-        """Calcula días laborales (Lunes a Viernes) entre inicio y fin."""
-        if self.start_date_real and self.end_date_real:
-            if self.end_date_real >= self.start_date_real:
-                day_count = 0
-                current_date = self.start_date_real
-                
-                # Iteramos desde la fecha de inicio hasta la fecha fin
-                while current_date <= self.end_date_real:
-                    # weekday() devuelve: 0=Lunes, 1=Martes ... 5=Sábado, 6=Domingo
-                    if current_date.weekday() < 5:  # Si es menor a 5 (Lunes a Viernes)
-                        day_count += 1
-                    
-                    # Pasamos al siguiente día
-                    current_date += timedelta(days=1)
-                
-                return day_count
-        return 0
-
-    @property
-    def real_effort_hours(self):
-        # Jornada de 9 Horas
-        return self.real_effort_days * 9
-
-    @property
-    def hours_diff(self):
-        """Diferencia: Estimado - Real. (Positivo = Ahorró tiempo, Negativo = Tardó más)"""
-        # Convertimos a Decimal para evitar error de tipos si django trae float
-        return Decimal(self.estimated_effort_hours) - Decimal(self.real_effort_hours)
-
-    @property
-    def deviation_percentage(self):
-        """Porcentaje de desvío para el Admin."""
-        if self.estimated_effort_hours == 0:
-            return 0
-        # ((Estimado - Real) / Estimado) * 100
-        return round((self.hours_diff / Decimal(self.estimated_effort_hours)) * 100, 2)
+        return success_rate(self.unit_tests_passed, self.unit_tests_total)
 
     @property
     def extra_hours_used(self):
@@ -136,4 +169,106 @@ class Requirement(models.Model):
         return 0
 
     def __str__(self):
-        return f"{self.jira_ticket} - {self.developer.name}"
\ No newline at end of file
+        return f"{self.jira_ticket} - {self.developer.name}"
+
+
+class RequirementDailyRollup(models.Model):
+    """
+    Totales pre-agregados por desarrollador y día (fecha de registro del ticket).
+    Se mantienen al guardar/borrar requerimientos (ver rollups.py) para que los reportes
+    por rango de fechas sumen unas pocas filas en vez de recorrer todos los tickets.
+    """
+    developer = models.ForeignKey(
+        Developer,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups',
+        verbose_name="Desarrollador"
+    )
+    day = models.DateField(verbose_name="Día")
+
+    total_reqs = models.PositiveIntegerField(default=0, verbose_name="Requerimientos")
+    open_reqs = models.PositiveIntegerField(default=0, verbose_name="Pendientes de QA")
+    rejection_count = models.PositiveIntegerField(default=0, verbose_name="Rechazos QA")
+
+    unit_tests_total = models.PositiveIntegerField(default=0, verbose_name="Total Unitarias")
+    unit_tests_passed = models.PositiveIntegerField(default=0, verbose_name="Unitarias Pasadas")
+    unit_tests_failed = models.PositiveIntegerField(default=0, verbose_name="Unitarias Fallidas")
+
+    functional_cases = models.PositiveIntegerField(default=0, verbose_name="Casos Funcionales")
+    functional_bugs = models.PositiveIntegerField(default=0, verbose_name="Bugs Funcionales")
+    integration_cases = models.PositiveIntegerField(default=0, verbose_name="Casos Integración")
+    integration_bugs = models.PositiveIntegerField(default=0, verbose_name="Bugs Integración")
+    regression_cases = models.PositiveIntegerField(default=0, verbose_name="Casos Regresión")
+    regression_bugs = models.PositiveIntegerField(default=0, verbose_name="Bugs Regresión")
+    production_bugs = models.PositiveIntegerField(default=0, verbose_name="Bugs en Producción")
+
+    estimated_effort_hours = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="Esfuerzo Estimado (Hrs)"
+    )
+    real_effort_hours = models.PositiveIntegerField(default=0, verbose_name="Esfuerzo Real (Hrs)")
+
+    def __str__(self):
+        return f"{self.developer_id} - {self.day}"
+
+    class Meta:
+        verbose_name = "Resumen Diario"
+        verbose_name_plural = "Resúmenes Diarios"
+        constraints = [
+            models.UniqueConstraint(fields=['developer', 'day'], name='rollup_developer_day_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='rollup_day_idx'),
+        ]
+
+
+class MetricsSnapshot(models.Model):
+    """
+    Última respuesta precalculada de un endpoint de métricas (scope: summary, aggregates,
+    report:<id>). Las señales la marcan como sucia y el worker `snapshot_worker` la
+    regenera; las vistas la sirven tal cual (ver snapshots.py).
+    """
+    scope = models.CharField(max_length=100, unique=True, verbose_name="Scope")
+    payload = models.JSONField(null=True, blank=True, verbose_name="Respuesta")
+    dirty = models.BooleanField(default=True, db_index=True, verbose_name="¿Desactualizado?")
+    # Se incrementa en cada cambio: el worker sólo limpia `dirty` si nadie la ensució mientras la armaba
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Versión")
+    dirtied_at = models.DateTimeField(null=True, blank=True, verbose_name="Desactualizado desde")
+    built_at = models.DateTimeField(null=True, blank=True, verbose_name="Generado")
+
+    def __str__(self):
+        return self.scope
+
+    class Meta:
+        verbose_name = "Snapshot de Métricas"
+        verbose_name_plural = "Snapshots de Métricas"
+
+
+class ChangeLog(models.Model):
+    """
+    Registro de altas, modificaciones y bajas de Developer y Requirement para la
+    sincronización incremental (GET /api/changes/?since=<seq>, ver changes.py).
+    El id es la secuencia de cambios: siempre crece, se confirma en orden (ver
+    changes.record) y los clientes lo usan como cursor.
+    """
+    class Entity(models.TextChoices):
+        DEVELOPER = 'developer', 'Desarrollador'
+        REQUIREMENT = 'requirement', 'Requerimiento'
+
+    class Action(models.TextChoices):
+        UPSERT = 'upsert', 'Alta / Modificación'
+        DELETE = 'delete', 'Baja'
+
+    id = models.BigAutoField(primary_key=True, verbose_name="Secuencia")
+    entity = models.CharField(max_length=20, choices=Entity.choices, verbose_name="Entidad")
+    object_id = models.PositiveBigIntegerField(verbose_name="ID")
+    action = models.CharField(max_length=10, choices=Action.choices, verbose_name="Acción")
+    # Desarrollador cuyos totales cambiaron (sin FK: la fila tiene que sobrevivir a la baja)
+    developer_id = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="Desarrollador")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Fecha")
+
+    def __str__(self):
+        return f"#{self.id} {self.action} {self.entity} {self.object_id}"
+
+    class Meta:
+        verbose_name = "Cambio"
+        verbose_name_plural = "Cambios"
@@ -0,0 +1,48 @@
+# metrics/renderers.py
+"""
+Renderer JSON rápido para la API (registrado en REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']).
+
+Con orjson instalado serializa en C: fechas y datetimes de forma nativa y los Decimal
+como número (igual que el JSONRenderer de DRF), sin pasar por json.JSONEncoder.
+Sin orjson, o si se pide salida indentada, usa el JSONRenderer de DRF tal cual.
+orjson es opcional.
+"""
+import datetime
+import decimal
+
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+
+def _default(obj):
+    """Tipos que orjson no conoce; mismas conversiones que el encoder de DRF."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):  # Escalares y arreglos de NumPy
+        return obj.tolist()
+    if hasattr(obj, '__iter__'):  # QuerySet, generadores, sets
+        return list(obj)
+    raise TypeError(f"Tipo no serializable a JSON: {type(obj).__name__}")
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # OPT_UTC_Z: '...Z' en vez de '+00:00', como DRF
+        ret = orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+        # Igual que DRF: U+2028/U+2029 escapados para poder incrustar el JSON en un <script>
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
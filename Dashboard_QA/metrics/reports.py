@@ -0,0 +1,482 @@
+# metrics/reports.py
+"""
+Definiciones compartidas de las métricas del Dashboard.
+
+Las vistas (y cualquier otro consumidor) deben construir sus respuestas
+a partir de estas funciones para que todos usen exactamente la misma matemática.
+"""
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import deque
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+from django.utils.dateparse import parse_date
+
+from .models import Developer, Requirement, RequirementDailyRollup
+from .serializers import RequirementSerializer, RowSerializer
+
+# Categorías de la matriz de resumen: (prefijo, campo de casos, campo de bugs)
+SUMMARY_CATEGORIES = (
+    ('functional', 'functional_cases', 'functional_bugs'),
+    ('integration', 'integration_cases', 'integration_bugs'),
+    ('regression', 'regression_cases', 'regression_bugs'),
+    ('unit', 'unit_tests_total', 'unit_tests_failed'),
+)
+
+
+def calc_success(total, bugs):
+    """Porcentaje de éxito de una categoría (casos sin bug / casos)."""
+    if total == 0: return 0
+    success_count = total - bugs
+    return round((success_count / total) * 100, 1)
+
+
+def summary_annotations(prefix='daily_rollups__'):
+    """
+    Anotaciones SUM de la matriz de resumen sobre los rollups diarios.
+    `prefix` permite usarlas desde Developer (join) o directo sobre RequirementDailyRollup.
+    """
+    annotations = {'total_reqs': Coalesce(Sum(f'{prefix}total_reqs'), 0)}
+    for name, cases_field, bugs_field in SUMMARY_CATEGORIES:
+        annotations[f'{name}_total'] = Coalesce(Sum(f'{prefix}{cases_field}'), 0)
+        annotations[f'{name}_bugs'] = Coalesce(Sum(f'{prefix}{bugs_field}'), 0)
+    return annotations
+
+
+def summary_row(row):
+    """Arma la fila del resumen (mismo orden de llaves que la API) desde los totales agregados."""
+    data = {
+        'id': row['id'],
+        'name': row['name'],
+        'total_reqs': row['total_reqs'],
+    }
+    for name, _, _ in SUMMARY_CATEGORIES:
+        total = row[f'{name}_total']
+        bugs = row[f'{name}_bugs']
+        data[f'{name}_total'] = total
+        data[f'{name}_bugs'] = bugs
+        data[f'{name}_pct'] = calc_success(total, bugs)
+    return data
+
+
+# Columnas de cada fila del resumen (mismo orden que summary_row)
+SUMMARY_FIELDS = ('id', 'name', 'total_reqs') + tuple(
+    f'{name}_{suffix}' for name, _, _ in SUMMARY_CATEGORIES for suffix in ('total', 'bugs', 'pct')
+)
+
+
+def build_general_summary(dev_ids=None):
+    """
+    Matriz de resumen en una sola consulta agrupada sobre los rollups: de todos los
+    desarrolladores o sólo de `dev_ids`.
+    """
+    annotations = summary_annotations()
+    developers_qs = Developer.objects.all() if dev_ids is None else Developer.objects.filter(pk__in=dev_ids)
+    rows = (
+        developers_qs
+        .annotate(**annotations)
+        .order_by('id')
+        .values('id', 'name', *annotations)
+    )
+    return [summary_row(row) for row in rows]
+
+
+def _parse_date_param(name, value):
+    if not value or isinstance(value, date):
+        return value or None
+    try:
+        parsed = parse_date(value)
+    except ValueError:  # Bien formada pero inexistente (ej. 2025-13-01)
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{name}: fecha inválida (se espera AAAA-MM-DD)")
+    return parsed
+
+
+def parse_date_range(start_date=None, end_date=None):
+    """
+    `start_date=` y `end_date=` como date (None si no vinieron). Lanza ValueError con un
+    mensaje para el cliente si alguna no es una fecha válida.
+    """
+    return _parse_date_param('start_date', start_date), _parse_date_param('end_date', end_date)
+
+
+def filter_by_dates(queryset, start_date=None, end_date=None, field='date_completed'):
+    """
+    Filtro por fecha de registro que usan todos los reportes (`field='day'` para los rollups).
+    Lanza ValueError si alguna fecha es inválida (ver parse_date_range).
+    """
+    start_date, end_date = parse_date_range(start_date, end_date)
+    if start_date:
+        queryset = queryset.filter(**{f'{field}__gte': start_date})
+    if end_date:
+        queryset = queryset.filter(**{f'{field}__lte': end_date})
+    return queryset
+
+
+def report_annotations(prefix=''):
+    """Agregados SQL de los totales del reporte sobre los rollups diarios."""
+    return {
+        'total_reqs': Coalesce(Sum(f'{prefix}total_reqs'), 0),
+        'unit_total': Coalesce(Sum(f'{prefix}unit_tests_total'), 0),
+        'unit_passed': Coalesce(Sum(f'{prefix}unit_tests_passed'), 0),
+        'bugs_qa': Coalesce(
+            Sum(F(f'{prefix}functional_bugs') + F(f'{prefix}integration_bugs') + F(f'{prefix}regression_bugs')), 0
+        ),
+        'bugs_prod': Coalesce(Sum(f'{prefix}production_bugs'), 0),
+        'rechazos': Coalesce(Sum(f'{prefix}rejection_count'), 0),
+        'hours_est': Sum(f'{prefix}estimated_effort_hours'),
+        'hours_real': Coalesce(Sum(f'{prefix}real_effort_hours'), 0),
+    }
+
+
+def calc_dde(bugs_qa, bugs_prod, total_reqs):
+    """DDE (Eficacia QA): % de bugs detectados por QA antes de producción."""
+    total_issues = bugs_qa + bugs_prod
+    if total_issues > 0:
+        return round((bugs_qa / total_issues) * 100, 1)
+    if total_reqs > 0:
+        return 100 # Si no hubo bugs, eficacia perfecta
+    return 0
+
+
+def calc_time_efficiency(hours_est, diff_hours):
+    """% de horas ahorradas (o excedidas, si es negativo) respecto de lo estimado."""
+    if hours_est > 0:
+        return round((diff_hours / hours_est) * 100, 1)
+    return 0
+
+
+def calc_rejection_rate(rechazos, total_reqs):
+    """Rechazos de QA por requerimiento."""
+    if total_reqs > 0:
+        return round(rechazos / total_reqs, 2)
+    return 0
+
+
+def report_totals(developer_id, totals):
+    """Arma los totales del reporte (mismo orden de llaves que la API) desde los agregados."""
+    hours_est = totals['hours_est'] or Decimal(0)
+    hours_real = Decimal(totals['hours_real'])
+    diff_hours = hours_est - hours_real
+    return {
+        "developer_id": developer_id,
+        "total_requerimientos": totals['total_reqs'],
+        "unitarias_total": totals['unit_total'],
+        "unitarias_pasadas": totals['unit_passed'],
+        "unitarias_fallidas": totals['unit_total'] - totals['unit_passed'],
+        "total_bugs_qa": totals['bugs_qa'],
+        "total_bugs_prod": totals['bugs_prod'],
+        "total_rechazos": totals['rechazos'],
+        "dde_score": calc_dde(totals['bugs_qa'], totals['bugs_prod'], totals['total_reqs']),
+        "total_estimated_hours": hours_est,
+        "total_real_hours": hours_real,
+        "tiempo_desvio_total": diff_hours,
+        "tiempo_eficiencia_pct": calc_time_efficiency(hours_est, diff_hours),
+    }
+
+
+# Niveles de agrupación de /api/aggregates/: alias -> expresión (None = columna de Developer)
+AGGREGATE_GROUPS = {
+    'rol': {'rol': None},
+    'developer': {'developer_id': F('id'), 'developer_name': F('name')},
+    'month': {'month': TruncMonth('daily_rollups__day')},
+    'week': {'week': TruncWeek('daily_rollups__day')},
+}
+
+
+def parse_group_by(raw):
+    """
+    Interpreta `group_by=` (niveles separados por comas, ej. "rol,month").
+    Por defecto agrupa por rol; lanza ValueError con niveles desconocidos.
+    """
+    if not raw:
+        return ('rol',)
+    levels = tuple(dict.fromkeys(level.strip() for level in raw.split(',') if level.strip()))
+    unknown = [level for level in levels if level not in AGGREGATE_GROUPS]
+    if unknown or not levels:
+        raise ValueError(
+            f"group_by inválido: {', '.join(unknown) or raw}. Opciones: {', '.join(AGGREGATE_GROUPS)}"
+        )
+    return levels
+
+
+def build_aggregates(group_by=('rol',), start_date=None, end_date=None):
+    """
+    Totales del reporte (DDE, eficiencia de tiempo, rechazos) y % de éxito por categoría
+    para cada grupo, en una sola consulta agrupada sobre los rollups diarios.
+    Sólo aparecen los grupos con requerimientos en el rango.
+    """
+    fields, expressions = [], {}
+    for level in group_by:
+        for alias, expression in AGGREGATE_GROUPS[level].items():
+            if expression is None:
+                fields.append(alias)
+            else:
+                expressions[alias] = expression
+    keys = [*fields, *expressions]
+    start_date, end_date = parse_date_range(start_date, end_date)
+
+    # Un solo filter() sobre la relación: las anotaciones reutilizan ese mismo JOIN
+    conditions = {'daily_rollups__isnull': False}
+    if start_date:
+        conditions['daily_rollups__day__gte'] = start_date
+    if end_date:
+        conditions['daily_rollups__day__lte'] = end_date
+    rows = (
+        Developer.objects
+        .filter(**conditions)
+        .values(*fields, **expressions)
+        .annotate(**{**summary_annotations(), **report_annotations('daily_rollups__')})
+        .order_by(*keys)
+    )
+    return [aggregate_row(row, keys) for row in rows]
+
+
+def aggregate_row(row, keys):
+    """Fila de /api/aggregates/: llaves del grupo + totales del reporte + % por categoría."""
+    data = {key: row[key].isoformat() if isinstance(row[key], date) else row[key] for key in keys}
+    totals = report_totals(None, row)
+    del totals['developer_id']
+    data.update(totals)
+    for name, _, _ in SUMMARY_CATEGORIES:
+        data[f'{name}_pct'] = calc_success(row[f'{name}_total'], row[f'{name}_bugs'])
+    return data
+
+
+# --- Tendencias (series por período con promedio móvil) ---
+
+TREND_BUCKETS = {'week': TruncWeek, 'month': TruncMonth}
+TREND_MAX_WINDOW = 52
+
+
+def parse_trend_params(bucket=None, window=None):
+    """Valida `bucket=` (week|month) y `window=` (períodos del promedio móvil). Lanza ValueError."""
+    bucket = bucket or 'week'
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(f"bucket inválido: {bucket}. Opciones: {', '.join(TREND_BUCKETS)}")
+    try:
+        window = int(window or 4)
+    except ValueError:
+        raise ValueError("window debe ser un número entero") from None
+    if not 1 <= window <= TREND_MAX_WINDOW:
+        raise ValueError(f"window debe estar entre 1 y {TREND_MAX_WINDOW}")
+    return bucket, window
+
+
+def _period_number(bucket, day):
+    """Número correlativo del período (semanas que empiezan en lunes, o meses)."""
+    return day.year * 12 + day.month if bucket == 'month' else day.toordinal() // 7
+
+
+def _trend_point(developer_id, totals):
+    data = report_totals(developer_id, totals)
+    del data['developer_id']
+    data['rechazos_por_req'] = calc_rejection_rate(totals['rechazos'], totals['total_reqs'])
+    return data
+
+
+def build_trends(dev_ids=None, bucket='week', window=4, start_date=None, end_date=None):
+    """
+    Series por semana/mes de cada desarrollador, con los mismos totales y métricas del
+    reporte (DDE, eficiencia de tiempo, rechazos) y su versión "rolling": las mismas
+    métricas sobre los últimos `window` períodos del calendario (los que no tienen datos
+    cuentan, vacíos). Una sola consulta GROUP BY (dev, período) sobre los rollups; las
+    sumas móviles se hacen acá, sobre esas pocas filas.
+    Devuelve {developer_id: [puntos]} (sólo los períodos con datos) para los desarrolladores con datos.
+    """
+    start_date, end_date = parse_date_range(start_date, end_date)
+    conditions = {'daily_rollups__isnull': False}
+    if dev_ids is not None:
+        conditions['id__in'] = dev_ids
+    if start_date:
+        conditions['daily_rollups__day__gte'] = start_date
+    if end_date:
+        conditions['daily_rollups__day__lte'] = end_date
+
+    totals = report_annotations('daily_rollups__')
+    rows = (
+        Developer.objects
+        .filter(**conditions)
+        .values('id', bucket=TREND_BUCKETS[bucket]('daily_rollups__day'))
+        .annotate(**totals)
+        .order_by('id', 'bucket')
+    )
+
+    series = {}
+    recent = deque()  # Filas del desarrollador actual dentro de la ventana
+    for row in rows:
+        number = _period_number(bucket, row['bucket'])
+        if recent and recent[0]['id'] != row['id']:
+            recent.clear()
+        recent.append(dict(row, number=number))
+        while recent[0]['number'] <= number - window:
+            recent.popleft()
+        point = {'bucket': row['bucket'].isoformat(), **_trend_point(row['id'], row)}
+        point['rolling'] = _trend_point(row['id'], {name: sum(past[name] for past in recent) for name in totals})
+        series.setdefault(row['id'], []).append(point)
+    return series
+
+
+# Filas de `requerimientos_lista`: RequirementSerializer precalculado (ver RowSerializer)
+requirement_row = RowSerializer(RequirementSerializer)
+REQUIREMENT_FIELDS = requirement_row.fields
+# Columnas de la BD que se leen con values() para armar cada fila
+REQUIREMENT_ROW_COLUMNS = requirement_row.columns
+
+
+def parse_fields(raw):
+    """
+    Interpreta el parámetro `fields=` (lista separada por comas).
+    Devuelve None si no vino; lanza ValueError si pide campos que no existen.
+    """
+    if not raw:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in REQUIREMENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}")
+    return fields
+
+
+def _row_columns(fields):
+    # Sólo la descripción pesa: no se lee de la BD si no se pidió
+    if fields is not None and 'description' not in fields:
+        return tuple(column for column in REQUIREMENT_ROW_COLUMNS if column != 'description')
+    return REQUIREMENT_ROW_COLUMNS
+
+
+@lru_cache(maxsize=64)
+def _row_serializer(fields):
+    return requirement_row if fields is None else requirement_row.only(fields)
+
+
+def requirement_rows(requirements_qs, fields=None):
+    """
+    Filas de `requerimientos_lista` sin instanciar modelos ni serializers.
+    Con `fields` sólo se devuelven esos campos.
+    """
+    serialize = _row_serializer(fields)
+    for values in requirements_qs.values(*_row_columns(fields)).iterator(chunk_size=2000):
+        yield serialize(values)
+
+
+def encode_cursor(date_completed, pk):
+    return urlsafe_b64encode(f'{date_completed.isoformat()}|{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Devuelve (fecha, id) del cursor; lanza ValueError si es inválido."""
+    try:
+        raw_date, raw_pk = urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return date.fromisoformat(raw_date), int(raw_pk)
+    except (UnicodeError, binascii.Error, TypeError, ValueError) as exc:
+        raise ValueError("Cursor inválido") from exc
+
+
+def parse_page_limit(raw, default=50, maximum=500):
+    """Interpreta `limit=` de la lista paginada (se recorta a 1..maximum). Lanza ValueError si no es un entero."""
+    try:
+        limit = int(raw) if raw else default
+    except ValueError:
+        raise ValueError("limit debe ser un número entero") from None
+    return min(max(limit, 1), maximum)
+
+
+def requirement_page(requirements_qs, cursor=None, limit=50, fields=None):
+    """
+    Página de tickets con paginación keyset sobre (date_completed, id), del más nuevo
+    al más viejo. El costo no depende de cuántas páginas haya antes.
+    """
+    requirements_qs = requirements_qs.order_by('-date_completed', '-id')
+    if cursor:
+        last_date, last_pk = decode_cursor(cursor)
+        requirements_qs = requirements_qs.filter(
+            Q(date_completed__lt=last_date) | Q(date_completed=last_date, id__lt=last_pk)
+        )
+    page = list(requirements_qs.values(*_row_columns(fields))[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1]['date_completed'], page[-1]['id'])
+    return {
+        "next_cursor": next_cursor,
+        "results": list(map(_row_serializer(fields), page)),
+    }
+
+
+def build_requirement_detail(pk, fields=None):
+    """Detalle de un ticket (None si no existe)."""
+    values = Requirement.objects.filter(pk=pk).values(*_row_columns(fields)).first()
+    if values is None:
+        return None
+    return _row_serializer(fields)(values)
+
+
+def build_developer_report(dev_id, start_date=None, end_date=None, include_list=True, fields=None):
+    """
+    Reporte consolidado de un desarrollador (None si no existe).
+    Los totales suman los rollups diarios del rango y la lista sale de dicts de values().
+    Con include_list=False sólo se devuelven los totales.
+    """
+    reports = build_developer_reports([dev_id], start_date, end_date, include_list, fields)
+    return reports[0] if reports else None
+
+
+def parse_ids(raw):
+    """
+    Interpreta `ids=` ("1,2,3" o "all"). Devuelve la lista de ids (None = todos);
+    lanza ValueError si falta o tiene valores que no son enteros.
+    """
+    if not raw:
+        raise ValueError("Falta ids (ej. ids=1,2,3 o ids=all)")
+    if raw.strip().lower() == 'all':
+        return None
+    try:
+        return list(dict.fromkeys(int(value) for value in raw.split(',') if value.strip()))
+    except ValueError:
+        raise ValueError(f"ids inválido: {raw}") from None
+
+
+def build_developer_reports(dev_ids=None, start_date=None, end_date=None, include_list=True, fields=None):
+    """
+    Reportes de varios desarrolladores (mismo formato que build_developer_report), en el
+    orden de `dev_ids` (None = todos, por id) y omitiendo los que no existen.
+    Siempre son 3 consultas sin importar cuántos ids: los desarrolladores, un aggregate
+    agrupado por desarrollador sobre los rollups y una sola lectura de los tickets.
+    """
+    developers_qs = Developer.objects.order_by('id')
+    if dev_ids is not None:
+        developers_qs = developers_qs.filter(pk__in=dev_ids)
+    found = set(developers_qs.values_list('id', flat=True))
+    ordered = [pk for pk in dev_ids if pk in found] if dev_ids is not None else sorted(found)
+    if not ordered:
+        return []
+
+    rollups_qs = filter_by_dates(
+        RequirementDailyRollup.objects.filter(developer_id__in=ordered), start_date, end_date, field='day'
+    )
+    totals = {
+        row['developer_id']: row
+        for row in rollups_qs.values('developer_id').annotate(**report_annotations()).order_by()
+    }
+    empty = dict.fromkeys(report_annotations(), 0)
+    reports = {pk: report_totals(pk, totals.get(pk, empty)) for pk in ordered}
+    if include_list:
+        attach_requirement_lists(reports, start_date, end_date, fields)
+    return [reports[pk] for pk in ordered]
+
+
+def attach_requirement_lists(reports, start_date=None, end_date=None, fields=None):
+    """Agrega `requerimientos_lista` a cada reporte de {dev_id: reporte} con una sola consulta."""
+    for report in reports.values():
+        report["requerimientos_lista"] = []
+    requirements_qs = filter_by_dates(Requirement.objects.filter(developer_id__in=list(reports)), start_date, end_date)
+    rows = requirements_qs.order_by('developer_id', 'id').values('developer_id', *_row_columns(fields))
+    serialize = _row_serializer(fields)
+    for values in rows.iterator(chunk_size=2000):
+        reports[values['developer_id']]["requerimientos_lista"].append(serialize(values))
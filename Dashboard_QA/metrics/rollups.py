@@ -0,0 +1,99 @@
+# metrics/rollups.py
+"""
+Mantenimiento de RequirementDailyRollup (una fila por desarrollador y día).
+
+`refresh_rollups` recalcula sólo los pares (desarrollador, día) afectados por un cambio;
+`rebuild_rollups` regenera la tabla completa (recuperación ante desvíos, ej. después de
+un QuerySet.update() o de un bulk_create que no dispara señales).
+Ambas reciben opcionalmente los modelos (por defecto, los de metrics.models).
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+# Columnas del rollup que son la suma directa de la misma columna de Requirement
+SUMMED_FIELDS = (
+    'rejection_count',
+    'unit_tests_total', 'unit_tests_passed', 'unit_tests_failed',
+    'functional_cases', 'functional_bugs',
+    'integration_cases', 'integration_bugs',
+    'regression_cases', 'regression_bugs',
+    'production_bugs',
+    'estimated_effort_hours', 'real_effort_hours',
+)
+ROLLUP_FIELDS = ('total_reqs', 'open_reqs') + SUMMED_FIELDS
+
+
+def _grouped_totals(requirements_qs):
+    """Totales de los requerimientos agrupados por (desarrollador, día)."""
+    return (
+        requirements_qs
+        .order_by()
+        .values('developer_id', 'date_completed')
+        .annotate(
+            total_reqs=Count('id'),
+            open_reqs=Count('id', filter=Q(is_qa_approved=False)),
+            **{name: Sum(name) for name in SUMMED_FIELDS},
+        )
+    )
+
+
+def _to_rollup(rollup_model, row):
+    return rollup_model(
+        developer_id=row['developer_id'],
+        day=row['date_completed'],
+        **{name: row[name] for name in ROLLUP_FIELDS},
+    )
+
+
+def refresh_rollups(pairs, requirement_model=None, rollup_model=None, batch_size=500):
+    """Recalcula las filas del rollup de los pares (developer_id, día) indicados."""
+    if requirement_model is None:
+        from .models import Requirement as requirement_model, RequirementDailyRollup as rollup_model
+
+    pairs = list({(dev_id, day) for dev_id, day in pairs if dev_id and day})
+    for offset in range(0, len(pairs), batch_size):
+        batch = pairs[offset:offset + batch_size]
+        condition = reduce(or_, (Q(developer_id=dev_id, date_completed=day) for dev_id, day in batch))
+
+        with transaction.atomic():
+            rows = [
+                _to_rollup(rollup_model, row)
+                for row in _grouped_totals(requirement_model.objects.filter(condition))
+            ]
+            present = {(row.developer_id, row.day) for row in rows}
+            empty = [pair for pair in batch if pair not in present]
+            if empty:
+                rollup_model.objects.filter(
+                    reduce(or_, (Q(developer_id=dev_id, day=day) for dev_id, day in empty))
+                ).delete()
+            if rows:
+                rollup_model.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=['developer', 'day'],
+                    update_fields=ROLLUP_FIELDS,
+                )
+
+
+def rebuild_rollups(requirement_model=None, rollup_model=None, batch_size=2000):
+    """Regenera toda la tabla de rollups desde Requirement. Devuelve cuántas filas creó."""
+    if requirement_model is None:
+        from .models import Requirement as requirement_model, RequirementDailyRollup as rollup_model
+
+    created = 0
+    with transaction.atomic():
+        rollup_model.objects.all().delete()
+        batch = []
+        for row in _grouped_totals(requirement_model.objects.all()).iterator(chunk_size=batch_size):
+            batch.append(_to_rollup(rollup_model, row))
+            if len(batch) >= batch_size:
+                rollup_model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            rollup_model.objects.bulk_create(batch)
+            created += len(batch)
+    return created
@@ -1,5 +1,14 @@
+import decimal
+from datetime import date
+from decimal import Decimal
+from operator import itemgetter
+from types import SimpleNamespace
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
 from rest_framework import serializers
-from .models import Developer, Requirement
+from rest_framework.settings import ISO_8601, api_settings
+from .models import Developer, Requirement, deviation_hours, status_display, success_rate
 
 class DeveloperSerializer(serializers.ModelSerializer):
     """Información básica para listas desplegables."""
@@ -30,12 +39,130 @@ class RequirementSerializer(serializers.ModelSerializer):
             'estimated_effort_hours', 'real_effort_days', 'real_effort_hours', 'deviation_hours',
             'is_qa_approved', 'status_display'
         )
+        # Campos calculados -> (función compartida con el modelo, columnas que recibe), para
+        # que RowSerializer los resuelva sobre un dict de values() sin armar un objeto por fila
+        row_sources = {
+            'unit_test_success_rate': (success_rate, ('unit_tests_passed', 'unit_tests_total')),
+            'deviation_hours': (deviation_hours, ('estimated_effort_hours', 'real_effort_hours')),
+            'status_display': (status_display, ('is_qa_approved',)),
+        }
 
     def get_deviation_hours(self, obj):
-        return obj.estimated_effort_hours - obj.real_effort_hours
+        return deviation_hours(obj.estimated_effort_hours, obj.real_effort_hours)
 
     def get_status_display(self, obj):
-        return "APROBADO" if obj.is_qa_approved else "REVISIÓN"
+        return status_display(obj.is_qa_approved)
+
+# --- Serializer por filas (values()) ---
+# Tipos de DRF cuyo to_representation() devuelve tal cual lo que trae la BD
+_PASSTHROUGH_FIELDS = (serializers.IntegerField, serializers.BooleanField, serializers.CharField, serializers.ReadOnlyField)
+
+
+def _converter(field, model_field=None):
+    """
+    Función valor -> representación equivalente al to_representation() del campo, o None
+    si el valor de la BD ya sirve tal cual. Fechas y decimales se resuelven sin pasar por DRF.
+    `model_field` es la columna de la que sale el valor, si la hay.
+    """
+    if isinstance(field, _PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, serializers.DateField) and getattr(field, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+        return date.isoformat
+    if (
+        isinstance(field, serializers.DecimalField) and field.decimal_places is not None
+        and getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        and not field.localize and not field.normalize_output
+    ):
+        if (
+            isinstance(model_field, models.DecimalField)
+            and (model_field.max_digits, model_field.decimal_places) == (field.max_digits, field.decimal_places)
+        ):
+            # La BD ya devuelve la columna con esa escala (el backend la cuantiza al leerla):
+            # quantize no cambiaría nada y con esos dígitos str() nunca usa notación científica
+            return str
+        # Mismo quantize que DecimalField.quantize(), con el exponente y el contexto precalculados
+        exponent = Decimal('.1') ** field.decimal_places
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        if field.rounding is not None:
+            context.rounding = field.rounding
+        return lambda value: format(value.quantize(exponent, context=context), 'f')
+    return field.to_representation
+
+
+def _from_object(function):
+    """Getter para una propiedad o un get_* que lee atributos: arma un objeto liviano con la fila."""
+    return lambda values: function(SimpleNamespace(**values))
+
+
+def _from_columns(function, columns):
+    """Getter que llama a `function` con las columnas indicadas de la fila."""
+    if len(columns) == 1:
+        column, = columns
+        return lambda values: function(values[column])
+    pick = itemgetter(*columns)
+    return lambda values: function(*pick(values))
+
+
+class RowSerializer:
+    """
+    Versión precalculada de un ModelSerializer de sólo lectura: a partir de Meta.fields se
+    arma (una sola vez) una tupla de (nombre, getter, conversor) y cada fila se resuelve
+    desde un dict de values(), sin instanciar el serializer ni el modelo. La salida es
+    idéntica a la del serializer de DRF.
+
+    Los campos pueden ser columnas, propiedades del modelo o SerializerMethodField. Si
+    Meta.row_sources declara el campo, se llama a esa función con las columnas indicadas;
+    si no, la propiedad o el get_* reciben un objeto con las columnas de `columns`.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class()
+        model = serializer_class.Meta.model
+        declared = serializer.fields
+        self.serializer_class = serializer_class
+        self.fields = tuple(declared) if fields is None else tuple(fields)
+        # Columnas de la BD (campos concretos del modelo), en el orden de Meta.fields
+        concrete = {field.attname for field in model._meta.concrete_fields}
+        self.columns = tuple(field.source for field in declared.values() if field.source in concrete)
+        self._plan = self._build(serializer, model, declared)
+
+    def _build(self, serializer, model, declared):
+        concrete = {column.attname: column for column in model._meta.concrete_fields}
+        sources = getattr(self.serializer_class.Meta, 'row_sources', {})
+        plan = []
+        for name in self.fields:
+            field = declared[name]
+            if name in sources:
+                # Ya es la representación final (igual que lo que devuelven la propiedad o el get_*)
+                plan.append((name, _from_columns(*sources[name]), None))
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                plan.append((name, _from_object(getattr(serializer, field.method_name)), None))
+                continue
+            if len(field.source_attrs) != 1:
+                raise ImproperlyConfigured(f"RowSerializer no soporta el campo anidado '{name}'.")
+            attribute = getattr(model, field.source, None)
+            if isinstance(attribute, property):
+                getter = _from_object(attribute.fget)
+            else:
+                getter = itemgetter(field.source)
+            plan.append((name, getter, _converter(field, concrete.get(field.source))))
+        return tuple(plan)
+
+    def only(self, fields):
+        """Variante que devuelve sólo `fields`."""
+        return RowSerializer(self.serializer_class, fields)
+
+    def __call__(self, values):
+        row = {}
+        for name, getter, convert in self._plan:
+            value = getter(values)
+            # Igual que Serializer.to_representation: None no pasa por el campo
+            row[name] = value if convert is None or value is None else convert(value)
+        return row
+
 
 class DeveloperReportSerializer(serializers.Serializer):
     """
@@ -0,0 +1,72 @@
+# metrics/signals.py
+"""
+Reacciones a cambios en Developer o Requirement: mantener los rollups diarios,
+invalidar la caché de reportes, marcar los snapshots a regenerar, actualizar la copia
+del motor en memoria, registrar el cambio para /api/changes/ y avisar a los dashboards
+conectados al feed de cambios.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache, changes, engine, snapshots
+from .broadcast import ANY_CHANGE, broadcaster
+from .models import Developer, Requirement
+from .rollups import refresh_rollups
+
+
+def developer_scopes(*dev_ids):
+    """Scopes afectados por un cambio en los datos de estos desarrolladores."""
+    return [cache.SUMMARY, cache.AGGREGATES] + [cache.report_scope(dev_id) for dev_id in set(dev_ids) if dev_id]
+
+
+def data_changed(*scopes):
+    cache.invalidate(*scopes)
+    snapshots.mark_dirty(*scopes)
+    # Avisamos recién al confirmar la transacción, para que el cliente ya vea los datos nuevos
+    transaction.on_commit(lambda: broadcaster.publish({'scopes': list(scopes)}))
+
+
+def all_data_changed():
+    """
+    Lo mismo que data_changed para escrituras masivas que no disparan señales
+    (bulk_create/bulk_update, recálculos): todos los scopes se dan por cambiados.
+    """
+    cache.invalidate_all()
+    snapshots.mark_dirty(*snapshots.all_scopes())
+    transaction.on_commit(lambda: broadcaster.publish({'scopes': [ANY_CHANGE]}))
+
+
+@receiver(post_save, sender=Developer)
+@receiver(post_delete, sender=Developer)
+def developer_changed(sender, instance, **kwargs):
+    action = changes.DELETE if kwargs['signal'] is post_delete else changes.UPSERT
+    changes.record(changes.DEVELOPER, action, [(instance.pk, instance.pk)])
+    data_changed(cache.DEVELOPERS, *developer_scopes(instance.pk))
+
+
+@receiver(pre_save, sender=Requirement)
+def remember_previous_owner(sender, instance, **kwargs):
+    # Si el ticket cambia de dueño hay que actualizar también el reporte (y el rollup) del dev anterior
+    if not instance._state.adding and instance.pk:
+        instance._previous_owner = (
+            Requirement.objects.filter(pk=instance.pk).values_list('developer_id', 'date_completed').first()
+        )
+
+
+@receiver(post_save, sender=Requirement)
+@receiver(post_delete, sender=Requirement)
+def requirement_changed(sender, instance, **kwargs):
+    previous_dev_id, previous_day = getattr(instance, '_previous_owner', None) or (None, None)
+    refresh_rollups([(instance.developer_id, instance.date_completed), (previous_dev_id, previous_day)])
+    action = changes.DELETE if kwargs['signal'] is post_delete else changes.UPSERT
+    owners = {instance.developer_id, previous_dev_id or instance.developer_id}
+    changes.record(changes.REQUIREMENT, action, [(instance.pk, dev_id) for dev_id in sorted(owners)])
+    data_changed(*developer_scopes(instance.developer_id, previous_dev_id))
+    # La copia en memoria del motor de métricas sólo refleja datos confirmados
+    if kwargs['signal'] is post_delete:
+        pk = instance.pk
+        transaction.on_commit(lambda: engine.requirement_deleted(pk))
+    else:
+        values = engine.db_values(instance)
+        transaction.on_commit(lambda: engine.requirement_saved(values))
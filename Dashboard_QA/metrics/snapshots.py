@@ -0,0 +1,132 @@
+# metrics/snapshots.py
+"""
+Snapshots precalculados de los endpoints de métricas.
+
+Las señales de guardado marcan como sucios los scopes afectados (mismos nombres que la
+caché: summary, aggregates, report:<id>) y el worker `manage.py snapshot_worker` los
+regenera fuera del request. Las vistas sirven el último snapshot con una sola lectura
+por clave, así que su latencia no depende del volumen de datos; la antigüedad viaja en
+los headers X-Snapshot-Age (segundos) y X-Snapshot-Stale.
+
+Si un snapshot sigue sucio más de METRICS_SNAPSHOT_MAX_STALENESS segundos (el worker no
+corre o está atrasado), las vistas vuelven a calcular en vivo.
+"""
+import json
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .cache import AGGREGATES, SUMMARY
+from .models import Developer, MetricsSnapshot
+from .reports import build_aggregates, build_developer_report, build_general_summary
+
+REPORT_PREFIX = 'report:'
+
+# Snapshot listo para servir: built_at identifica el payload (ver conditional.snapshot_etag)
+Snapshot = namedtuple('Snapshot', 'payload headers built_at')
+
+
+def snapshot_builder(scope):
+    """Función que arma el payload de un scope (None si el scope no tiene snapshot)."""
+    if scope == SUMMARY:
+        return build_general_summary
+    if scope == AGGREGATES:
+        return build_aggregates
+    if scope.startswith(REPORT_PREFIX):
+        dev_id = int(scope[len(REPORT_PREFIX):])
+        return lambda: build_developer_report(dev_id)
+    return None
+
+
+def all_scopes():
+    return [SUMMARY, AGGREGATES] + [
+        f'{REPORT_PREFIX}{dev_id}' for dev_id in Developer.objects.order_by('id').values_list('id', flat=True)
+    ]
+
+
+def mark_dirty(*scopes):
+    """Marca los scopes como sucios (creando los que todavía no existen)."""
+    scopes = [scope for scope in dict.fromkeys(scopes) if snapshot_builder(scope)]
+    if not scopes:
+        return
+    now = timezone.now()
+    updated = MetricsSnapshot.objects.filter(scope__in=scopes).update(
+        version=F('version') + 1,
+        # dirtied_at guarda desde cuándo está sucio, no el último cambio
+        dirtied_at=Case(When(dirty=False, then=Value(now)), default=F('dirtied_at')),
+        dirty=True,
+    )
+    if updated < len(scopes):
+        MetricsSnapshot.objects.bulk_create(
+            [MetricsSnapshot(scope=scope, dirtied_at=now) for scope in scopes],
+            ignore_conflicts=True,
+        )
+
+
+def rebuild_snapshot(scope, version):
+    """
+    Regenera un snapshot. Sólo lo marca como limpio si su versión no cambió mientras
+    se armaba (si cambió, queda sucio para la próxima vuelta). Devuelve True si quedó limpio.
+    """
+    data = snapshot_builder(scope)()
+    if data is None:  # El desarrollador ya no existe
+        MetricsSnapshot.objects.filter(scope=scope).delete()
+        return False
+    # Guardamos lo mismo que mandaría la API (ej. Decimal como número)
+    payload = json.loads(JSONRenderer().render(data))
+    MetricsSnapshot.objects.filter(scope=scope).update(
+        payload=payload,
+        built_at=timezone.now(),
+        dirty=Case(When(version=version, then=Value(False)), default=Value(True)),
+    )
+    return not MetricsSnapshot.objects.filter(scope=scope, dirty=True).exists()
+
+
+def rebuild_dirty(limit=None):
+    """Regenera los snapshots sucios (los más viejos primero). Devuelve cuántos quedaron limpios."""
+    pending = MetricsSnapshot.objects.filter(dirty=True).order_by('dirtied_at', 'id').values_list('scope', 'version')
+    if limit:
+        pending = pending[:limit]
+    return sum(rebuild_snapshot(scope, version) for scope, version in pending)
+
+
+def run_worker(interval=2.0, once=False, stdout=None):
+    """Bucle del worker: regenera lo sucio cada `interval` segundos."""
+    mark_dirty(*all_scopes())
+    while True:
+        started = time.perf_counter()
+        rebuilt = rebuild_dirty()
+        if rebuilt and stdout:
+            stdout.write(f"{rebuilt} snapshots regenerados en {time.perf_counter() - started:.2f} s")
+        if once:
+            return rebuilt
+        time.sleep(interval)
+
+
+def latest_snapshot(scope, allow_stale=True):
+    """
+    Snapshot(payload, headers, built_at) del último snapshot del scope, o None si no hay
+    uno utilizable (nunca se generó o lleva sucio más de METRICS_SNAPSHOT_MAX_STALENESS
+    segundos). Con allow_stale=False sólo sirve uno que no esté sucio.
+    """
+    snapshot = (
+        MetricsSnapshot.objects.filter(scope=scope, built_at__isnull=False)
+        .values('payload', 'dirty', 'dirtied_at', 'built_at')
+        .first()
+    )
+    if snapshot is None:
+        return None
+    now = timezone.now()
+    if snapshot['dirty'] and (
+        not allow_stale or (now - snapshot['dirtied_at']).total_seconds() > settings.METRICS_SNAPSHOT_MAX_STALENESS
+    ):
+        return None
+    headers = {
+        'X-Snapshot-Age': str(int((now - snapshot['built_at']).total_seconds())),
+        'X-Snapshot-Stale': 'true' if snapshot['dirty'] else 'false',
+    }
+    return Snapshot(snapshot['payload'], headers, snapshot['built_at'])
@@ -1,3 +1,1292 @@
-from django.test import TestCase
+from base64 import urlsafe_b64encode
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+import asyncio
+import csv
+import gzip
+import json
+import tempfile
+import threading
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, override_settings, skipUnlessDBFeature,
+)
+from unittest import mock, skipUnless
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from qa_dashboard.middleware import RequestMetricsMiddleware, sql_fingerprint
+from qa_dashboard.prometheus import LATENCY_BUCKETS, registry
+
+from .bench import bench_endpoint, legacy_developer_report, percentile, seed
+from .broadcast import Broadcaster, broadcaster
+from .changes import current_cursor
+from .effort import business_days, business_days_batch
+from .models import ChangeLog, Developer, MetricsSnapshot, Requirement, RequirementDailyRollup
+from . import changes, engine, exports, reports
+from .renderers import FastJSONRenderer
+from .ingest import import_requirements
+from .reports import REQUIREMENT_FIELDS, REQUIREMENT_ROW_COLUMNS, build_developer_report, filter_by_dates, requirement_row
+from .rollups import ROLLUP_FIELDS, rebuild_rollups
+from .serializers import RequirementSerializer
+from .snapshots import mark_dirty, rebuild_dirty, rebuild_snapshot
+
+
+def make_requirement(developer, ticket, **kwargs):
+    defaults = {
+        'description': f'Descripción {ticket}',
+        'unit_tests_total': 10,
+        'unit_tests_passed': 8,
+        'functional_cases': 5,
+        'functional_bugs': 1,
+        'integration_cases': 4,
+        'integration_bugs': 0,
+        'regression_cases': 3,
+        'regression_bugs': 1,
+        'production_bugs': 0,
+        'rejection_count': 1,
+        'estimated_effort_hours': Decimal('20.50'),
+        'start_date_real': date(2026, 1, 5),
+        'end_date_real': date(2026, 1, 7),
+    }
+    defaults.update(kwargs)
+    return Requirement.objects.create(developer=developer, jira_ticket=ticket, **defaults)
+
+
+class GeneralSummaryViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        self.beto = Developer.objects.create(name='Beto', email='beto@test.com')
+        make_requirement(self.ana, 'QA-1')
+        make_requirement(self.ana, 'QA-2', functional_cases=0, functional_bugs=0, unit_tests_total=0, unit_tests_passed=0)
+
+    def test_summary_matrix(self):
+        response = self.client.get(reverse('general-summary'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {
+                'id': self.ana.id, 'name': 'Ana', 'total_reqs': 2,
+                'functional_total': 5, 'functional_bugs': 1, 'functional_pct': 80.0,
+                'integration_total': 8, 'integration_bugs': 0, 'integration_pct': 100.0,
+                'regression_total': 6, 'regression_bugs': 2, 'regression_pct': 66.7,
+                'unit_total': 10, 'unit_bugs': 2, 'unit_pct': 80.0,
+            },
+            {
+                'id': self.beto.id, 'name': 'Beto', 'total_reqs': 0,
+                'functional_total': 0, 'functional_bugs': 0, 'functional_pct': 0,
+                'integration_total': 0, 'integration_bugs': 0, 'integration_pct': 0,
+                'regression_total': 0, 'regression_bugs': 0, 'regression_pct': 0,
+                'unit_total': 0, 'unit_bugs': 0, 'unit_pct': 0,
+            },
+        ])
+
+    def test_query_count_is_constant(self):
+        for i in range(20):
+            dev = Developer.objects.create(name=f'Dev {i}', email=f'dev{i}@test.com')
+            make_requirement(dev, f'QA-X{i}')
+        # 2 consultas de versión (ETag) + snapshot (no hay) + 1 agregada, sin importar cuántos devs haya
+        with self.assertNumQueries(4):
+            self.client.get(reverse('general-summary'))
+
+
+class BusinessDaysTests(SimpleTestCase):
+    def brute_force(self, start, end, holidays=()):
+        count, current = 0, start
+        while current <= end:
+            if current.weekday() < 5 and current not in holidays:
+                count += 1
+            current += timedelta(days=1)
+        return count
+
+    def test_matches_day_by_day_count(self):
+        holidays = {date(2026, 1, 1), date(2026, 1, 3)}
+        base = date(2025, 12, 20)
+        for offset in range(7):
+            start = base + timedelta(days=offset)
+            for length in range(25):
+                end = start + timedelta(days=length)
+                self.assertEqual(business_days(start, end), self.brute_force(start, end))
+                self.assertEqual(business_days(start, end, holidays), self.brute_force(start, end, holidays))
+
+    def test_missing_or_inverted_dates(self):
+        self.assertEqual(business_days(None, date(2026, 1, 5)), 0)
+        self.assertEqual(business_days(date(2026, 1, 9), date(2026, 1, 5)), 0)
+
+    def test_batch(self):
+        starts = [date(2026, 1, 5), None, date(2026, 1, 9), date(2025, 12, 29)]
+        ends = [date(2026, 1, 18), date(2026, 1, 5), date(2026, 1, 5), date(2026, 1, 2)]
+        self.assertEqual(business_days_batch(starts, ends), [10, 0, 0, 5])
+        self.assertEqual(business_days_batch(starts, ends, [date(2026, 1, 1)]), [10, 0, 0, 4])
+
+
+class EffortColumnsTests(TestCase):
+    def setUp(self):
+        self.dev = Developer.objects.create(name='Ana', email='ana@test.com')
+
+    def test_columns_are_maintained_on_save(self):
+        req = make_requirement(self.dev, 'QA-1')  # Lunes a Miércoles = 3 días
+        req.refresh_from_db()
+        self.assertEqual(req.real_effort_days, 3)
+        self.assertEqual(req.real_effort_hours, 27)
+        self.assertEqual(req.hours_diff, Decimal('-6.50'))
+        self.assertEqual(req.deviation_percentage, Decimal('-31.71'))
+        self.assertEqual(req.extra_hours_used, Decimal('6.50'))
+
+        req.end_date_real = date(2026, 1, 5)
+        req.save()
+        req.refresh_from_db()
+        self.assertEqual(req.real_effort_hours, 9)
+        self.assertEqual(req.hours_diff, Decimal('11.50'))
+
+    def test_database_side_queries(self):
+        make_requirement(self.dev, 'QA-1')
+        make_requirement(self.dev, 'QA-2', estimated_effort_hours=Decimal('40.00'))
+        make_requirement(self.dev, 'QA-3', estimated_effort_hours=Decimal('10.00'))
+        self.assertEqual(Requirement.objects.effort_totals(), {
+            'total_estimated_hours': Decimal('70.50'),
+            'total_real_hours': 81,
+            'total_hours_diff': Decimal('-10.50'),
+        })
+        self.assertEqual(
+            list(Requirement.objects.over_budget().values_list('jira_ticket', flat=True)),
+            ['QA-3', 'QA-1'],
+        )
+
+    def test_recompute_command_backfills_stale_rows(self):
+        req = make_requirement(self.dev, 'QA-1')
+        Requirement.objects.update(real_effort_days=0, real_effort_hours=0, hours_diff=0, deviation_percentage=0)
+        call_command('recompute_effort', chunk_size=1, stdout=StringIO())
+        req.refresh_from_db()
+        self.assertEqual((req.real_effort_days, req.real_effort_hours), (3, 27))
+
+
+class ReportCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        self.beto = Developer.objects.create(name='Beto', email='beto@test.com')
+        self.req = make_requirement(self.ana, 'QA-1')
+
+    def test_repeated_requests_hit_the_cache(self):
+        url = reverse('developer-report', args=[self.ana.id])
+        first = self.client.get(url).json()
+        # Sólo quedan la consulta de versión del ETag y la búsqueda del snapshot
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).json(), first)
+        self.client.get(reverse('general-summary'))
+        with self.assertNumQueries(3):
+            self.client.get(reverse('general-summary'))
+        self.assertEqual(self.client.get(reverse('cache-stats')).json(), {'hits': 2, 'misses': 2, 'hit_ratio': 0.5})
+
+    def test_date_params_are_part_of_the_key(self):
+        url = reverse('developer-report', args=[self.ana.id])
+        self.assertEqual(self.client.get(url).json()['total_requerimientos'], 1)
+        self.assertEqual(self.client.get(url, {'start_date': '2000-01-01', 'end_date': '2000-01-02'}).json()['total_requerimientos'], 0)
+
+    def test_saving_invalidates_affected_scopes(self):
+        ana_url = reverse('developer-report', args=[self.ana.id])
+        beto_url = reverse('developer-report', args=[self.beto.id])
+        self.client.get(ana_url)
+        self.client.get(beto_url)
+
+        # Reasignar el ticket invalida el reporte del dueño anterior y del nuevo
+        self.req.developer = self.beto
+        self.req.save()
+        self.assertEqual(self.client.get(ana_url).json()['total_requerimientos'], 0)
+        self.assertEqual(self.client.get(beto_url).json()['total_requerimientos'], 1)
+
+        self.client.get(reverse('developer-list'))
+        self.beto.name = 'Roberto'
+        self.beto.save()
+        names = [dev['name'] for dev in self.client.get(reverse('developer-list')).json()]
+        self.assertEqual(names, ['Ana', 'Roberto'])
+
+    def test_missing_developer_is_not_cached(self):
+        response = self.client.get(reverse('developer-report', args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dev = Developer.objects.create(name='Ana', email='ana@test.com')
+        self.req = make_requirement(self.dev, 'QA-1')
+        make_requirement(self.dev, 'QA-2')
+
+    def test_not_modified_without_building_the_report(self):
+        url = reverse('developer-report', args=[self.dev.id])
+        response = self.client.get(url)
+        etag = response.headers['ETag']
+        # Búsqueda del snapshot (no hay) + versión de los datos
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_on_save_and_delete(self):
+        for name, args in (('developer-report', [self.dev.id]), ('general-summary', []), ('developer-list', [])):
+            with self.subTest(name):
+                url = reverse(name, args=args)
+                etag = self.client.get(url).headers['ETag']
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+                self.dev.save()
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_delete_changes_etag(self):
+        for name, args, ticket in (('developer-report', [self.dev.id], 'QA-1'), ('general-summary', [], 'QA-2')):
+            with self.subTest(name):
+                url = reverse(name, args=args)
+                etag = self.client.get(url).headers['ETag']
+                Requirement.objects.filter(jira_ticket=ticket).delete()
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_date_params(self):
+        url = reverse('developer-report', args=[self.dev.id])
+        etag = self.client.get(url).headers['ETag']
+        response = self.client.get(url, {'start_date': '2000-01-01'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(METRICS_STREAM_POLL_SECONDS=0)
+class ChangeStreamTests(TestCase):
+    async def test_broadcaster_delivers_events_from_other_threads(self):
+        hub = Broadcaster()
+        queue = hub.subscribe()
+        thread = threading.Thread(target=hub.publish, args=({'scopes': ['summary']},))
+        thread.start()
+        thread.join()
+        self.assertEqual(await asyncio.wait_for(queue.get(), 1), {'scopes': ['summary']})
+        hub.unsubscribe(queue)
+        self.assertEqual(hub.subscriber_count, 0)
+
+    def test_saving_publishes_after_commit(self):
+        received = []
+        original = broadcaster.publish
+        broadcaster.publish = received.append
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                dev = Developer.objects.create(name='Ana', email='ana@test.com')
+            with self.captureOnCommitCallbacks(execute=True):
+                make_requirement(dev, 'QA-1')
+        finally:
+            broadcaster.publish = original
+        self.assertEqual(received, [
+            {'scopes': ['developers', 'summary', 'aggregates', f'report:{dev.id}']},
+            {'scopes': ['summary', 'aggregates', f'report:{dev.id}']},
+        ])
+
+    def test_stream_is_refused_under_wsgi(self):
+        self.assertEqual(self.client.get(reverse('change-stream')).status_code, 501)
+
+    async def test_stream_emits_merged_change_events(self):
+        response = await self.async_client.get(reverse('change-stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+
+        broadcaster.publish({'scopes': ['summary', 'report:1']})
+        broadcaster.publish({'scopes': ['summary', 'report:2']})
+        chunk = (await asyncio.wait_for(anext(stream), 1)).decode()
+        event, data = chunk.strip().split('\n')
+        self.assertEqual(event, 'event: change')
+        self.assertEqual(json.loads(data[len('data: '):]), {'scopes': ['report:1', 'report:2', 'summary']})
+        await stream.aclose()
+
+
+class DeveloperReportTests(TestCase):
+    def test_matches_previous_implementation_byte_for_byte(self):
+        dev_ids = seed(developers=2, requirements=200)
+        make_requirement(Developer.objects.get(pk=dev_ids[0]), 'QA-ZERO', estimated_effort_hours=0, unit_tests_total=0, unit_tests_passed=0)
+        renderer = JSONRenderer()
+        for dev_id in dev_ids:
+            for start, end in ((None, None), ('2000-01-01', None), (None, '2000-01-01')):
+                with self.subTest(dev_id=dev_id, start=start, end=end):
+                    self.assertEqual(
+                        renderer.render(build_developer_report(dev_id, start, end)),
+                        renderer.render(legacy_developer_report(dev_id, start, end)),
+                    )
+
+    def test_query_count_does_not_depend_on_rows(self):
+        dev_id = seed(developers=1, requirements=300)[0]
+        with self.assertNumQueries(3):
+            build_developer_report(dev_id)
+
+    def test_row_serializer_matches_drf(self):
+        ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        make_requirement(ana, 'QA-1')
+        make_requirement(ana, 'QA-2', unit_tests_total=0, unit_tests_passed=0, estimated_effort_hours=0, is_qa_approved=True)
+        make_requirement(ana, 'QA-3', unit_tests_total=3, unit_tests_passed=1, estimated_effort_hours=Decimal('7.5'), start_date_real=None)
+        queryset = Requirement.objects.order_by('id')
+        expected = [dict(row) for row in RequirementSerializer(queryset, many=True).data]
+        self.assertEqual([requirement_row(values) for values in queryset.values(*REQUIREMENT_ROW_COLUMNS)], expected)
+        self.assertEqual(list(REQUIREMENT_FIELDS), list(RequirementSerializer.Meta.fields))
+
+        fields = ('status_display', 'unit_test_success_rate', 'id')
+        self.assertEqual(
+            list(reports.requirement_rows(queryset, fields)),
+            [{name: row[name] for name in fields} for row in expected],
+        )
+
+
+class BenchHarnessTests(TestCase):
+    def test_percentile_uses_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile(values, 99)), (50, 95, 99))
+        self.assertEqual(percentile([7.0], 99), 7.0)
+
+    def test_bench_endpoint_reports_latency_queries_and_memory(self):
+        cache.clear()
+        dev_id = seed(developers=2, requirements=40)[0]
+        stats = bench_endpoint(reverse('developer-report', args=[dev_id]), repeat=3, warm=False)
+        self.assertLessEqual(stats['p50_ms'], stats['p95_ms'])
+        self.assertLessEqual(stats['p95_ms'], stats['p99_ms'])
+        self.assertEqual(stats['queries'], 5)  # ETag + snapshot + dev + totales + lista
+        self.assertGreater(stats['peak_kb'], 0)
+        self.assertGreater(stats['bytes'], 0)
+
+
+class RequirementPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dev_id = seed(developers=1, requirements=57, days=10)[0]
+
+    def test_keyset_pages_cover_every_ticket_once(self):
+        url = reverse('developer-requirements', args=[self.dev_id])
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 10, 'fields': 'id,date_completed'}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).json()
+            self.assertLessEqual(len(data['results']), 10)
+            seen += [(row['date_completed'], row['id']) for row in data['results']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertEqual(len(seen), 57)
+        self.assertEqual(len(set(seen)), 57)
+
+    def test_sparse_fields_and_detail(self):
+        url = reverse('developer-requirements', args=[self.dev_id])
+        row = self.client.get(url, {'limit': 1, 'fields': 'id,jira_ticket'}).json()['results'][0]
+        self.assertEqual(set(row), {'id', 'jira_ticket'})
+
+        detail = self.client.get(reverse('requirement-detail', args=[row['id']])).json()
+        self.assertEqual(detail['jira_ticket'], row['jira_ticket'])
+        self.assertIn('description', detail)
+        self.assertEqual(self.client.get(reverse('requirement-detail', args=[0])).status_code, 404)
+
+    def test_totals_without_list(self):
+        url = reverse('developer-report', args=[self.dev_id])
+        data = self.client.get(url, {'include_list': 'false'}).json()
+        self.assertNotIn('requerimientos_lista', data)
+        self.assertEqual(data['total_requerimientos'], 57)
+        data = self.client.get(url, {'fields': 'id'}).json()
+        self.assertEqual(set(data['requerimientos_lista'][0]), {'id'})
+
+    def test_invalid_params(self):
+        url = reverse('developer-requirements', args=[self.dev_id])
+        self.assertEqual(self.client.get(url, {'fields': 'id,secret'}).status_code, 400)
+        # Mensajes para el cliente, no el texto de la excepción de Python
+        for params, detail in (
+            ({'cursor': 'nope'}, "Cursor inválido"),
+            ({'cursor': urlsafe_b64encode(b'2025-01-01').decode()}, "Cursor inválido"),
+            ({'cursor': urlsafe_b64encode(b'2025-01-01|abc').decode()}, "Cursor inválido"),
+            ({'limit': 'abc'}, "limit debe ser un número entero"),
+            ({'start_date': 'bad'}, "start_date: fecha inválida (se espera AAAA-MM-DD)"),
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual((response.status_code, response.json()['detail']), (400, detail))
+        self.assertEqual(self.client.get(reverse('developer-requirements', args=[0])).status_code, 404)
+
+    def test_invalid_dates_are_client_errors_everywhere(self):
+        urls = [
+            reverse('developer-report', args=[self.dev_id]),
+            reverse('developer-reports') + '?ids=all',
+            reverse('aggregates'),
+            reverse('trends'),
+            reverse('developer-trends', args=[self.dev_id]),
+            reverse('export-requirements', args=[self.dev_id, 'csv']),
+            reverse('dashboard'),
+        ]
+        for url in urls:
+            for params in ({'start_date': 'bad'}, {'end_date': '2025-13-01'}):
+                with self.subTest(url=url, params=params):
+                    self.assertEqual(self.client.get(url, params).status_code, 400)
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        self.beto = Developer.objects.create(name='Beto', email='beto@test.com')
+
+    def rollups(self):
+        return list(RequirementDailyRollup.objects.order_by('developer_id', 'day').values('developer_id', 'day', *ROLLUP_FIELDS))
+
+    def test_rollups_follow_saves_reassignments_and_deletes(self):
+        first = make_requirement(self.ana, 'QA-1')
+        make_requirement(self.ana, 'QA-2', is_qa_approved=True)
+        row, = RequirementDailyRollup.objects.values('developer_id', 'total_reqs', 'open_reqs', 'functional_bugs')
+        self.assertEqual(row, {'developer_id': self.ana.id, 'total_reqs': 2, 'open_reqs': 1, 'functional_bugs': 2})
+
+        first.developer = self.beto
+        first.save()
+        self.assertEqual(
+            dict(RequirementDailyRollup.objects.values_list('developer_id', 'total_reqs')),
+            {self.ana.id: 1, self.beto.id: 1},
+        )
+
+        first.delete()
+        self.assertEqual(list(RequirementDailyRollup.objects.values_list('developer_id', flat=True)), [self.ana.id])
+
+    def test_rebuild_matches_incremental_maintenance(self):
+        for i in range(5):
+            make_requirement(self.ana if i % 2 else self.beto, f'QA-{i}')
+        incremental = self.rollups()
+        RequirementDailyRollup.objects.all().delete()
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_seed_builds_rollups(self):
+        seed(developers=2, requirements=100, days=30)
+        incremental = self.rollups()
+        self.assertEqual(rebuild_rollups(), len(incremental))
+        self.assertEqual(self.rollups(), incremental)
+        self.assertEqual(sum(row['total_reqs'] for row in incremental), 100)
+
+
+class RequirementImportTests(TestCase):
+    CSV = (
+        "jira_ticket,developer_email,description,is_qa_approved,unit_tests_total,unit_tests_passed,"
+        "estimated_effort_hours,start_date_real,end_date_real,functional_bugs\n"
+        "QA-1,ANA@test.com,Alta,true,10,8,20.50,2026-01-05,2026-01-07,2\n"
+        "QA-2,beto@test.com,Otra,false,0,0,5,,,0\n"
+        "QA-3,nadie@test.com,Sin dueño,false,0,0,5,,,0\n"
+        "QA-4,ana@test.com,Mal,false,1,5,5,,,0\n"
+    )
+
+    def setUp(self):
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        self.beto = Developer.objects.create(name='Beto', email='beto@test.com')
+
+    def test_csv_upsert_computes_derived_fields_and_rollups(self):
+        result = import_requirements(StringIO(self.CSV), 'csv', batch_size=1)
+        self.assertEqual((result.rows, result.created, result.updated, result.failed), (4, 2, 0, 2))
+        self.assertEqual([error['line'] for error in result.errors], [4, 5])
+
+        req = Requirement.objects.get(jira_ticket='QA-1')
+        self.assertEqual((req.developer, req.unit_tests_failed, req.real_effort_hours), (self.ana, 2, 27))
+        self.assertEqual(req.hours_diff, Decimal('-6.50'))
+
+        # Reimportar actualiza (y puede cambiar de dueño) sin duplicar
+        lines = [json.dumps({'jira_ticket': 'QA-1', 'developer_email': 'beto@test.com', 'is_qa_approved': False})]
+        result = import_requirements(StringIO('\n'.join(lines)), 'jsonl')
+        self.assertEqual((result.created, result.updated), (0, 1))
+        req.refresh_from_db()
+        self.assertEqual((req.developer, req.real_effort_hours, req.hours_diff), (self.beto, 0, 0))
+
+        incremental = list(RequirementDailyRollup.objects.order_by('developer_id').values_list('developer_id', 'total_reqs'))
+        self.assertEqual(incremental, [(self.beto.id, 2)])
+        rebuild_rollups()
+        self.assertEqual(list(RequirementDailyRollup.objects.order_by('developer_id').values_list('developer_id', 'total_reqs')), incremental)
+
+    def test_non_finite_hours_are_row_errors(self):
+        lines = [
+            json.dumps({'jira_ticket': f'QA-{value}', 'developer_email': 'ana@test.com', 'estimated_effort_hours': value})
+            for value in ('NaN', 'Infinity', '-inf', 'sNaN')
+        ]
+        result = import_requirements(StringIO('\n'.join(lines)), 'jsonl')
+        self.assertEqual((result.rows, result.created, result.failed), (4, 0, 4))
+        self.assertTrue(all('número inválido' in error['error'] for error in result.errors))
+
+    def test_integers_and_ticket_length_are_strict(self):
+        rows = [
+            {'jira_ticket': 'QA-1', 'functional_bugs': 3.7},
+            {'jira_ticket': 'QA-2', 'functional_bugs': True},
+            {'jira_ticket': 'QA-3', 'functional_bugs': '-1'},
+            {'jira_ticket': 'QA-4', 'functional_bugs': '2.0'},
+            {'jira_ticket': 'X' * 251},
+            {'jira_ticket': 'QA-6', 'functional_bugs': ' 4 ', 'unit_tests_total': 2},
+        ]
+        lines = [json.dumps({'developer_email': 'ana@test.com', **row}) for row in rows]
+        result = import_requirements(StringIO('\n'.join(lines)), 'jsonl')
+        self.assertEqual((result.created, result.failed), (1, 5))
+        self.assertEqual([error['line'] for error in result.errors], [1, 2, 3, 4, 5])
+        self.assertIn('250', result.errors[-1]['error'])
+        self.assertEqual(Requirement.objects.get().functional_bugs, 4)
+
+    def test_unreadable_lines_do_not_abort_the_import(self):
+        header = 'jira_ticket,developer_email\n'
+        text = header + 'QA-1,ana@test.com\n' + 'QA-2,ana@test.com,' + 'x' * 140000 + '\n' + 'QA-3,ana@test.com\n'
+        result = import_requirements(StringIO(text), 'csv')
+        self.assertEqual((result.created, result.failed), (2, 1))
+        self.assertIn('CSV inválido', result.errors[0]['error'])
+
+        # Un byte que no es UTF-8 a mitad del archivo: se informa lo ya importado
+        admin = get_user_model().objects.create_superuser('admin', 'admin@test.com', 'x')
+        self.client.force_login(admin)
+        good = ''.join(f'QA-{n:0>40},ana@test.com\n' for n in range(200)).encode()
+        upload = SimpleUploadedFile('tickets.csv', header.encode() + good + b'QA-\xff,ana@test.com\n')
+        response = self.client.post(reverse('requirement-import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertGreater(data['created'], 0)
+        self.assertEqual(data['failed'], 1)
+        self.assertIn('UTF-8', data['errors'][0]['error'])
+        self.assertEqual(Requirement.objects.count(), 2 + data['created'])
+
+    def test_command_and_admin_only_endpoint(self):
+        out = StringIO()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / 'tickets.csv'
+        path.write_text(self.CSV, encoding='utf-8')
+        call_command('import_requirements', str(path), stdout=out, stderr=StringIO())
+        self.assertIn('Creadas: 2', out.getvalue())
+
+        url = reverse('requirement-import')
+        upload = SimpleUploadedFile('tickets.csv', self.CSV.encode())
+        self.assertEqual(self.client.post(url, {'file': upload}).status_code, 403)
+
+        admin = get_user_model().objects.create_superuser('admin', 'admin@test.com', 'x')
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile('tickets.csv', self.CSV.encode())
+        data = self.client.post(url, {'file': upload}).json()
+        self.assertEqual((data['created'], data['updated'], data['failed']), (0, 2, 2))
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dev_id = seed(developers=2, requirements=30, days=10)[0]
+
+    def read_csv(self, response):
+        return list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_csv_exports_match_the_api(self):
+        response = self.client.get(reverse('export-requirements', args=[self.dev_id, 'csv']))
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        exported = self.read_csv(response)
+        api_rows = self.client.get(reverse('developer-report', args=[self.dev_id])).json()['requerimientos_lista']
+        self.assertEqual(len(exported), 15)
+        self.assertEqual([row['jira_ticket'] for row in exported], [row['jira_ticket'] for row in api_rows])
+        self.assertEqual(exported[0]['estimated_effort_hours'], api_rows[0]['estimated_effort_hours'])
+
+        summary = self.read_csv(self.client.get(reverse('export-summary', args=['csv'])))
+        api_summary = self.client.get(reverse('general-summary')).json()
+        self.assertEqual([int(row['total_reqs']) for row in summary], [row['total_reqs'] for row in api_summary])
+
+        fields = self.read_csv(self.client.get(reverse('export-requirements', args=[self.dev_id, 'csv']), {'fields': 'id,jira_ticket'}))
+        self.assertEqual(set(fields[0]), {'id', 'jira_ticket'})
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get(reverse('export-summary', args=['pdf'])).status_code, 400)
+        self.assertEqual(self.client.get(reverse('export-requirements', args=[0, 'csv'])).status_code, 404)
+        url = reverse('export-requirements', args=[self.dev_id, 'csv'])
+        self.assertEqual(self.client.get(url, {'fields': 'secret'}).status_code, 400)
+
+    def test_write_errors_are_not_client_errors(self):
+        with mock.patch('metrics.views.export_response', side_effect=ValueError('boom')):
+            with self.assertRaises(ValueError):
+                self.client.get(reverse('export-summary', args=['xlsx']))
+
+    @skipUnless(exports.pq, "requiere pyarrow")
+    def test_parquet_schema_is_declared(self):
+        # El primer lote trae decimales chicos y porcentajes enteros; los siguientes, no
+        rows = [
+            {'id': pk, 'estimated_effort_hours': '1.00' if pk <= exports.CHUNK_ROWS else '9999.50',
+             'deviation_hours': Decimal('1.00') if pk <= exports.CHUNK_ROWS else Decimal('-12345.50'),
+             'date_completed': '2025-01-02', 'functional_pct': 0 if pk <= exports.CHUNK_ROWS else 87.5}
+            for pk in range(1, exports.CHUNK_ROWS * 2 + 1)
+        ]
+        handle = tempfile.TemporaryFile()
+        self.addCleanup(handle.close)
+        exports.write_parquet(handle, tuple(rows[0]), iter(rows))
+        handle.seek(0)
+        table = exports.pq.read_table(handle)
+        self.assertEqual(table.schema.field('estimated_effort_hours').type, exports.pa.decimal128(12, 2))
+        self.assertEqual(table.column('deviation_hours')[-1].as_py(), Decimal('-12345.50'))
+        self.assertEqual(table.column('date_completed')[0].as_py(), date(2025, 1, 2))
+        self.assertEqual(table.column('functional_pct').type, exports.pa.float64())
+
+    def test_binary_formats(self):
+        for fmt, available in (('xlsx', exports.openpyxl), ('parquet', exports.pq)):
+            with self.subTest(fmt=fmt):
+                response = self.client.get(reverse('export-requirements', args=[self.dev_id, fmt]))
+                if not available:
+                    self.assertEqual(response.status_code, 501)
+                    continue
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(b''.join(response.streaming_content))
+
+
+class AggregatesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dev_ids = seed(developers=5, requirements=200, days=90)
+
+    def test_developer_groups_match_individual_reports(self):
+        rows = self.client.get(reverse('aggregates'), {'group_by': 'developer', 'start_date': '2000-01-01'}).json()
+        self.assertEqual([row['developer_id'] for row in rows], self.dev_ids)
+        for row in rows:
+            report = json.loads(JSONRenderer().render(build_developer_report(row['developer_id'], include_list=False)))
+            del report['developer_id']
+            self.assertEqual({key: row[key] for key in report}, report)
+
+    def test_multi_level_grouping_with_constant_queries(self):
+        url = reverse('aggregates')
+        by_rol = self.client.get(url).json()
+        self.assertEqual(sum(row['total_requerimientos'] for row in by_rol), 200)
+        self.assertEqual(len({row['rol'] for row in by_rol}), len(by_rol))
+
+        cache.clear()
+        # 2 consultas de versión (ETag) + 1 agrupada, sin importar cuántos grupos haya
+        with self.assertNumQueries(3):
+            rows = self.client.get(url, {'group_by': 'rol,month'}).json()
+        self.assertEqual(sum(row['total_requerimientos'] for row in rows), 200)
+        self.assertLessEqual({'rol', 'month', 'dde_score', 'tiempo_eficiencia_pct', 'unit_pct'}, set(rows[0]))
+
+        weekly = self.client.get(url, {'group_by': 'week'}).json()
+        self.assertTrue(all(date.fromisoformat(row['week']).weekday() == 0 for row in weekly))
+        self.assertEqual(sum(row['total_requerimientos'] for row in weekly), 200)
+        self.assertEqual(self.client.get(url, {'group_by': 'rol,year'}).status_code, 400)
+
+
+class TrendsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dev_ids = seed(developers=3, requirements=300, days=120)
+
+    def test_buckets_and_rolling_windows_match_report_math(self):
+        dev_id = self.dev_ids[0]
+        data = self.client.get(reverse('developer-trends', args=[dev_id]), {'bucket': 'month', 'window': 2}).json()
+        series = data['series']
+        self.assertEqual(sum(point['total_requerimientos'] for point in series), 100)
+
+        renderer = JSONRenderer()
+        for previous, point in zip([None] + series, series):
+            start = date.fromisoformat(point['bucket'])
+            end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            report = json.loads(renderer.render(build_developer_report(dev_id, start, end, include_list=False)))
+            self.assertEqual(point['dde_score'], report['dde_score'])
+            self.assertEqual(point['tiempo_eficiencia_pct'], report['tiempo_eficiencia_pct'])
+
+            # rolling = el reporte de este mes y el anterior juntos
+            window_start = date.fromisoformat(previous['bucket']) if previous else start
+            rolling = json.loads(renderer.render(build_developer_report(dev_id, window_start, end, include_list=False)))
+            self.assertEqual(point['rolling']['dde_score'], rolling['dde_score'])
+            self.assertEqual(point['rolling']['total_rechazos'], rolling['total_rechazos'])
+
+    def test_rolling_window_counts_empty_periods(self):
+        ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        make_requirement(ana, 'QA-1', rejection_count=1)
+        make_requirement(ana, 'QA-2', rejection_count=3)
+        Requirement.objects.filter(jira_ticket='QA-1').update(date_completed=date(2026, 1, 5))
+        Requirement.objects.filter(jira_ticket='QA-2').update(date_completed=date(2026, 1, 26))
+        rebuild_rollups()
+
+        series = self.client.get(reverse('developer-trends', args=[ana.id]), {'window': 2}).json()['series']
+        self.assertEqual([point['bucket'] for point in series], ['2026-01-05', '2026-01-26'])
+        # Las dos semanas vacías del medio cuentan: la ventana de la última semana ya no llega a QA-1
+        self.assertEqual(series[1]['rolling']['total_rechazos'], 3)
+        series = self.client.get(reverse('developer-trends', args=[ana.id]), {'window': 4}).json()['series']
+        self.assertEqual(series[1]['rolling']['total_rechazos'], 4)
+
+    def test_whole_team_in_one_query(self):
+        with self.assertNumQueries(3):
+            data = self.client.get(reverse('trends')).json()
+        self.assertEqual([dev['developer_id'] for dev in data['developers']], self.dev_ids)
+        self.assertTrue(all(date.fromisoformat(point['bucket']).weekday() == 0 for point in data['developers'][0]['series']))
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(reverse('trends'), {'bucket': 'day'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('trends'), {'window': '0'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('developer-trends', args=[0])).status_code, 404)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        make_requirement(self.ana, 'QA-1')
+
+    def test_worker_builds_snapshots_served_without_recomputing(self):
+        live = self.client.get(reverse('general-summary')).json()
+        call_command('snapshot_worker', once=True, stdout=StringIO())
+        self.assertFalse(MetricsSnapshot.objects.filter(dirty=True).exists())
+
+        # Sólo la lectura del snapshot (el ETag sale de él): no se agrega nada
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('general-summary'))
+        self.assertEqual(response.json(), live)
+        self.assertEqual(response['X-Snapshot-Stale'], 'false')
+        self.assertIn('X-Snapshot-Age', response)
+
+        report = self.client.get(reverse('developer-report', args=[self.ana.id]))
+        self.assertEqual(report['X-Snapshot-Stale'], 'false')
+        self.assertEqual(report.json(), json.loads(JSONRenderer().render(build_developer_report(self.ana.id))))
+        # Con parámetros se calcula en vivo
+        self.assertNotIn('X-Snapshot-Age', self.client.get(reverse('developer-report', args=[self.ana.id]), {'include_list': 'false'}))
+
+    def test_saves_mark_snapshots_dirty_until_rebuilt(self):
+        call_command('snapshot_worker', once=True, stdout=StringIO())
+        make_requirement(self.ana, 'QA-2')
+        self.assertEqual(
+            set(MetricsSnapshot.objects.filter(dirty=True).values_list('scope', flat=True)),
+            {'summary', 'aggregates', f'report:{self.ana.id}'},
+        )
+        response = self.client.get(reverse('general-summary'))
+        self.assertEqual(response['X-Snapshot-Stale'], 'true')
+        self.assertEqual(response.json()[0]['total_reqs'], 1)
+
+        # Si el worker no lo regenera a tiempo se vuelve a calcular en vivo
+        with override_settings(METRICS_SNAPSHOT_MAX_STALENESS=-1):
+            response = self.client.get(reverse('general-summary'))
+        self.assertNotIn('X-Snapshot-Stale', response)
+        self.assertEqual(response.json()[0]['total_reqs'], 2)
+
+        self.assertEqual(rebuild_dirty(), 3)
+        self.assertEqual(self.client.get(reverse('general-summary')).json()[0]['total_reqs'], 2)
+
+    def test_etag_follows_the_served_snapshot(self):
+        call_command('snapshot_worker', once=True, stdout=StringIO())
+        url = reverse('general-summary')
+        clean = self.client.get(url)
+        make_requirement(self.ana, 'QA-2')
+        # El snapshot sucio es el mismo cuerpo: mismo ETag
+        stale = self.client.get(url, HTTP_IF_NONE_MATCH=clean['ETag'])
+        self.assertEqual(stale.status_code, 304)
+
+        rebuild_dirty()
+        fresh = self.client.get(url, HTTP_IF_NONE_MATCH=clean['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(fresh.json()[0]['total_reqs'], 2)
+        self.assertNotEqual(fresh['ETag'], clean['ETag'])
+        # Al volver a calcular en vivo el ETag tampoco es el del snapshot
+        make_requirement(self.ana, 'QA-3')
+        with override_settings(METRICS_SNAPSHOT_MAX_STALENESS=-1):
+            live = self.client.get(url, HTTP_IF_NONE_MATCH=fresh['ETag'])
+        self.assertEqual(live.status_code, 200)
+        self.assertEqual(live.json()[0]['total_reqs'], 3)
+
+    def test_bulk_writes_mark_snapshots_dirty(self):
+        for write in (
+            lambda: import_requirements(StringIO('jira_ticket,developer_email\nQA-9,ana@test.com\n'), 'csv'),
+            lambda: call_command('rebuild_rollups', stdout=StringIO()),
+            lambda: call_command('recompute_effort', stdout=StringIO()),
+        ):
+            call_command('snapshot_worker', once=True, stdout=StringIO())
+            Requirement.objects.filter(jira_ticket='QA-1').update(real_effort_hours=0)  # Sin señales
+            write()
+            self.assertEqual(
+                set(MetricsSnapshot.objects.filter(dirty=True).values_list('scope', flat=True)),
+                {'summary', 'aggregates', f'report:{self.ana.id}'},
+            )
+
+    def test_change_during_rebuild_keeps_snapshot_dirty(self):
+        mark_dirty('summary')
+        version = MetricsSnapshot.objects.get(scope='summary').version
+        mark_dirty('summary')
+        self.assertFalse(rebuild_snapshot('summary', version))
+        self.assertTrue(MetricsSnapshot.objects.get(scope='summary').dirty)
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('developer-report', args=[self.ana.id]))
+        timing = dict(part.strip().split(';', 1) for part in response['Server-Timing'].split(','))
+        self.assertEqual(set(timing), {'total', 'view', 'db', 'render'})
+        self.assertIn('desc="5 queries"', timing['db'])
+
+    def test_repeated_queries_are_flagged_as_n_plus_one(self):
+        def per_developer_loop(request):
+            for pk in range(12):
+                Developer.objects.filter(pk=pk).exists()
+            return HttpResponse('ok')
+
+        middleware = RequestMetricsMiddleware(per_developer_loop)
+        with self.assertLogs('qa_dashboard.requests', 'WARNING') as logs:
+            response = middleware(RequestFactory().get('/api/summary/'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['queries'], record['n_plus_one'][0]['count']), (12, 12))
+        self.assertIn('desc="12 queries"', response['Server-Timing'])
+        self.assertEqual(
+            sql_fingerprint("SELECT 1 FROM t WHERE id = 12 AND name = 'x' AND dev IN (1, 2, 3)"),
+            "SELECT ? FROM t WHERE id = ? AND name = ? AND dev IN (?)",
+        )
+
+    def test_sampling_profiler_dumps_slow_requests(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        with override_settings(REQUEST_PROFILING_SAMPLE_RATE=1, REQUEST_PROFILING_THRESHOLD_MS=0, REQUEST_PROFILING_DIR=tmp.name):
+            with self.assertLogs('qa_dashboard.requests', 'WARNING'):
+                self.client.get(reverse('general-summary'))
+        self.assertEqual(len(list(Path(tmp.name).glob('*_api_summary_*.prof'))), 1)
+
+
+
+def parse_exposition(text):
+    """{'nombre{etiquetas}': valor} de las muestras del formato de texto de Prometheus."""
+    return {
+        line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+        for line in text.splitlines() if line and not line.startswith('#')
+    }
+
+
+class PrometheusExporterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        make_requirement(self.ana, 'QA-1', is_qa_approved=True)
+        make_requirement(self.ana, 'QA-2')
+        make_requirement(self.ana, 'QA-3')
+
+    def scrape(self, **headers):
+        with override_settings(METRICS_EXPORTER_DIR=self.directory, METRICS_EXPORTER_FLUSH_SECONDS=0, INTERNAL_IPS=['127.0.0.1']):
+            response = self.client.get('/metrics', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return parse_exposition(response.content.decode())
+
+    def test_business_gauges_come_from_rollups(self):
+        samples = self.scrape()
+        self.assertEqual(samples['qa_dashboard_requirements'], 3)
+        self.assertEqual(samples['qa_dashboard_open_requirements'], 2)
+        self.assertEqual(samples['qa_dashboard_developers'], 1)
+
+    def test_request_histogram_per_view(self):
+        key = 'qa_dashboard_http_request_duration_seconds_count{view="general-summary"}'
+        before = self.scrape().get(key, 0)
+        for _ in range(2):
+            self.client.get(reverse('general-summary'))
+        samples = self.scrape()
+        self.assertEqual(samples[key] - before, 2)
+        self.assertEqual(
+            samples['qa_dashboard_http_request_duration_seconds_bucket{view="general-summary",le="+Inf"}'],
+            samples[key],
+        )
+        self.assertIn('qa_dashboard_http_requests_total{view="general-summary",method="GET",status="200"}', samples)
+        self.assertIn('qa_dashboard_cache_hit_ratio', samples)
+        self.assertGreaterEqual(samples['qa_dashboard_workers'], 1)
+
+    def test_aggregates_other_workers_through_shared_directory(self):
+        key = 'qa_dashboard_http_requests_total{view="aggregates",method="GET",status="200"}'
+        before = self.scrape().get(key, 0)
+        other_worker = {
+            'pid': 2 ** 22 + 1,  # Fuera del rango de pids: un worker que ya terminó
+            'requests': [['aggregates', 'GET', '200', 5]],
+            'latency': {'aggregates': {'buckets': [5] + [0] * (len(LATENCY_BUCKETS) - 1), 'sum': 0.02, 'count': 5}},
+            'db_connections': 1,
+            'memory_bytes': 1024,
+        }
+        Path(self.directory, f"{other_worker['pid']}.json").write_text(json.dumps(other_worker))
+        Path(self.directory, f"{other_worker['pid'] + 1}.json.tmp").write_text('{"pid"')
+        samples = self.scrape()
+        # Sus contadores se suman, pero su memoria ya no se reporta
+        self.assertEqual(samples[key] - before, 5)
+        self.assertNotIn(f'qa_dashboard_process_resident_memory_bytes{{pid="{other_worker["pid"]}"}}', samples)
+        self.assertTrue(Path(self.directory, f'{registry.as_dict()["pid"]}.json').exists())
+        # Sus archivos se acumulan en dead.json y se borran: el contador no baja
+        self.assertEqual(
+            {path.name for path in Path(self.directory).iterdir()},
+            {'.lock', 'dead.json', f'{registry.as_dict()["pid"]}.json'},
+        )
+        Path(self.directory, f"{other_worker['pid']}.json").write_text(json.dumps(other_worker))
+        self.assertEqual(self.scrape()[key] - before, 10)
+
+    def test_token_is_required_when_configured(self):
+        with override_settings(METRICS_EXPORTER_TOKEN='secreto'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer señal').status_code, 401)
+            self.scrape(HTTP_AUTHORIZATION='Bearer secreto')
+
+    def test_without_token_only_internal_ips(self):
+        with override_settings(METRICS_EXPORTER_TOKEN='', INTERNAL_IPS=[]):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.5').status_code, 403)
+            with override_settings(INTERNAL_IPS=['10.0.0.5']):
+                self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.5').status_code, 200)
+            with override_settings(DEBUG=True):
+                self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class RequirementAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@test.com', 'x'))
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        self.beto = Developer.objects.create(name='Beto', email='beto@test.com', rol=Developer.RolChoices.QA_SENIOR)
+        self.url = reverse('admin:metrics_requirement_changelist')
+
+    def changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        make_requirement(self.ana, 'QA-1')
+        _, few = self.changelist_queries()
+        for number in range(2, 30):
+            make_requirement(self.beto if number % 2 else self.ana, f'QA-{number}')
+        response, many = self.changelist_queries()
+        self.assertEqual(few, many)
+        self.assertContains(response, 'Beto | QA Senior')
+
+    def test_computed_columns_are_sortable(self):
+        start = date(2025, 3, 3)
+        make_requirement(self.ana, 'QA-LENTO', estimated_effort_hours=Decimal('9'), start_date_real=start, end_date_real=start + timedelta(days=4))
+        make_requirement(
+            self.ana, 'QA-RAPIDO', estimated_effort_hours=Decimal('18'), start_date_real=start, end_date_real=start,
+            unit_tests_passed=10,
+        )
+        # Columnas del listado (la 0 es el checkbox de acciones): 4 = unitarias, 5 = esfuerzo, 6 = desvío
+        for order in ('4', '-5', '6'):
+            response, _ = self.changelist_queries(o=order)
+            tickets = [req.jira_ticket for req in response.context['cl'].result_list]
+            self.assertEqual(tickets, ['QA-LENTO', 'QA-RAPIDO'], order)
+
+    def test_developer_filter_only_loads_selected_developer(self):
+        make_requirement(self.ana, 'QA-1')
+        make_requirement(self.beto, 'QA-2')
+        response, _ = self.changelist_queries(developer__id__exact=self.beto.id)
+        self.assertEqual([req.jira_ticket for req in response.context['cl'].result_list], ['QA-2'])
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(response, f'<option value="{self.beto.id}" selected>Beto | QA Senior</option>', html=True)
+        self.assertNotContains(response, '<option value="%d"' % self.ana.id)
+
+        search = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'metrics', 'model_name': 'requirement', 'field_name': 'developer', 'term': 'Be',
+        })
+        self.assertEqual([item['id'] for item in search.json()['results']], [str(self.beto.id)])
+
+    def test_export_action_streams_api_rows(self):
+        first = make_requirement(self.ana, 'QA-1')
+        make_requirement(self.beto, 'QA-2')
+        response = self.client.post(self.url, {'action': 'export_csv', '_selected_action': [first.pk]})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['jira_ticket'], 'QA-1')
+        self.assertEqual(rows[0]['unit_test_success_rate'], '80.0')
+
+
+
+class DeveloperReportsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dev_ids = seed(developers=5, requirements=200, days=60)
+
+    def get(self, **params):
+        cache.clear()
+        return self.client.get(reverse('developer-reports'), params)
+
+    def test_same_shape_as_single_report(self):
+        start = str(date.today() - timedelta(days=30))
+        ids = [self.dev_ids[3], self.dev_ids[0], 999999]
+        data = self.get(ids=','.join(map(str, ids)), start_date=start).json()
+        self.assertEqual(data['not_found'], [999999])
+        self.assertEqual(
+            data['reports'],
+            [self.client.get(reverse('developer-report', args=[pk]), {'start_date': start}).json() for pk in ids[:2]],
+        )
+
+    def test_query_count_is_constant(self):
+        # ETag (2) + desarrolladores + aggregate agrupado + lectura de los tickets
+        for ids in (str(self.dev_ids[0]), ','.join(map(str, self.dev_ids)), 'all'):
+            with self.assertNumQueries(5):
+                response = self.get(ids=ids)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual([report['developer_id'] for report in response.json()['reports']], sorted(self.dev_ids))
+
+    def test_invalid_ids(self):
+        self.assertEqual(self.get().status_code, 400)
+        self.assertEqual(self.get(ids='1,x').status_code, 400)
+
+
+class RenderingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        for number in range(30):
+            make_requirement(self.ana, f'QA-{number}', estimated_effort_hours=Decimal('12.50'), description='Línea\u2028nueva')
+
+    def test_fast_renderer_matches_drf(self):
+        data = build_developer_report(self.ana.id)
+        data['generado'] = timezone.now()
+        fast = FastJSONRenderer().render(data)
+        drf = JSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(drf))
+        self.assertNotIn('\u2028'.encode(), fast)
+
+    def test_large_json_responses_are_compressed(self):
+        url = reverse('developer-report', args=[self.ana.id])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.client.get(url).json())
+
+        with override_settings(RESPONSE_COMPRESSION_MIN_BYTES=10**9):
+            self.assertFalse(self.client.get(url, HTTP_ACCEPT_ENCODING='gzip').has_header('Content-Encoding'))
+        # El HTML del admin no se comprime (BREACH)
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@test.com', 'x'))
+        admin_page = self.client.get(reverse('admin:metrics_requirement_changelist'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(admin_page.has_header('Content-Encoding'))
+
+@skipUnless(engine.np is not None, 'El motor en memoria requiere NumPy')
+class MetricsEngineTests(TestCase):
+    """El backend en memoria debe devolver exactamente lo mismo que las consultas del ORM."""
+
+    def setUp(self):
+        cache.clear()
+        self.dev_ids = seed(developers=6, requirements=600, days=120)
+        store = engine.store
+        engine.store = engine.ColumnStore()
+        self.addCleanup(setattr, engine, 'store', store)
+
+    def assertParity(self):
+        self.assertEqual(engine.build_general_summary(), reports.build_general_summary())
+        ranges = [(None, None), (str(date.today() - timedelta(days=45)), str(date.today() - timedelta(days=10)))]
+        for start, end in ranges:
+            for dev_id in self.dev_ids:
+                self.assertEqual(
+                    engine.build_developer_report(dev_id, start, end, include_list=False),
+                    reports.build_developer_report(dev_id, start, end, include_list=False),
+                )
+            self.assertEqual(
+                engine.build_developer_reports(None, start, end), reports.build_developer_reports(None, start, end),
+            )
+            for group_by in (('rol',), ('developer',), ('month',), ('rol', 'week'), ('developer', 'month', 'week')):
+                self.assertEqual(
+                    engine.build_aggregates(group_by, start, end), reports.build_aggregates(group_by, start, end),
+                    group_by,
+                )
+
+    def test_parity_with_orm(self):
+        self.assertParity()
+        self.assertIsNone(engine.build_developer_report(max(self.dev_ids) + 1))
+        self.assertEqual(len(engine.store), 600)
+
+    def test_incremental_refresh(self):
+        engine.build_general_summary()
+        # Cambios en este proceso (señales que avisan al motor después del commit)
+        requirement = Requirement.objects.filter(developer_id=self.dev_ids[0]).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            requirement.functional_bugs += 3
+            requirement.developer_id = self.dev_ids[1]
+            requirement.save()
+            make_requirement(Developer.objects.get(pk=self.dev_ids[2]), 'QA-NUEVO')
+            Requirement.objects.filter(developer_id=self.dev_ids[3]).first().delete()
+        # ...y en "otro worker": la copia de este proceso sólo se entera por el ChangeLog
+        other = list(Requirement.objects.filter(developer_id=self.dev_ids[4]).values_list('pk', 'developer_id'))
+        Requirement.objects.filter(developer_id=self.dev_ids[4]).update(rejection_count=9)
+        changes.record(changes.REQUIREMENT, changes.UPSERT, other)
+        Requirement.objects.filter(pk=Requirement.objects.filter(developer_id=self.dev_ids[5]).values('pk')[:1]).delete()
+        Developer.objects.filter(pk=self.dev_ids[5]).update(name='Renombrado')
+        changes.record(changes.DEVELOPER, changes.UPSERT, [(self.dev_ids[5], self.dev_ids[5])])
+        # Recálculo masivo (bulk_update): también queda en el ChangeLog
+        Requirement.objects.filter(developer_id=self.dev_ids[1]).update(real_effort_hours=0)
+        call_command('recompute_effort', stdout=StringIO())
+        rebuild_rollups()
+        self.assertParity()
+        self.assertEqual(len(engine.store), Requirement.objects.count())
+        self.assertEqual(engine.store.cursor, current_cursor())
+        # Sin cambios nuevos la sincronización es una sola consulta
+        with self.assertNumQueries(1):
+            engine.store.sync()
+
+    def test_views_use_configured_backend(self):
+        with override_settings(METRICS_BACKEND='engine'):
+            with self.assertNumQueries(6):  # ETag, snapshot y la carga inicial del motor (3)
+                engine_summary = self.client.get(reverse('general-summary')).json()
+            cache.clear()
+            engine_report = self.client.get(reverse('developer-report', args=[self.dev_ids[0]]), {'include_list': 'false'}).json()
+        cache.clear()
+        self.assertEqual(engine_summary, self.client.get(reverse('general-summary')).json())
+        self.assertEqual(
+            engine_report,
+            self.client.get(reverse('developer-report', args=[self.dev_ids[0]]), {'include_list': 'false'}).json(),
+        )
+
+
+class DashboardEndpointTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        self.beto = Developer.objects.create(name='Beto', email='beto@test.com')
+        make_requirement(self.ana, 'QA-1')
+        make_requirement(self.ana, 'QA-2', functional_bugs=4)
+        make_requirement(self.beto, 'QA-3')
+
+    def test_matches_individual_endpoints(self):
+        data = self.client.get(reverse('dashboard'), {'dev_id': self.ana.id}).json()
+        self.assertEqual(data['summary'], self.client.get(reverse('general-summary')).json())
+        self.assertEqual(data['developers'], self.client.get(reverse('developer-list')).json())
+        self.assertEqual(data['report'], self.client.get(reverse('developer-report', args=[self.ana.id])).json())
+
+        today = str(date.today())
+        ranged = self.client.get(reverse('dashboard'), {'dev_id': self.beto.id, 'start_date': today, 'end_date': today})
+        self.assertEqual(
+            ranged.json()['report'],
+            self.client.get(reverse('developer-report', args=[self.beto.id]), {'start_date': today, 'end_date': today}).json(),
+        )
+
+    def test_queries_run_on_the_request_connection(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'), {'dev_id': self.ana.id})
+        self.assertGreater(len(queries), 0)
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+
+    def test_report_is_optional(self):
+        data = self.client.get(reverse('dashboard')).json()
+        self.assertIsNone(data['report'])
+        self.assertEqual(data['cursor'], current_cursor())
+        self.assertIsNone(self.client.get(reverse('dashboard'), {'dev_id': self.beto.id + 100}).json()['report'])
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(reverse('dashboard'), {'dev_id': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('dashboard'), {'start_date': '2025-13-01'}).status_code, 400)
+
+    def test_stale_snapshots_are_not_served_next_to_the_cursor(self):
+        call_command('snapshot_worker', once=True, stdout=StringIO())
+        make_requirement(self.beto, 'QA-4')
+        # /api/summary/ todavía sirve el snapshot sucio...
+        self.assertEqual(self.client.get(reverse('general-summary'))['X-Snapshot-Stale'], 'true')
+        # ...pero el Dashboard ya incluye el cambio anterior a su cursor
+        data = self.client.get(reverse('dashboard'), {'dev_id': self.beto.id}).json()
+        self.assertEqual(data['cursor'], current_cursor())
+        self.assertEqual(sum(row['total_reqs'] for row in data['summary']), 4)
+        self.assertEqual(data['report']['total_requerimientos'], 2)
+
+class ChangesFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ana = Developer.objects.create(name='Ana', email='ana@test.com')
+        self.beto = Developer.objects.create(name='Beto', email='beto@test.com')
+        self.first = make_requirement(self.ana, 'QA-1')
+        self.second = make_requirement(self.ana, 'QA-2')
+
+    def changes(self, since, **params):
+        response = self.client.get(reverse('changes'), {'since': since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_only_returns_what_changed_since_cursor(self):
+        cursor = current_cursor()
+        self.assertEqual(self.changes(cursor)['requirements'], {'upserted': [], 'deleted': []})
+
+        self.first.functional_bugs = 3
+        self.first.developer = self.beto
+        self.first.save()
+        second_pk = self.second.pk
+        self.second.delete()
+        data = self.changes(cursor)
+        self.assertFalse(data['reset'])
+        self.assertEqual(data['cursor'], current_cursor())
+        expected = self.client.get(reverse('requirement-detail', args=[self.first.pk])).json()
+        self.assertEqual(data['requirements']['upserted'], [dict(expected, developer_id=self.beto.id)])
+        self.assertEqual(data['requirements']['deleted'], [second_pk])
+        self.assertEqual(data['developers'], {'upserted': [], 'deleted': []})
+        # Resumen y totales de los dos desarrolladores: el dueño anterior también cambió
+        self.assertEqual(data['aggregates']['summary'], self.client.get(reverse('general-summary')).json())
+        self.assertEqual(
+            [(report['developer_id'], report['total_requerimientos']) for report in data['aggregates']['reports']],
+            [(self.ana.id, 0), (self.beto.id, 1)],
+        )
+        self.assertEqual(self.changes(data['cursor'])['cursor'], data['cursor'])
+
+    def test_pages_deletes_and_reset(self):
+        cursor = current_cursor()
+        self.beto.name = 'Beto B.'
+        self.beto.save()
+        ana_pk, requirement_pks = self.ana.pk, [self.first.pk, self.second.pk]
+        self.ana.delete()
+        data = self.changes(cursor, limit=1)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(data['developers']['upserted'][0]['name'], 'Beto B.')
+        rest = self.changes(data['cursor'], limit=100)
+        self.assertFalse(rest['has_more'])
+        self.assertEqual(rest['developers']['deleted'], [ana_pk])
+        self.assertEqual(rest['requirements']['deleted'], requirement_pks)
+        self.assertEqual(rest['aggregates']['summary'], [])
+
+        ChangeLog.objects.filter(id__lte=cursor).update(created_at=timezone.now() - timedelta(days=90))
+        call_command('prune_changelog', days=30, stdout=StringIO())
+        self.assertTrue(self.changes(0)['reset'])
+        self.assertFalse(self.changes(cursor)['reset'])
+        self.assertTrue(self.changes(current_cursor() + 1)['reset'])
+        self.assertEqual(self.client.get(reverse('changes'), {'since': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('changes'), {'limit': 0}).status_code, 400)
+
+    def test_import_is_recorded(self):
+        cursor = current_cursor()
+        import_requirements(StringIO('jira_ticket,developer_email\nQA-1,beto@test.com\nQA-9,beto@test.com\n'), 'csv')
+        data = self.changes(cursor)
+        self.assertEqual([row['jira_ticket'] for row in data['requirements']['upserted']], ['QA-1', 'QA-9'])
+        self.assertEqual([row['id'] for row in data['aggregates']['summary']], [self.ana.id, self.beto.id])
+
+
+@skipUnlessDBFeature('supports_partial_indexes')
+class QueryPlanTests(TestCase):
+    """Los filtros de los reportes y del admin deben usar los índices compuestos/parciales."""
+
+    def setUp(self):
+        self.dev_id = seed(developers=3, requirements=300)[0]
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor != 'sqlite':
+            self.skipTest('El plan sólo se verifica con EXPLAIN QUERY PLAN de SQLite')
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {index_name}', plan, plan)
+
+    def plans(self, table, run):
+        """EXPLAIN QUERY PLAN de las consultas sobre `table` que ejecuta `run()`, tal cual se enviaron."""
+        if connection.vendor != 'sqlite':
+            self.skipTest('El plan sólo se verifica con EXPLAIN QUERY PLAN de SQLite')
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        sqls = [query['sql'] for query in queries.captured_queries if f'FROM "{table}"' in query['sql']]
+        self.assertTrue(sqls)
+        with connection.cursor() as cursor:
+            for sql in sqls:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                yield ' '.join(row[-1] for row in cursor.fetchall())
+
+    def test_requirement_page_keyset(self):
+        requirements_qs = filter_by_dates(Requirement.objects.filter(developer_id=self.dev_id), '2025-01-01', '2026-12-31')
+        first = reports.requirement_page(requirements_qs, limit=5)
+        for cursor in (None, first['next_cursor']):
+            for plan in self.plans('metrics_requirement', lambda: reports.requirement_page(requirements_qs, cursor, limit=5)):
+                self.assertIn('USING INDEX req_dev_date_idx (developer_id=? AND date_completed>', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_rollup_date_range(self):
+        run = lambda: build_developer_report(self.dev_id, '2025-01-01', '2026-12-31', include_list=False)
+        for plan in self.plans('metrics_requirementdailyrollup', run):
+            # Índice de la restricción única (developer, day)
+            self.assertIn('(developer_id=? AND day>', plan)
+
+    def test_admin_filters(self):
+        self.assertUsesIndex(Requirement.objects.filter(is_qa_approved=True, date_completed__gte='2025-01-01'), 'req_approved_date_idx')
+        self.assertUsesIndex(Requirement.objects.filter(is_qa_approved=False, date_completed__gte='2025-01-01'), 'req_pending_date_idx')
@@ -1,6 +1,10 @@
 # metrics/urls.py
 from django.urls import path
-from .views import DeveloperReportView, DeveloperListView, GeneralSummaryView, create_admin_view
+from .views import (
+    AggregatesView, DeveloperReportView, DeveloperReportsView, DeveloperListView, DeveloperRequirementsView, DeveloperTrendsView,
+    ChangesView, GeneralSummaryView, RequirementDetailView, RequirementImportView, TrendsView, CacheStatsView,
+    change_stream, create_admin_view, dashboard, export_requirements, export_summary,
+)
 
 urlpatterns = [
     # Ruta para obtener la lista de desarorlladores
@@ -8,6 +12,30 @@ urlpatterns = [
 
     # Ruta que el frontend React consumirá: /api/reports/2/ (para el dev ID 2)
     path('reports/<int:dev_id>/', DeveloperReportView.as_view(), name='developer-report'),
+    # Varios desarrolladores en una respuesta: /api/reports/?ids=1,2,3 (o ids=all)
+    path('reports/', DeveloperReportsView.as_view(), name='developer-reports'),
+    # Tickets del dev paginados por cursor y el detalle de un ticket
+    path('reports/<int:dev_id>/requirements/', DeveloperRequirementsView.as_view(), name='developer-requirements'),
+    path('requirements/<int:pk>/', RequirementDetailView.as_view(), name='requirement-detail'),
     path('summary/', GeneralSummaryView.as_view(), name='general-summary'),
+    # Resumen + desarrolladores + reporte del dev elegido en un solo request (refresco del Dashboard)
+    path('dashboard/', dashboard, name='dashboard'),
+    # Carga masiva desde exportaciones de Jira (CSV/JSONL)
+    path('import/requirements/', RequirementImportView.as_view(), name='requirement-import'),
+    # Totales por rol / desarrollador / mes / semana (combinables: ?group_by=rol,month)
+    path('aggregates/', AggregatesView.as_view(), name='aggregates'),
+    # Series por semana/mes con promedio móvil (de un dev o de todo el equipo)
+    path('trends/', TrendsView.as_view(), name='trends'),
+    path('trends/<int:dev_id>/', DeveloperTrendsView.as_view(), name='developer-trends'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+
+    # Descargas (CSV/XLSX/Parquet) con las mismas filas que los reportes
+    path('export/summary.<str:fmt>', export_summary, name='export-summary'),
+    path('export/reports/<int:dev_id>/requirements.<str:fmt>', export_requirements, name='export-requirements'),
+
+    # Feed de cambios en vivo (SSE) que reemplaza al polling del frontend
+    path('stream/', change_stream, name='change-stream'),
+    # Sincronización incremental: sólo lo que cambió desde el cursor (?since=<seq>)
+    path('changes/', ChangesView.as_view(), name='changes'),
     path('fix-admin/', create_admin_view),
 ]
\ No newline at end of file
@@ -2,14 +2,63 @@ from rest_framework import generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
 from django.db.models import Sum, Count, F, Case, When, ExpressionWrapper, fields
 from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from asgiref.sync import sync_to_async
 from datetime import timedelta
 from decimal import Decimal
+import asyncio
+import json
 
 from .models import Developer, Requirement
 from .serializers import DeveloperReportSerializer, DeveloperSerializer, RequirementSerializer
+from .reports import (
+    REQUIREMENT_FIELDS, SUMMARY_FIELDS, build_general_summary,
+    build_requirement_detail, build_trends, filter_by_dates, parse_date_range, parse_fields, parse_group_by,
+    parse_ids, parse_page_limit, parse_trend_params, requirement_page, requirement_rows,
+)
+from .cache import AGGREGATES, DEVELOPERS, SUMMARY, cache_stats, cached_payload, cached_value, report_scope
+from .broadcast import broadcaster
+from .changes import build_changes, current_cursor, parse_limit, parse_since
+from .snapshots import latest_snapshot
+from .engine import metrics_backend
+from .exports import FORMATS as EXPORT_FORMATS, ExportUnavailable, export_response
+from .renderers import FastJSONRenderer
+from .ingest import FORMATS, detect_format, import_requirements, text_stream
+from .conditional import aggregates_etag, conditional_get, developers_etag, report_etag, snapshot_etag, summary_etag
 
+# Valores de query param que se interpretan como "no"
+FALSE_VALUES = ('0', 'false', 'no')
+
+
+def snapshot_response(request):
+    """Respuesta desde el snapshot que leyó el ETag (ver conditional.snapshot_etag), o None si no hay uno vigente."""
+    snapshot = getattr(request, 'snapshot', None)
+    if snapshot is None:
+        return None
+    return Response(snapshot.payload, status=status.HTTP_200_OK, headers=snapshot.headers)
+
+
+# Scopes con snapshot: sólo la respuesta sin parámetros se precalcula
+def _summary_snapshot(request):
+    return SUMMARY
+
+
+def _report_snapshot(request, dev_id):
+    return None if request.query_params else report_scope(dev_id)
+
+
+def _aggregates_snapshot(request):
+    return None if request.query_params else AGGREGATES
+
+
+@conditional_get(developers_etag)
 class DeveloperListView(generics.ListAPIView):
     """
     GET /api/developers/
@@ -18,160 +67,434 @@ class DeveloperListView(generics.ListAPIView):
     queryset = Developer.objects.all().order_by('name')
     serializer_class = DeveloperSerializer
 
+    def list(self, request, *args, **kwargs):
+        data = cached_payload(
+            DEVELOPERS, request,
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+        )
+        return Response(data)
+
+
+@conditional_get(snapshot_etag(_report_snapshot, report_etag))
 class DeveloperReportView(APIView):
     """
-    Calcula las métricas usando Python puro para evitar errores de ORM con SQLite.
+    GET /api/reports/<dev_id>/?start_date=&end_date=&include_list=&fields=
+    Totales agregados en la BD + lista de tickets armada desde values().
+    - include_list=false: sólo totales (la lista se pide paginada aparte).
+    - fields=id,jira_ticket,...: campos a incluir en cada ticket de la lista.
     """
     def get(self, request, dev_id, format=None):
+        if response := snapshot_response(request):
+            return response
         try:
-            developer = Developer.objects.get(pk=dev_id)
-        except Developer.DoesNotExist:
+            fields = parse_fields(request.query_params.get('fields'))
+            start_date, end_date = parse_date_range(
+                request.query_params.get('start_date'), request.query_params.get('end_date')
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = cached_payload(
+            report_scope(dev_id), request,
+            lambda: metrics_backend().build_developer_report(
+                dev_id,
+                start_date,
+                end_date,
+                include_list=request.query_params.get('include_list', '').lower() not in FALSE_VALUES,
+                fields=fields,
+            ),
+        )
+        if data is None:
             return Response({"detail": "Dev no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
-        # 1. Obtener requerimientos y filtrar por fecha si es necesario
-        requirements_qs = Requirement.objects.filter(developer=developer)
-        
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-
-        if start_date:
-            requirements_qs = requirements_qs.filter(date_completed__gte=start_date)
-        if end_date:
-            requirements_qs = requirements_qs.filter(date_completed__lte=end_date)
-
-        # 2. Inicializar contadores
-        total_reqs = 0
-        unit_total = 0
-        unit_passed = 0
-        bugs_qa = 0
-        bugs_prod = 0
-        rechazos = 0
-        hours_est = Decimal(0.0)
-        hours_real = Decimal(0.0)
-
-        serialized_reqs = []
-
-        # 3. Iterar y sumar (Cálculo en Python = No Error 500)
-        for req in requirements_qs:
-            total_reqs += 1
-            unit_total += req.unit_tests_total
-            unit_passed += req.unit_tests_passed
-            
-            # Sumar bugs de este ticket
-            bugs_qa += (req.functional_bugs + req.integration_bugs + req.regression_bugs)
-            bugs_prod += req.production_bugs
-            rechazos += req.rejection_count
-            
-            hours_est += req.estimated_effort_hours
-            # Usamos la propiedad del modelo que ya tiene la lógica de 9 horas
-            hours_real += Decimal(req.real_effort_hours) 
-
-            # Preparamos la data para la lista desplegable del frontend
-            serialized_reqs.append(RequirementSerializer(req).data)
-
-        # 4. Cálculos finales
-        unit_failed = unit_total - unit_passed
-        
-        # DDE (Eficacia QA)
-        total_issues = bugs_qa + bugs_prod
-        dde_score = 0
-        if total_issues > 0:
-            dde_score = round((bugs_qa / total_issues) * 100, 1)
-        elif total_reqs > 0:
-            dde_score = 100 # Si no hubo bugs, eficacia perfecta
-
-        # Eficiencia de Tiempo
-        diff_hours = hours_est - hours_real
-        tiempo_eficiencia_pct = 0
-        if hours_est > 0:
-            tiempo_eficiencia_pct = round((diff_hours / hours_est) * 100, 1)
-
-        data = {
-            "developer_id": developer.id,
-            "total_requerimientos": total_reqs,
-            "unitarias_total": unit_total,
-            "unitarias_pasadas": unit_passed,
-            "unitarias_fallidas": unit_failed,
-            "total_bugs_qa": bugs_qa,
-            "total_bugs_prod": bugs_prod,
-            "total_rechazos": rechazos,
-            "dde_score": dde_score,
-            "total_estimated_hours": hours_est,
-            "total_real_hours": hours_real,
-            "tiempo_desvio_total": diff_hours,
-            "tiempo_eficiencia_pct": tiempo_eficiencia_pct,
-            "requerimientos_lista": serialized_reqs 
-        }
+        return Response(data, status=status.HTTP_200_OK)
+
+
+@conditional_get(summary_etag)
+class DeveloperReportsView(APIView):
+    """
+    GET /api/reports/?ids=1,2,3|all&start_date=&end_date=&include_list=&fields=
+    Reportes de varios desarrolladores (mismo formato que DeveloperReportView) para
+    compararlos. Cantidad de consultas constante, sin importar cuántos ids se pidan.
+    Los ids que no existen se devuelven en `not_found`.
+    """
+    def get(self, request, format=None):
+        try:
+            dev_ids = parse_ids(request.query_params.get('ids'))
+            fields = parse_fields(request.query_params.get('fields'))
+            start_date, end_date = parse_date_range(
+                request.query_params.get('start_date'), request.query_params.get('end_date')
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            found = metrics_backend().build_developer_reports(
+                dev_ids,
+                start_date,
+                end_date,
+                include_list=request.query_params.get('include_list', '').lower() not in FALSE_VALUES,
+                fields=fields,
+            )
+            returned = {report['developer_id'] for report in found}
+            return {
+                "reports": found,
+                "not_found": [pk for pk in dev_ids or () if pk not in returned],
+            }
+
+        # Un cambio en cualquier desarrollador invalida el scope del resumen
+        return Response(cached_payload(SUMMARY, request, build), status=status.HTTP_200_OK)
+
+
+class DeveloperRequirementsView(APIView):
+    """
+    GET /api/reports/<dev_id>/requirements/?cursor=&limit=&fields=&start_date=&end_date=
+    Tickets del desarrollador paginados por cursor (keyset sobre fecha + id),
+    del más reciente al más antiguo. `next_cursor` es null en la última página.
+    """
+    default_limit = 50
+    max_limit = 500
+
+    def get(self, request, dev_id, format=None):
+        if not Developer.objects.filter(pk=dev_id).exists():
+            return Response({"detail": "Dev no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            fields = parse_fields(request.query_params.get('fields'))
+            limit = parse_page_limit(request.query_params.get('limit'), self.default_limit, self.max_limit)
+            requirements_qs = filter_by_dates(
+                Requirement.objects.filter(developer_id=dev_id),
+                request.query_params.get('start_date'),
+                request.query_params.get('end_date'),
+            )
+            data = requirement_page(
+                requirements_qs,
+                cursor=request.query_params.get('cursor'),
+                limit=limit,
+                fields=fields,
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(data, status=status.HTTP_200_OK)
 
 
+class RequirementDetailView(APIView):
+    """
+    GET /api/requirements/<pk>/?fields=
+    Detalle de un solo ticket (mismos campos que la lista del reporte).
+    """
+    def get(self, request, pk, format=None):
+        try:
+            fields = parse_fields(request.query_params.get('fields'))
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = build_requirement_detail(pk, fields)
+        if data is None:
+            return Response({"detail": "Requerimiento no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(data, status=status.HTTP_200_OK)
+
 
+
+@conditional_get(snapshot_etag(_summary_snapshot, summary_etag))
 class GeneralSummaryView(APIView):
     """
     Genera la matriz de resumen de calidad para todos los desarrolladores.
+    Se calcula en una sola consulta agrupada (SUM/COUNT por desarrollador) o con el
+    motor en memoria (METRICS_BACKEND='engine'), o se sirve el snapshot precalculado si está vigente.
+    """
+    def get(self, request, format=None):
+        if response := snapshot_response(request):
+            return response
+        summary_data = cached_payload(SUMMARY, request, metrics_backend().build_general_summary)
+        return Response(summary_data, status=status.HTTP_200_OK)
+
+
+class RequirementImportView(APIView):
+    """
+    POST /api/import/requirements/  (multipart: file=<csv|jsonl>, format=csv|jsonl opcional)
+    Importación masiva por lotes (ver ingest.py). Sólo para usuarios staff.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, format=None):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Falta el archivo (campo 'file')."}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get('format') or detect_format(upload.name)
+        if fmt not in FORMATS:
+            return Response({"detail": f"Formato no soportado: {fmt}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Los errores (también un archivo que deja de ser UTF-8) van por línea en el resultado:
+        # los lotes anteriores ya quedaron guardados
+        result = import_requirements(text_stream(upload.file), fmt)
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+
+@conditional_get(snapshot_etag(_aggregates_snapshot, aggregates_etag))
+class AggregatesView(APIView):
+    """
+    GET /api/aggregates/?group_by=rol,month&start_date=&end_date=
+    DDE, eficiencia de tiempo, rechazos y % de éxito por categoría agrupados por
+    rol, developer, month y/o week (varios niveles separados por comas).
+    Una sola consulta agrupada, sin importar cuántos grupos haya.
+    """
+    def get(self, request, format=None):
+        if response := snapshot_response(request):
+            return response
+        try:
+            group_by = parse_group_by(request.query_params.get('group_by'))
+            start_date, end_date = parse_date_range(
+                request.query_params.get('start_date'), request.query_params.get('end_date')
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = cached_payload(
+            AGGREGATES, request,
+            lambda: metrics_backend().build_aggregates(group_by, start_date, end_date),
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+def _trend_params(request):
+    bucket, window = parse_trend_params(request.query_params.get('bucket'), request.query_params.get('window'))
+    start_date, end_date = parse_date_range(request.query_params.get('start_date'), request.query_params.get('end_date'))
+    return {'bucket': bucket, 'window': window, 'start_date': start_date, 'end_date': end_date}
+
+
+@conditional_get(summary_etag)
+class TrendsView(APIView):
+    """
+    GET /api/trends/?bucket=week|month&window=4&start_date=&end_date=
+    Series de todos los desarrolladores (con datos) en una sola respuesta, para graficar
+    el historial completo del equipo. Mismo formato que DeveloperTrendsView.
     """
     def get(self, request, format=None):
-        developers = Developer.objects.all()
-        summary_data = []
-
-        for dev in developers:
-            reqs = Requirement.objects.filter(developer=dev)
-            
-            # --- NUEVO: Contamos cuántos requerimientos tiene este Dev ---
-            req_count = reqs.count() 
-            # -------------------------------------------------------------
-
-            # Inicializamos contadores
-            stats = {
-                'functional': {'total': 0, 'bugs': 0},
-                'integration': {'total': 0, 'bugs': 0},
-                'regression': {'total': 0, 'bugs': 0},
-                'unit': {'total': 0, 'bugs': 0}
+        try:
+            params = _trend_params(request)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            series = build_trends(**params)
+            return {
+                "bucket": params['bucket'],
+                "window": params['window'],
+                "developers": [{"developer_id": dev_id, "series": points} for dev_id, points in series.items()],
             }
 
-            for req in reqs:
-                stats['functional']['total'] += (req.functional_cases or 0)
-                stats['functional']['bugs'] += (req.functional_bugs or 0)
-                
-                stats['integration']['total'] += (req.integration_cases or 0)
-                stats['integration']['bugs'] += (req.integration_bugs or 0)
-
-                stats['regression']['total'] += (req.regression_cases or 0)
-                stats['regression']['bugs'] += (req.regression_bugs or 0)
-
-                stats['unit']['total'] += (req.unit_tests_total or 0)
-                stats['unit']['bugs'] += (req.unit_tests_failed or 0)
-
-            def calc_success(total, bugs):
-                if total == 0: return 0
-                success_count = total - bugs
-                return round((success_count / total) * 100, 1)
-
-            dev_summary = {
-                'id': dev.id,
-                'name': dev.name,
-                'total_reqs': req_count,
-                
-                'functional_total': stats['functional']['total'],
-                'functional_bugs': stats['functional']['bugs'],
-                'functional_pct': calc_success(stats['functional']['total'], stats['functional']['bugs']),
-                
-                'integration_total': stats['integration']['total'],
-                'integration_bugs': stats['integration']['bugs'],
-                'integration_pct': calc_success(stats['integration']['total'], stats['integration']['bugs']),
-
-                'regression_total': stats['regression']['total'],
-                'regression_bugs': stats['regression']['bugs'],
-                'regression_pct': calc_success(stats['regression']['total'], stats['regression']['bugs']),
-
-                'unit_total': stats['unit']['total'],
-                'unit_bugs': stats['unit']['bugs'],
-                'unit_pct': calc_success(stats['unit']['total'], stats['unit']['bugs']),
+        return Response(cached_payload(SUMMARY, request, build), status=status.HTTP_200_OK)
+
+
+@conditional_get(report_etag)
+class DeveloperTrendsView(APIView):
+    """
+    GET /api/trends/<dev_id>/?bucket=week|month&window=4&start_date=&end_date=
+    Un punto por semana/mes con los totales y métricas del reporte (DDE, eficiencia,
+    rechazos) y, en `rolling`, las mismas métricas sobre los últimos `window` períodos.
+    """
+    def get(self, request, dev_id, format=None):
+        try:
+            params = _trend_params(request)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            if not Developer.objects.filter(pk=dev_id).exists():
+                return None
+            series = build_trends(dev_ids=[dev_id], **params)
+            return {
+                "developer_id": dev_id,
+                "bucket": params['bucket'],
+                "window": params['window'],
+                "series": series.get(dev_id, []),
             }
-            summary_data.append(dev_summary)
 
-        return Response(summary_data, status=status.HTTP_200_OK)
+        data = cached_payload(report_scope(dev_id), request, build)
+        if data is None:
+            return Response({"detail": "Dev no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class CacheStatsView(APIView):
+    """
+    GET /api/cache/stats/
+    Contadores de aciertos/fallos de la caché de reportes.
+    """
+    def get(self, request, format=None):
+        return Response(cache_stats(), status=status.HTTP_200_OK)
+
+
+class ChangesView(APIView):
+    """
+    GET /api/changes/?since=<seq>&limit=
+    Cambios posteriores al cursor `since` (ver changes.py): filas creadas/modificadas,
+    ids borrados y resumen y totales de los desarrolladores afectados. El cliente sigue
+    pidiendo desde `cursor`; si viene `reset: true` tiene que recargar todo.
+    """
+    def get(self, request, format=None):
+        try:
+            since = parse_since(request.query_params.get('since'))
+            limit = parse_limit(request.query_params.get('limit'))
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(build_changes(since, limit), status=status.HTTP_200_OK)
+
+
+def _export(fmt, filename, columns, rows, title):
+    # Sólo el formato es error del cliente: lo que falle al escribir el archivo es un 500
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({"detail": f"Formato no soportado: {fmt}. Opciones: {', '.join(EXPORT_FORMATS)}"}, status=400)
+    try:
+        return export_response(fmt, filename, columns, rows, title)
+    except ExportUnavailable as exc:
+        return JsonResponse({"detail": str(exc)}, status=501)
+
+
+def export_summary(request, fmt):
+    """
+    GET /api/export/summary.<csv|xlsx|parquet>
+    La matriz de resumen de GeneralSummaryView como archivo descargable.
+    """
+    return _export(fmt, 'resumen_calidad', SUMMARY_FIELDS, build_general_summary(), 'Resumen')
+
+
+def export_requirements(request, dev_id, fmt):
+    """
+    GET /api/export/reports/<dev_id>/requirements.<csv|xlsx|parquet>?start_date=&end_date=&fields=
+    Los tickets del reporte del desarrollador (mismas filas que `requerimientos_lista`),
+    leídos de la BD por lotes mientras se genera el archivo.
+    """
+    if not Developer.objects.filter(pk=dev_id).exists():
+        return JsonResponse({"detail": "Dev no encontrado"}, status=404)
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+        requirements_qs = filter_by_dates(
+            Requirement.objects.filter(developer_id=dev_id),
+            request.GET.get('start_date'),
+            request.GET.get('end_date'),
+        )
+    except ValueError as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+
+    rows = requirement_rows(requirements_qs.order_by('id'), fields)
+    return _export(fmt, f'requerimientos_dev_{dev_id}', fields or REQUIREMENT_FIELDS, rows, 'Requerimientos')
+
+
+# --- Carga inicial / refresco del Dashboard en un solo request ---
+
+# El Dashboard devuelve un cursor de /api/changes/: un snapshot sucio no refleja cambios
+# anteriores a ese cursor (el cliente nunca los recibiría), así que sólo se usan los limpios.
+
+def _dashboard_summary():
+    snapshot = latest_snapshot(SUMMARY, allow_stale=False)
+    if snapshot is not None:
+        return snapshot[0]
+    return cached_value(SUMMARY, reverse('general-summary'), {}, metrics_backend().build_general_summary)
+
+
+def _dashboard_developers():
+    return cached_value(
+        DEVELOPERS, reverse('developer-list'), {},
+        lambda: DeveloperSerializer(Developer.objects.order_by('name'), many=True).data,
+    )
+
+
+def _dashboard_report(dev_id, start_date, end_date):
+    if not (start_date or end_date):
+        snapshot = latest_snapshot(report_scope(dev_id), allow_stale=False)
+        if snapshot is not None:
+            return snapshot[0]
+    # Misma entrada de caché que GET /api/reports/<dev_id>/ con esas fechas
+    params = {'start_date': start_date, 'end_date': end_date}
+    return cached_value(
+        report_scope(dev_id), reverse('developer-report', args=[dev_id]), params,
+        lambda: metrics_backend().build_developer_report(dev_id, start_date, end_date),
+    )
+
+
+def _dashboard_parts(dev_id, start_date, end_date):
+    """
+    Cursor y partes del Dashboard, una tras otra sobre la conexión del request (así las
+    consultas las cuenta RequestMetricsMiddleware y no se abren conexiones extra).
+    """
+    # El cursor se toma antes de armar las partes: lo confirmado hasta ahí ya está en la
+    # respuesta y lo posterior llega por /api/changes/ (a lo sumo se recibe un cambio dos veces)
+    cursor = current_cursor()
+    return {
+        "summary": _dashboard_summary(),
+        "developers": _dashboard_developers(),
+        "report": _dashboard_report(dev_id, start_date, end_date) if dev_id is not None else None,
+        "cursor": cursor,
+    }
+
+
+async def dashboard(request):
+    """
+    GET /api/dashboard/?dev_id=&start_date=&end_date=
+    Resumen general, lista de desarrolladores y (si viene dev_id) el reporte del dev en una
+    sola respuesta: reemplaza los tres requests de cada refresco del frontend. Las tres
+    partes usan los mismos snapshots y entradas de caché que sus endpoints. `report` es null si no se pidió o si el desarrollador no existe; `cursor` es
+    el punto desde el cual pedir /api/changes/.
+    """
+    raw_dev_id = request.GET.get('dev_id')
+    start_date = request.GET.get('start_date') or None
+    end_date = request.GET.get('end_date') or None
+    try:
+        dev_id = int(raw_dev_id) if raw_dev_id else None
+    except ValueError:
+        return JsonResponse({"detail": "dev_id debe ser un número entero"}, status=400)
+    try:
+        parse_date_range(start_date, end_date)
+    except ValueError as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+
+    # Thread sensible: el mismo en el que corren los middlewares, con la misma conexión
+    data = await sync_to_async(_dashboard_parts)(dev_id, start_date, end_date)
+    # Mismo renderer que el resto de la API (ej. Decimal como número)
+    return HttpResponse(FastJSONRenderer().render(data), content_type='application/json')
+
+
+async def change_stream(request):
+    """
+    GET /api/stream/
+    Feed de cambios (Server-Sent Events). Envía un evento `change` con los scopes
+    afectados (summary, developers, report:<id>) cada vez que se guardan datos, para
+    que el dashboard refresque sólo cuando hace falta. Requiere servidor ASGI.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Bajo WSGI una conexión abierta bloquearía un worker entero: el cliente sigue con polling
+        return JsonResponse({"detail": "El feed de cambios requiere un servidor ASGI."}, status=501)
+
+    queue = broadcaster.subscribe()
+    heartbeat = settings.METRICS_STREAM_HEARTBEAT_SECONDS
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                # Juntamos en un solo evento todo lo que llegó en ráfaga
+                scopes = set(event['scopes'])
+                while not queue.empty():
+                    scopes.update(queue.get_nowait()['scopes'])
+                yield f"event: change\ndata: {json.dumps({'scopes': sorted(scopes)})}\n\n"
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Evita que un proxy acumule los eventos
+    return response
 
 
 from django.http import HttpResponse
@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+El feed de cambios en vivo (/api/stream/) mantiene conexiones abiertas, así que
+necesita un servidor ASGI. /api/dashboard/ también es una vista async; bajo ASGI
+no ocupa un worker mientras espera. Por ejemplo:
+    uvicorn qa_dashboard.asgi:application
+    gunicorn qa_dashboard.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
@@ -0,0 +1,212 @@
+# qa_dashboard/middleware.py
+"""
+Instrumentación por request: tiempo total, tiempo de la vista, consultas SQL (cantidad y
+tiempo) y tiempo de serialización (render de la Response de DRF).
+
+- Se devuelve en el header `Server-Timing` (visible en la pestaña Network del navegador)
+  y en un log estructurado (logger `qa_dashboard.requests`, una línea JSON por request).
+- Detecta N+1: si la misma consulta (con los literales normalizados) se repite
+  REQUEST_METRICS_N_PLUS_ONE_THRESHOLD veces o más, se avisa en el log con nivel WARNING.
+- Profiler opcional por muestreo: con REQUEST_PROFILING_SAMPLE_RATE > 0 se corre cProfile
+  en esa fracción de requests y se guarda el .prof de los que superen
+  REQUEST_PROFILING_THRESHOLD_MS en REQUEST_PROFILING_DIR.
+- Alimenta los contadores de requests y latencia por vista del endpoint /metrics
+  (ver prometheus.py).
+
+Con el muestreo apagado el costo es un par de perf_counter() por request y por consulta.
+
+CompressionMiddleware comprime las respuestas grandes de la API (brotli si está instalado
+y el cliente lo acepta, si no gzip).
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+from .prometheus import UNMATCHED, registry
+
+logger = logging.getLogger('qa_dashboard.requests')
+
+# Literales que se reemplazan por "?" para agrupar consultas iguales con distintos parámetros
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_IN_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+
+def sql_fingerprint(sql):
+    """Forma normalizada de una consulta: literales e IN (...) reemplazados por '?'."""
+    return _SQL_IN_LISTS.sub('(?)', _SQL_LITERALS.sub('?', sql))
+
+
+class RequestMetrics:
+    """Contadores de un request. Se instala como execute_wrapper de la conexión."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_ms = None
+        self.render_started = None
+        self.render_ms = None
+        self.queries = 0
+        self.db_ms = 0.0
+        self.fingerprints = Counter()
+        self.profiler = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.fingerprints[sql] += 1
+
+    def repeated_queries(self, threshold):
+        """Consultas (normalizadas) que se repitieron `threshold` veces o más."""
+        grouped = Counter()
+        for sql, count in self.fingerprints.items():
+            grouped[sql_fingerprint(sql)] += count
+        return [(sql, count) for sql, count in grouped.most_common() if count >= threshold]
+
+
+class RequestMetricsMiddleware(MiddlewareMixin):
+    def process_request(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return None
+        metrics = RequestMetrics()
+        request._metrics = metrics
+        connection.execute_wrappers.append(metrics)
+
+        rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        if rate and random.random() < rate:
+            metrics.profiler = cProfile.Profile()
+            metrics.profiler.enable()
+        return None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, '_metrics', None)
+        if metrics:
+            metrics.view_started = time.perf_counter()
+        return None
+
+    def process_template_response(self, request, response):
+        # La Response de DRF se serializa al renderizarse, después de este punto
+        metrics = getattr(request, '_metrics', None)
+        if metrics:
+            metrics.render_started = time.perf_counter()
+            if metrics.view_started is not None:
+                metrics.view_ms = (metrics.render_started - metrics.view_started) * 1000
+            response.add_post_render_callback(lambda rendered: self._rendered(metrics))
+        return response
+
+    @staticmethod
+    def _rendered(metrics):
+        metrics.render_ms = (time.perf_counter() - metrics.render_started) * 1000
+
+    def process_response(self, request, response):
+        metrics = getattr(request, '_metrics', None)
+        if metrics is None:
+            return response
+        if metrics in connection.execute_wrappers:
+            connection.execute_wrappers.remove(metrics)
+
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        if metrics.view_ms is None and metrics.view_started is not None:
+            metrics.view_ms = (time.perf_counter() - metrics.view_started) * 1000
+
+        timings = [f'total;dur={total_ms:.1f}']
+        if metrics.view_ms is not None:
+            timings.append(f'view;dur={metrics.view_ms:.1f}')
+        timings.append(f'db;dur={metrics.db_ms:.1f};desc="{metrics.queries} queries"')
+        if metrics.render_ms is not None:
+            timings.append(f'render;dur={metrics.render_ms:.1f}')
+        response['Server-Timing'] = ', '.join(timings)
+
+        match = getattr(request, 'resolver_match', None)
+        registry.observe_request(
+            match.view_name if match else UNMATCHED, request.method, response.status_code, total_ms / 1000
+        )
+
+        repeated = metrics.repeated_queries(settings.REQUEST_METRICS_N_PLUS_ONE_THRESHOLD)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'view_ms': round(metrics.view_ms, 2) if metrics.view_ms is not None else None,
+            'db_ms': round(metrics.db_ms, 2),
+            'queries': metrics.queries,
+            'render_ms': round(metrics.render_ms, 2) if metrics.render_ms is not None else None,
+        }
+        if repeated:
+            record['n_plus_one'] = [{'sql': sql[:300], 'count': count} for sql, count in repeated]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+        if metrics.profiler:
+            metrics.profiler.disable()
+            if total_ms >= settings.REQUEST_PROFILING_THRESHOLD_MS:
+                self._dump_profile(metrics.profiler, request, total_ms)
+        return response
+
+    @staticmethod
+    def _dump_profile(profiler, request, total_ms):
+        directory = settings.REQUEST_PROFILING_DIR
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+        path = os.path.join(directory, f'{time.strftime("%Y%m%d-%H%M%S")}_{slug}_{total_ms:.0f}ms.prof')
+        profiler.dump_stats(path)
+        logger.warning(json.dumps({'path': request.path, 'total_ms': round(total_ms, 2), 'profile': path}))
+
+
+# Tipos que vale la pena comprimir. El HTML del admin queda afuera a propósito (lleva el
+# token CSRF, ver BREACH) y el streaming también (SSE y descargas no deben acumularse).
+COMPRESSIBLE_TYPES = ('application/json', 'text/csv', 'text/plain')
+_ACCEPTS_BROTLI = re.compile(r'\bbr\b')
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Comprime las respuestas JSON/CSV/texto de al menos RESPONSE_COMPRESSION_MIN_BYTES:
+    brotli si está instalado y el cliente lo acepta, gzip si no (GZipMiddleware de Django).
+    """
+    # Calidad media: en respuestas dinámicas los niveles altos cuestan más de lo que ahorran
+    brotli_quality = 5
+
+    def process_response(self, request, response):
+        if not settings.RESPONSE_COMPRESSION_ENABLED or response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES or len(response.content) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+
+        if brotli is None or not _ACCEPTS_BROTLI.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        # Igual que GZipMiddleware: el ETag fuerte pasa a débil
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
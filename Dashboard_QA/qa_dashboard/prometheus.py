@@ -0,0 +1,325 @@
+# qa_dashboard/prometheus.py
+"""
+Endpoint /metrics en formato de texto de Prometheus (sin dependencias ni servicios externos).
+
+Métricas de operación:
+- Requests y latencia por vista (histograma), alimentados por RequestMetricsMiddleware.
+- Aciertos / fallos de la caché de reportes (metrics.cache.cache_stats).
+- Conexiones a la base abiertas: comparadas con los requests muestran cuánto se reutilizan
+  gracias a conn_max_age.
+- Memoria residente de cada worker.
+Métricas de negocio (requerimientos totales y pendientes de QA) salen de los rollups
+diarios, que ya mantienen esos contadores: una suma sobre pocas filas en vez de recorrer
+todos los tickets.
+
+Con varios workers de gunicorn cada proceso guarda sus contadores en
+METRICS_EXPORTER_DIR/<pid>.json (cada METRICS_EXPORTER_FLUSH_SECONDS como mucho) y quien
+atiende /metrics los suma. Los contadores de workers que ya terminaron se siguen sumando
+(un contador no debe bajar): en cada scrape sus archivos se acumulan en
+METRICS_EXPORTER_DIR/dead.json y se borran, así la carpeta no crece con cada reinicio.
+Sin carpeta configurada se exportan sólo los números del proceso que responde.
+
+/metrics exige `Authorization: Bearer <METRICS_EXPORTER_TOKEN>`; sin token configurado
+sólo responde con DEBUG o a las IPs de INTERNAL_IPS.
+"""
+import atexit
+import fcntl
+import hmac
+import json
+import os
+import resource
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models import Sum
+from django.http import HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PREFIX = 'qa_dashboard'
+# Límites (en segundos) de los buckets del histograma de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Etiqueta de las rutas que no resolvieron a una vista (evita una serie por URL inventada)
+UNMATCHED = 'unmatched'
+# Contadores acumulados de los workers que ya terminaron (y su lock)
+DEAD_WORKERS_FILE = 'dead.json'
+LOCK_FILE = '.lock'
+
+
+def resident_memory_bytes():
+    """Memoria residente actual del proceso (o el pico, si no hay /proc)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ProcessMetrics:
+    """Contadores de este proceso. Thread-safe (gunicorn puede correr con threads)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+        self.requests = defaultdict(int)  # (vista, método, status) -> cantidad
+        self.latency = {}                 # vista -> {'buckets': [...], 'sum': s, 'count': n}
+        self.db_connections = 0
+
+    def observe_request(self, view, method, status, seconds):
+        with self.lock:
+            self.requests[(view, method, str(status))] += 1
+            histogram = self.latency.setdefault(view, {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0})
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram['buckets'][index] += 1
+                    break
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+        self.flush()
+
+    def connection_opened(self):
+        with self.lock:
+            self.db_connections += 1
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'requests': [[*key, count] for key, count in self.requests.items()],
+                'latency': {view: dict(data, buckets=list(data['buckets'])) for view, data in self.latency.items()},
+                'db_connections': self.db_connections,
+                'memory_bytes': resident_memory_bytes(),
+            }
+
+    def flush(self, force=False):
+        """Escribe los contadores en la carpeta compartida (si hay una configurada)."""
+        directory = settings.METRICS_EXPORTER_DIR
+        now = time.monotonic()
+        if not directory or (not force and now - self.last_flush < settings.METRICS_EXPORTER_FLUSH_SECONDS):
+            return
+        self.last_flush = now
+        data = self.as_dict()
+        os.makedirs(directory, exist_ok=True)
+        _write_json(os.path.join(directory, f"{data['pid']}.json"), data)
+
+
+registry = ProcessMetrics()
+atexit.register(lambda: registry.flush(force=True))
+
+
+def _connection_created(sender, connection, **kwargs):
+    registry.connection_opened()
+
+
+connection_created.connect(_connection_created, dispatch_uid='qa_dashboard_prometheus_connections')
+
+
+def _write_json(path, data):
+    # Escritura atómica: quien lee nunca ve un archivo a medias
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as handle:
+        json.dump(data, handle)
+    os.replace(temporary, path)
+
+
+def _worker_pid(name):
+    """Pid del archivo `<pid>.json` (o `<pid>.json.tmp`), None si es otro archivo."""
+    stem = name.split('.', 1)[0]
+    return int(stem) if stem.isdigit() and name in (f'{stem}.json', f'{stem}.json.tmp') else None
+
+
+@contextmanager
+def _locked(directory):
+    # Un solo scrape a la vez junta y lee los archivos: nunca se suma dos veces un worker
+    with open(os.path.join(directory, LOCK_FILE), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def collect_dead_workers(directory):
+    """
+    Suma los archivos de los workers que ya terminaron en DEAD_WORKERS_FILE y los borra.
+    Se llama con el lock de la carpeta tomado.
+    """
+    dead = [
+        name for name in os.listdir(directory)
+        if (pid := _worker_pid(name)) is not None and pid != os.getpid() and not _process_alive(pid)
+    ]
+    if not dead:
+        return
+    snapshots = []
+    for name in [DEAD_WORKERS_FILE] + [name for name in dead if name.endswith('.json')]:
+        try:
+            with open(os.path.join(directory, name)) as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError):
+            continue  # Todavía no hay acumulado, o el worker murió a mitad de la escritura
+    requests, latency, db_connections, _ = merge_snapshots(snapshots)
+    _write_json(os.path.join(directory, DEAD_WORKERS_FILE), {
+        'pid': None,
+        'requests': [[*key, count] for key, count in requests.items()],
+        'latency': latency,
+        'db_connections': db_connections,
+        'memory_bytes': None,
+    })
+    for name in dead:
+        os.remove(os.path.join(directory, name))
+
+
+def process_snapshots():
+    """Contadores de todos los workers: los archivos de la carpeta más este proceso (en memoria)."""
+    own = registry.as_dict()
+    snapshots = [own]
+    directory = settings.METRICS_EXPORTER_DIR
+    if directory and os.path.isdir(directory):
+        with _locked(directory):
+            collect_dead_workers(directory)
+            for name in os.listdir(directory):
+                if not name.endswith('.json') or name == f"{own['pid']}.json":
+                    continue
+                try:
+                    with open(os.path.join(directory, name)) as handle:
+                        snapshots.append(json.load(handle))
+                except (OSError, ValueError):
+                    continue  # Un worker lo está reemplazando: se suma en el próximo scrape
+    return snapshots
+
+
+def merge_snapshots(snapshots):
+    requests = defaultdict(int)
+    latency = {}
+    db_connections = 0
+    memory = {}
+    for snapshot in snapshots:
+        for view, method, status, count in snapshot['requests']:
+            requests[(view, method, status)] += count
+        for view, data in snapshot['latency'].items():
+            merged = latency.setdefault(view, {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0})
+            merged['buckets'] = [a + b for a, b in zip(merged['buckets'], data['buckets'])]
+            merged['sum'] += data['sum']
+            merged['count'] += data['count']
+        db_connections += snapshot['db_connections']
+        # La memoria es un gauge: sólo cuenta la de los workers vivos (el acumulado no tiene)
+        if snapshot['pid'] is not None and (snapshot['pid'] == os.getpid() or _process_alive(snapshot['pid'])):
+            memory[snapshot['pid']] = snapshot['memory_bytes']
+    return requests, latency, db_connections, memory
+
+
+# --- Formato de texto ---
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Exposition:
+    def __init__(self):
+        self.lines = []
+
+    def metric(self, name, kind, help_text, samples):
+        """`samples`: lista de (sufijo, etiquetas, valor)."""
+        name = f'{PREFIX}_{name}'
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {kind}')
+        for suffix, labels, value in samples:
+            self.lines.append(f'{name}{suffix}{_labels(**labels)} {_number(value)}')
+
+    def render(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def business_gauges():
+    """Totales de requerimientos desde los rollups (una suma, sin recorrer los tickets)."""
+    from metrics.models import Developer, MetricsSnapshot, RequirementDailyRollup
+
+    totals = RequirementDailyRollup.objects.aggregate(total=Sum('total_reqs'), open=Sum('open_reqs'))
+    return {
+        'requirements': totals['total'] or 0,
+        'open_requirements': totals['open'] or 0,
+        'developers': Developer.objects.count(),
+        'dirty_snapshots': MetricsSnapshot.objects.filter(dirty=True).count(),
+    }
+
+
+def render_metrics():
+    from metrics.cache import cache_stats
+
+    requests, latency, db_connections, memory = merge_snapshots(process_snapshots())
+    output = Exposition()
+
+    output.metric('http_requests_total', 'counter', 'Requests atendidos por vista, método y status.', [
+        ('', {'view': view, 'method': method, 'status': status}, count)
+        for (view, method, status), count in sorted(requests.items())
+    ])
+    histogram = []
+    for view, data in sorted(latency.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, data['buckets']):
+            cumulative += count
+            histogram.append(('_bucket', {'view': view, 'le': _number(bound)}, cumulative))
+        histogram.append(('_bucket', {'view': view, 'le': '+Inf'}, data['count']))
+        histogram.append(('_sum', {'view': view}, round(data['sum'], 6)))
+        histogram.append(('_count', {'view': view}, data['count']))
+    output.metric('http_request_duration_seconds', 'histogram', 'Latencia de los requests por vista.', histogram)
+
+    stats = cache_stats()
+    output.metric('cache_hits_total', 'counter', 'Respuestas de reportes servidas desde la caché.', [('', {}, stats['hits'])])
+    output.metric('cache_misses_total', 'counter', 'Respuestas de reportes calculadas (no estaban en caché).', [('', {}, stats['misses'])])
+    output.metric('cache_hit_ratio', 'gauge', 'Aciertos / consultas a la caché de reportes.', [('', {}, stats['hit_ratio'])])
+
+    total_requests = sum(requests.values())
+    output.metric('db_connections_opened_total', 'counter', 'Conexiones a la base abiertas por los workers.', [('', {}, db_connections)])
+    output.metric('db_connection_reuse_ratio', 'gauge', 'Fracción de requests que reutilizaron una conexión abierta.', [
+        ('', {}, round(max(0.0, 1 - db_connections / total_requests), 4) if total_requests else 0.0)
+    ])
+
+    output.metric('process_resident_memory_bytes', 'gauge', 'Memoria residente de cada worker.', [
+        ('', {'pid': pid}, value) for pid, value in sorted(memory.items())
+    ])
+    output.metric('workers', 'gauge', 'Workers vivos que reportan métricas.', [('', {}, len(memory))])
+
+    gauges = business_gauges()
+    output.metric('requirements', 'gauge', 'Requerimientos registrados.', [('', {}, gauges['requirements'])])
+    output.metric('open_requirements', 'gauge', 'Requerimientos pendientes de aprobación de QA.', [('', {}, gauges['open_requirements'])])
+    output.metric('developers', 'gauge', 'Desarrolladores registrados.', [('', {}, gauges['developers'])])
+    output.metric('dirty_snapshots', 'gauge', 'Snapshots pendientes de regenerar.', [('', {}, gauges['dirty_snapshots'])])
+    return output.render()
+
+
+def metrics_view(request):
+    """
+    GET /metrics. Si METRICS_EXPORTER_TOKEN está definido se exige `Authorization: Bearer <token>`;
+    si no, sólo se responde con DEBUG o a las IPs de INTERNAL_IPS.
+    """
+    token = settings.METRICS_EXPORTER_TOKEN
+    if token:
+        # Comparación en tiempo constante (no filtra el token por la latencia); en bytes, porque
+        # compare_digest rechaza strings con caracteres no ASCII
+        received = request.headers.get('Authorization', '').encode()
+        if not hmac.compare_digest(received, f'Bearer {token}'.encode()):
+            return HttpResponse('Unauthorized\n', status=401, content_type=CONTENT_TYPE)
+    elif not settings.DEBUG and request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+        return HttpResponse('Forbidden\n', status=403, content_type=CONTENT_TYPE)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -47,6 +47,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero, para medir el request completo (ver qa_dashboard/middleware.py)
+    'qa_dashboard.middleware.RequestMetricsMiddleware',
+    'qa_dashboard.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -88,6 +91,93 @@ DATABASES = {
     )
 }
 
+# JSON de la API con orjson si está instalado (ver metrics/renderers.py)
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'metrics.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+
+# Caché de respuestas de los reportes (ver metrics/cache.py)
+# En Render usamos un backend en disco para que todos los workers de gunicorn
+# compartan las entradas y las invalidaciones; en local basta con memoria.
+if 'RENDER' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', '/tmp/qa_dashboard_cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'qa-dashboard',
+        }
+    }
+
+# Segundos de vida de cada reporte cacheado. Las señales lo invalidan antes ante cualquier cambio;
+# este tiempo sólo cubre escrituras que no disparan señales (ej. QuerySet.update()).
+METRICS_CACHE_TIMEOUT = int(os.environ.get('METRICS_CACHE_TIMEOUT', 600))
+
+# Feed de cambios /api/stream/ (ver metrics/broadcast.py)
+# Cada cuántos segundos se manda un keepalive por las conexiones abiertas
+METRICS_STREAM_HEARTBEAT_SECONDS = 25
+# Cada cuántos segundos un proceso revisa si otro worker cambió datos (0 = desactivado)
+METRICS_STREAM_POLL_SECONDS = int(os.environ.get('METRICS_STREAM_POLL_SECONDS', 5))
+
+# Snapshots precalculados (ver metrics/snapshots.py y `manage.py snapshot_worker`)
+# Segundos que se sigue sirviendo un snapshot desactualizado antes de volver a calcular en vivo
+METRICS_SNAPSHOT_MAX_STALENESS = int(os.environ.get('METRICS_SNAPSHOT_MAX_STALENESS', 60))
+
+# Backend de los reportes: 'orm' (consultas agrupadas) o 'engine' (copia columnar en memoria
+# con NumPy, ver metrics/engine.py)
+METRICS_BACKEND = os.environ.get('METRICS_BACKEND', 'orm')
+
+# Días de historial de /api/changes/ que conserva `manage.py prune_changelog`
+CHANGELOG_RETENTION_DAYS = int(os.environ.get('CHANGELOG_RETENTION_DAYS', 30))
+
+
+# Instrumentación por request (Server-Timing + log JSON en el logger qa_dashboard.requests)
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', '1') != '0'
+# Repeticiones de una misma consulta a partir de las cuales se avisa de un N+1
+REQUEST_METRICS_N_PLUS_ONE_THRESHOLD = int(os.environ.get('REQUEST_METRICS_N_PLUS_ONE_THRESHOLD', 10))
+# Profiler por muestreo: fracción de requests perfilados (0 = apagado), umbral y carpeta de los .prof
+REQUEST_PROFILING_SAMPLE_RATE = float(os.environ.get('REQUEST_PROFILING_SAMPLE_RATE', 0))
+REQUEST_PROFILING_THRESHOLD_MS = float(os.environ.get('REQUEST_PROFILING_THRESHOLD_MS', 500))
+REQUEST_PROFILING_DIR = os.environ.get('REQUEST_PROFILING_DIR', '/tmp/qa_dashboard_profiles')
+
+# Compresión de respuestas JSON/CSV grandes (brotli si está instalado, si no gzip)
+RESPONSE_COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION_ENABLED', '1') != '0'
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', 1024))
+
+# Endpoint /metrics (ver qa_dashboard/prometheus.py). Con varios workers de gunicorn hace falta
+# una carpeta compartida; vacía = sólo el proceso que responde.
+METRICS_EXPORTER_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR', '')
+METRICS_EXPORTER_FLUSH_SECONDS = float(os.environ.get('METRICS_EXPORTER_FLUSH_SECONDS', 2))
+# Si se define, /metrics exige `Authorization: Bearer <token>`; si no, sólo responde con
+# DEBUG o a INTERNAL_IPS (lista separada por comas)
+METRICS_EXPORTER_TOKEN = os.environ.get('METRICS_EXPORTER_TOKEN', '')
+INTERNAL_IPS = [ip.strip() for ip in os.environ.get('INTERNAL_IPS', '').split(',') if ip.strip()]
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # En producción una línea por request; en local sólo los avisos (N+1, perfiles guardados)
+        'qa_dashboard.requests': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_METRICS_LOG_LEVEL', 'WARNING' if DEBUG else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -119,6 +209,8 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+# Antigüedad de los snapshots, para que el frontend pueda mostrarla
+CORS_EXPOSE_HEADERS = ['X-Snapshot-Age', 'X-Snapshot-Stale']
 
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from 'react'; // Agregamos useRef
-import { getDevelopers, getDeveloperReport, getGeneralSummary } from './services/api';
+import { getChanges, getDashboard, subscribeToChanges } from './services/api';
 import SingleRequirementView from './components/SingleRequirementView';
 import GeneralSummaryTable from './components/GeneralSummaryTable';
 import { User, FileCode, Search, BarChart2, RefreshCw } from 'lucide-react'; // Icono de refresh
@@ -20,6 +20,9 @@ function App() {
   // Estado para indicar visualmente que se está actualizando (opcional)
   const [isRefreshing, setIsRefreshing] = useState(false);
 
+  // Cursor de /api/changes/: hasta qué cambio refleja lo que tenemos en pantalla
+  const cursorRef = useRef(null);
+
   // --- LÓGICA DE ACTUALIZACIÓN AUTOMÁTICA (POLLING) ---
   
   // Función maestra de carga de datos
@@ -27,19 +30,14 @@ function App() {
     if (isBackgroundRefresh) setIsRefreshing(true);
 
     try {
-        // 1. Siempre cargamos el Resumen General y la lista de Devs
-        const [summary, devs] = await Promise.all([
-            getGeneralSummary(),
-            getDevelopers()
-        ]);
-        
-        setSummaryData(summary);
-        setDevelopers(devs);
+        // Un solo request: Resumen General, lista de Devs y el reporte del dev seleccionado
+        const data = await getDashboard(selectedDevId);
 
-        // 2. Si hay un dev seleccionado, recargamos su reporte también
+        cursorRef.current = data.cursor;
+        setSummaryData(data.summary);
+        setDevelopers(data.developers);
         if (selectedDevId) {
-            const devReport = await getDeveloperReport(selectedDevId);
-            setReport(devReport);
+            setReport(data.report);
         }
 
     } catch (error) {
@@ -52,20 +50,95 @@ function App() {
     }
   };
 
-  // EFECTO 1: Carga inicial y configuración del Intervalo
+  // Refresco incremental: sólo se descarga lo que cambió desde el cursor
+  const fetchChanges = async () => {
+    if (cursorRef.current === null) return fetchAllData(true);
+    setIsRefreshing(true);
+
+    try {
+        let data;
+        do {
+            data = await getChanges(cursorRef.current);
+            if (data.reset) {
+                // El cursor ya no sirve (historial depurado): recarga completa
+                cursorRef.current = null;
+                await fetchAllData(true);
+                return;
+            }
+            applyChanges(data);
+            cursorRef.current = data.cursor;
+        } while (data.has_more);
+    } catch (error) {
+        console.error("Error actualizando datos:", error);
+    } finally {
+        setTimeout(() => setIsRefreshing(false), 500);
+    }
+  };
+
+  const applyChanges = (data) => {
+    const deletedDevs = new Set(data.developers.deleted);
+    const mergeById = (rows, updated, removed) => {
+        const byId = new Map(rows.filter(row => !removed.has(row.id)).map(row => [row.id, row]));
+        updated.forEach(row => byId.set(row.id, row));
+        return [...byId.values()];
+    };
+
+    setSummaryData(rows => mergeById(rows, data.aggregates.summary, deletedDevs).sort((a, b) => a.id - b.id));
+    setDevelopers(rows => mergeById(rows, data.developers.upserted, deletedDevs).sort((a, b) => a.name.localeCompare(b.name)));
+    setReport(current => {
+        if (!current) return current;
+        if (deletedDevs.has(current.developer_id)) return null;
+        const totals = data.aggregates.reports.find(r => r.developer_id === current.developer_id);
+        // Se quitan los tickets borrados o que pasaron a otro dev; los del dev se agregan/actualizan
+        const removed = new Set([
+            ...data.requirements.deleted,
+            ...data.requirements.upserted.filter(r => r.developer_id !== current.developer_id).map(r => r.id),
+        ]);
+        const mine = data.requirements.upserted
+            .filter(r => r.developer_id === current.developer_id)
+            .map(r => {
+                const row = { ...r };
+                delete row.developer_id;
+                return row;
+            });
+        return {
+            ...current,
+            ...(totals || {}),
+            requerimientos_lista: mergeById(current.requerimientos_lista, mine, removed).sort((a, b) => a.id - b.id),
+        };
+    });
+  };
+
+  // EFECTO 1: Carga inicial y suscripción a cambios en vivo
   useEffect(() => {
     // 1. Carga inicial (con loading spinner grande si quisieras)
     setLoading(true);
     fetchAllData().then(() => setLoading(false));
 
-    // 2. Configurar el "Timer" para actualizar cada 5 segundos (5000 ms)
-    const intervalId = setInterval(() => {
-        fetchAllData(true); // true indica que es una actualización de fondo
-    }, 5000); 
+    // 2. Polling cada 5 segundos como respaldo mientras no haya feed en vivo
+    let intervalId = null;
+    const startPolling = () => {
+        if (!intervalId) intervalId = setInterval(fetchChanges, 5000);
+    };
+    const stopPolling = () => {
+        clearInterval(intervalId);
+        intervalId = null;
+    };
+    startPolling();
+
+    // 3. Feed en vivo (SSE): sólo pedimos los cambios cuando el backend avisa que algo cambió
+    const source = subscribeToChanges(fetchChanges);
+    if (source) {
+        source.onopen = stopPolling;
+        source.onerror = startPolling;
+    }
 
-    // 3. Limpieza: Si el usuario cierra la pestaña, matamos el timer
-    return () => clearInterval(intervalId);
-  }, [selectedDevId]); // Se reinicia el timer si cambias de Dev para traer sus datos rápido
+    // 4. Limpieza: Si el usuario cierra la pestaña, matamos el timer y la conexión
+    return () => {
+        stopPolling();
+        if (source) source.close();
+    };
+  }, [selectedDevId]); // Se reinicia si cambias de Dev para traer sus datos rápido
 
   // EFECTO 2: Actualizar la vista del requerimiento específico cuando llega nueva data en 'report'
   useEffect(() => {
@@ -30,4 +30,31 @@ export const getGeneralSummary = async () => {
     console.error("Error fetching summary", error);
     return [];
   }
-};
\ No newline at end of file
+};
+
+// Resumen, lista de devs y (si hay devId) el reporte del dev en un solo request
+export const getDashboard = async (devId = null, startDate = null, endDate = null) => {
+  let params = {};
+  if (devId) params.dev_id = devId;
+  if (startDate) params.start_date = startDate;
+  if (endDate) params.end_date = endDate;
+
+  const response = await axios.get(`${API_URL}/dashboard/`, { params });
+  return response.data;
+};
+
+// Cambios posteriores al cursor `since` (el `cursor` del Dashboard o de la respuesta anterior):
+// filas nuevas/modificadas, ids borrados y totales de los devs afectados
+export const getChanges = async (since) => {
+  const response = await axios.get(`${API_URL}/changes/`, { params: { since } });
+  return response.data;
+};
+
+// Feed de cambios en vivo (SSE). Llama a onChange cada vez que el backend avisa
+// que cambiaron datos. Devuelve el EventSource (o null si el navegador no lo soporta).
+export const subscribeToChanges = (onChange) => {
+  if (typeof EventSource === 'undefined') return null;
+  const source = new EventSource(`${API_URL}/stream/`);
+  source.addEventListener('change', (event) => onChange(JSON.parse(event.data)));
+  return source;
+};